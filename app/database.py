@@ -1,6 +1,9 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
-from contextlib import contextmanager
+from sqlalchemy.dialects import postgresql, sqlite
+from contextlib import contextmanager, asynccontextmanager
 import os
 
 # Use Railway's PostgreSQL if available, otherwise fallback to SQLite
@@ -10,15 +13,108 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./happyrobot.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-# Create DB engine with appropriate settings
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
+# Connection pool profile (PostgreSQL, and the file-backed SQLite pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+
+# SQLite tuning applied to every new connection; WAL lets readers run alongside a writer
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+def _is_memory_sqlite(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in url
+
+def engine_options(url: str) -> dict:
+    """create_engine / create_async_engine keyword arguments for a database URL"""
+    if url.startswith("sqlite"):
+        options = {"connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+        if not _is_memory_sqlite(url):
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+        return options
     # PostgreSQL settings
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_recycle=300)
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def sqlite_pragmas(url: str) -> list[str]:
+    pragmas = [
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+    ]
+    if not _is_memory_sqlite(url):
+        pragmas.insert(0, f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    return pragmas
+
+def apply_sqlite_pragmas(sync_engine, url: str):
+    """Run the tuning pragmas on each new DBAPI connection (sqlite3 or aiosqlite)"""
+    pragmas = sqlite_pragmas(url)
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+def build_engine(url: str, tuned: bool = True):
+    """Sync engine; tuned=False gives the old untuned settings (used by bench_db.py)"""
+    if not tuned:
+        if url.startswith("sqlite"):
+            return create_engine(url, connect_args={"check_same_thread": False})
+        return create_engine(url, pool_pre_ping=True, pool_recycle=300)
+    db_engine = create_engine(url, **engine_options(url))
+    if url.startswith("sqlite"):
+        apply_sqlite_pragmas(db_engine, url)
+    return db_engine
+
+# Create DB engine with appropriate settings
+engine = build_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str) -> tuple[str, dict]:
+    """Same database through an asyncio driver: aiosqlite for SQLite, asyncpg for PostgreSQL"""
+    parsed = make_url(url)
+    connect_args = {}
+    if parsed.get_backend_name() == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    else:
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+        # asyncpg takes ssl as a connect argument rather than libpq's sslmode
+        sslmode = parsed.query.get("sslmode")
+        if sslmode:
+            parsed = parsed.difference_update_query(["sslmode"])
+            connect_args["ssl"] = sslmode
+    return parsed.render_as_string(hide_password=False), connect_args
+
+def build_async_engine(url: str):
+    async_url, connect_args = async_database_url(url)
+    if url.startswith("sqlite"):
+        # aiosqlite keeps its dialect default of NullPool: a pooled connection's worker
+        # thread would keep the process alive until the engine is disposed
+        options = {"connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    else:
+        options = {**engine_options(url), "connect_args": connect_args}
+    db_engine = create_async_engine(async_url, **options)
+    if url.startswith("sqlite"):
+        apply_sqlite_pragmas(db_engine.sync_engine, url)
+    return db_engine
+
+# Async engine for request handlers, so queries do not block the event loop
+async_engine = build_async_engine(DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -37,4 +133,16 @@ def get_db_context():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+@asynccontextmanager
+async def get_async_db_context():
+    """Async context manager for database sessions; run sync service code with db.run_sync"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def dialect_insert(db, table):
+    """INSERT construct supporting ON CONFLICT for the session's database"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
@@ -0,0 +1,160 @@
+from math import asin, cos, degrees, radians, sin, sqrt
+from pathlib import Path
+from typing import NamedTuple, Optional
+import csv
+import logging
+import re
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+CITIES_PATH = DATA_DIR / "us_cities.csv"
+METRO_ALIASES_PATH = DATA_DIR / "metro_aliases.csv"
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class Place(NamedTuple):
+    city: str
+    state: str
+    zip_code: str
+    lat: float
+    lon: float
+    population: int
+
+
+class SearchArea(NamedTuple):
+    """Circle of radius_miles around a geocoded lane preference"""
+    lat: float
+    lon: float
+    radius_miles: float
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        """(min_lat, max_lat, min_lon, max_lon) enclosing the circle"""
+        angular = self.radius_miles / EARTH_RADIUS_MILES
+        dlat = degrees(angular)
+        ratio = sin(angular) / cos(radians(self.lat)) if abs(self.lat) < 90 else 1.0
+        dlon = degrees(asin(ratio)) if ratio < 1 else 180.0
+        return self.lat - dlat, self.lat + dlat, self.lon - dlon, self.lon + dlon
+
+    def contains(self, lat: Optional[float], lon: Optional[float]) -> bool:
+        if lat is None or lon is None:
+            return False
+        return haversine_miles(self.lat, self.lon, lat, lon) <= self.radius_miles
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in miles"""
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * asin(min(1.0, sqrt(a)))
+
+
+def approx_distance(lat: Optional[float], lon: Optional[float], origin_lat: float, origin_lon: float) -> Optional[float]:
+    """
+    Squared equirectangular distance in degrees, for nearest-first ordering.
+    Only uses + - *, so load_search can compute the exact same value in SQL.
+    """
+    if lat is None or lon is None:
+        return None
+    scale = cos(radians(origin_lat))
+    dlat = lat - origin_lat
+    dlon = (lon - origin_lon) * scale
+    return dlat * dlat + dlon * dlon
+
+
+def _city_key(city: str) -> str:
+    """'St. Louis' / 'Saint Louis' / 'st louis' -> 'st louis'"""
+    key = re.sub(r"[.']", "", city.lower())
+    key = re.sub(r"^(saint|ste?)\s+", "st ", key)
+    return re.sub(r"\s+", " ", key).strip()
+
+
+class Gazetteer:
+    """
+    Offline US city/ZIP lookup loaded from the bundled CSVs.
+    Coverage is the larger freight markets plus their ZIP3 prefixes, not every ZIP.
+    """
+
+    def __init__(self, cities_path: Path = CITIES_PATH, aliases_path: Path = METRO_ALIASES_PATH):
+        self.cities_path = cities_path
+        self.aliases_path = aliases_path
+        self._loaded = False
+
+    def _load(self):
+        by_city_state: dict[tuple[str, str], Place] = {}
+        by_city: dict[str, Place] = {}
+        by_zip: dict[str, Place] = {}
+        by_zip3: dict[str, Place] = {}
+        with open(self.cities_path, newline="") as f:
+            for row in csv.DictReader(f):
+                place = Place(row["city"], row["state"], row["zip"], float(row["lat"]), float(row["lon"]), int(row["population"]))
+                key = _city_key(place.city)
+                by_city_state[(key, place.state.lower())] = place
+                # A bare city name resolves to its most populous namesake
+                if key not in by_city or by_city[key].population < place.population:
+                    by_city[key] = place
+                by_zip[place.zip_code] = place
+                zip3 = place.zip_code[:3]
+                if zip3 not in by_zip3 or by_zip3[zip3].population < place.population:
+                    by_zip3[zip3] = place
+
+        aliases: dict[str, Place] = {}
+        with open(self.aliases_path, newline="") as f:
+            for row in csv.DictReader(f):
+                place = by_city_state.get((_city_key(row["city"]), row["state"].lower()))
+                if place is None:
+                    logger.warning("Metro alias %r points at unknown city %s, %s", row["alias"], row["city"], row["state"])
+                    continue
+                aliases[_city_key(row["alias"])] = place
+
+        self._by_city_state = by_city_state
+        self._by_city = by_city
+        self._by_zip = by_zip
+        self._by_zip3 = by_zip3
+        self._aliases = aliases
+        self._loaded = True
+        logger.info("Gazetteer loaded %s places and %s metro aliases", len(by_city_state), len(aliases))
+
+    def lookup(self, city: Optional[str], state: Optional[str]) -> Optional[Place]:
+        """Resolve an already split (city, state) pair; either part may carry a ZIP"""
+        if not self._loaded:
+            self._load()
+        text = " ".join(part for part in (city, state) if part)
+        zip_match = re.search(r"\b(\d{5})(?:-\d{4})?\b", text)
+        if zip_match:
+            zip_code = zip_match.group(1)
+            place = self._by_zip.get(zip_code) or self._by_zip3.get(zip_code[:3])
+            if place is not None:
+                return place
+            # Unknown ZIP; fall back to whatever name came with it
+            city = (city or "").replace(zip_match.group(0), "").strip()
+            state = (state or "").replace(zip_match.group(0), "").strip()
+        if not city:
+            return None
+
+        key = _city_key(city)
+        if state:
+            place = self._by_city_state.get((key, state.strip().lower()))
+            if place is not None:
+                return place
+        alias = self._aliases.get(key)
+        if alias is not None:
+            return alias
+        if not state:
+            return self._by_city.get(key)
+        return None
+
+    def alias(self, city: Optional[str]) -> Optional[Place]:
+        """Metro alias ('Chicagoland', 'DFW') target, if city is one"""
+        if not city:
+            return None
+        if not self._loaded:
+            self._load()
+        return self._aliases.get(_city_key(city))
+
+
+# Loaded on first lookup and shared by the worker
+gazetteer = Gazetteer()
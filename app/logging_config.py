@@ -0,0 +1,131 @@
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "text" for the classic console format, "json" for one JSON object per line
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Hand records to a background thread so request handlers never block on log I/O
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() in ("1", "true", "yes")
+
+REDACTED = "[REDACTED]"
+# Values of these environment variables never appear in log output
+SECRET_ENV_VARS = ("FMCSA_API_KEY", "WEBHOOK_API_KEY")
+SECRET_PATTERNS = [
+    # webKey=..., api_key: ..., "x-api-key": "..." in URLs, reprs and JSON
+    re.compile(r"""(?i)(["']?(?:webkey|api[_-]?key|x-api-key|authorization|password|token)["']?\s*[=:]\s*["']?(?:bearer\s+)?)[^"'&\s,}]+"""),
+    # Credentials embedded in connection URLs
+    re.compile(r"(://[^:/@\s]+:)[^@\s]+(@)"),
+]
+SECRET_KEYS = re.compile(r"(?i)^(webkey|api[_-]?key|x-api-key|authorization|password|token|secret)$")
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+_configured = False
+
+
+def configured_secrets() -> list[str]:
+    return [secret for secret in (os.getenv(name) for name in SECRET_ENV_VARS) if secret]
+
+
+def redact_text(text: str, secrets: Optional[list[str]] = None) -> str:
+    for secret in configured_secrets() if secrets is None else secrets:
+        text = text.replace(secret, REDACTED)
+    text = SECRET_PATTERNS[0].sub(rf"\1{REDACTED}", text)
+    return SECRET_PATTERNS[1].sub(rf"\1{REDACTED}\2", text)
+
+
+def redact_value(value, secrets: Optional[list[str]] = None):
+    """Redact secrets inside structured extra= values (dicts, lists, strings)"""
+    if isinstance(value, dict):
+        return {key: REDACTED if SECRET_KEYS.match(str(key)) else redact_value(item, secrets) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact_value(item, secrets) for item in value]
+    if isinstance(value, str):
+        return redact_text(value, secrets)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    """Scrub API keys and credentials from the message and extra fields before output"""
+
+    def __init__(self):
+        super().__init__()
+        self.secrets = configured_secrets()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact_text(record.getMessage(), self.secrets)
+        record.args = None
+        for key, value in list(vars(record).items()):
+            if key not in _RECORD_ATTRIBUTES:
+                setattr(record, key, redact_value(value, self.secrets))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, extra= fields and any traceback"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def build_handler(log_format: str = LOG_FORMAT, stream=None) -> logging.Handler:
+    """Output handler with the configured format and secret redaction"""
+    handler = logging.StreamHandler(stream or sys.stderr)
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+    handler.addFilter(RedactingFilter())
+    return handler
+
+
+def configure_logging(log_format: str = LOG_FORMAT, level: str = LOG_LEVEL, use_queue: bool = LOG_QUEUE):
+    """
+    Install the root handler once per process. With use_queue the request path
+    only merges the %-args into the message and enqueues the record, so
+    arguments are read on the caller's thread while they are current;
+    redaction, output formatting and writes run on the listener thread,
+    which is flushed at exit.
+    """
+    global _listener, _configured
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _configured:
+        return
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+
+    handler = build_handler(log_format)
+    if use_queue:
+        records = queue.SimpleQueue()
+        root.addHandler(QueueHandler(records))
+        _listener = QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+    else:
+        root.addHandler(handler)
+    _configured = True
@@ -1,152 +1,122 @@
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
-from app.routers import webhook
-from app.database import engine, Base, get_db_context
-from app.models.load import Load, CallLog
-from sqlalchemy import func, case
-from datetime import datetime, timedelta
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from app.routers import webhook, loads, analytics
+from app.database import engine, async_engine, get_db_context
+from app.logging_config import configure_logging
+from app.migrations import run_migrations
+from app.services.dashboard_metrics import dashboard_cache
+from app.services.dashboard_events import dashboard_events
+from app.services.http_cache import CachedBody, cached_response, not_modified
+from app.services.call_metrics import ensure_rollups
+from app.services.fmcsa_client import fmcsa_client
+from app.services.fmcsa_verification import verification_metrics
+from app.services.load_reservations import run_hold_sweeper
+from app.services.call_log_writer import call_log_writer
+from app.services.load_sync import LOAD_SYNC_SECONDS, run_load_sync
+import asyncio
+import json
 import os
 import logging
+import time
 
 app = FastAPI(title="HappyRobot Inbound Carrier Sales API", version="1.0.0")
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (LOG_FORMAT, LOG_LEVEL, LOG_QUEUE)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create tables and bring existing ones up to date
+run_migrations(engine)
+with get_db_context() as db:
+    ensure_rollups(db)
+
+# Dashboard page, read and compressed once at startup
+DASHBOARD_TEMPLATE = os.path.join(os.path.dirname(__file__), "..", "templates", "dashboard.html")
+with open(DASHBOARD_TEMPLATE, "rb") as f:
+    dashboard_page = CachedBody(f.read(), "text/html; charset=utf-8")
+# Seconds browsers may reuse the page before revalidating it
+DASHBOARD_PAGE_MAX_AGE = int(os.getenv("DASHBOARD_PAGE_MAX_AGE", "60"))
+
+# Serialized metrics for the value the dashboard cache currently holds
+_metrics_body = (None, None)
+# Metrics ETags are "<process start>-<cache version>", so a restarted server never reuses one
+METRICS_TAG_PREFIX = format(time.time_ns(), "x")
 
 # Include routers
 app.include_router(webhook.router)
+app.include_router(loads.router)
+app.include_router(analytics.router)
+
+@app.on_event("startup")
+async def startup():
+    """Replay spooled call logs and start background maintenance tasks"""
+    await call_log_writer.start()
+    await dashboard_events.start()
+    app.state.hold_sweeper = asyncio.create_task(run_hold_sweeper())
+    app.state.load_sync = asyncio.create_task(run_load_sync()) if LOAD_SYNC_SECONDS > 0 else None
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background tasks, drain queued call logs and close pooled connections"""
+    app.state.hold_sweeper.cancel()
+    if app.state.load_sync is not None:
+        app.state.load_sync.cancel()
+    await dashboard_events.stop()
+    await call_log_writer.stop()
+    await fmcsa_client.aclose()
+    await async_engine.dispose()
 
 @app.get("/health")
 def health_check():
     return {"status": "healthy", "service": "HappyRobot Inbound API"}
 
-@app.get("/", response_class=HTMLResponse)
-def dashboard():
+@app.get("/")
+def dashboard(request: Request):
     """Serve the dashboard HTML template"""
-    template_path = os.path.join(os.path.dirname(__file__), "..", "templates", "dashboard.html")
-    with open(template_path, "r") as f:
-        return HTMLResponse(content=f.read())
+    return cached_response(request, dashboard_page, f"public, max-age={DASHBOARD_PAGE_MAX_AGE}")
+
+def metrics_tag(version: int) -> str:
+    return f"{METRICS_TAG_PREFIX}-{version}"
+
+def metrics_body(metrics: dict) -> CachedBody:
+    """Serialize and compress each computed metrics value once, however many requests it serves"""
+    global _metrics_body
+    value, body = _metrics_body
+    if value is not metrics:
+        body = CachedBody(json.dumps(metrics, ensure_ascii=False, separators=(",", ":")).encode(), "application/json",
+                          tag=metrics_tag(dashboard_cache.version))
+        _metrics_body = (metrics, body)
+    return body
 
 @app.get("/dashboard-metrics")
-def get_dashboard_metrics():
+async def get_dashboard_metrics(request: Request):
     """Get key metrics for the dashboard"""
     try:
-        with get_db_context() as db:
-            # Get total loads
-            total_loads = db.query(Load).count()
-            available_loads = db.query(Load).filter(Load.status == "available").count()
-            
-            # Get call log metrics
-            total_calls = db.query(CallLog).count()
-            unique_carriers = db.query(CallLog.mc_number).distinct().count()
-            
-            # Get call outcomes using HappyRobot's actual values
-            won_calls = db.query(CallLog).filter(CallLog.call_outcome == "won").count()
-            lost_calls = db.query(CallLog).filter(CallLog.call_outcome == "lost").count()
-            no_load_calls = db.query(CallLog).filter(CallLog.call_outcome == "no-load").count()
-            verification_failed_calls = db.query(CallLog).filter(CallLog.call_outcome == "verification-failed").count()
-            callback_needed = db.query(CallLog).filter(CallLog.call_outcome == "callback-needed").count()
-            
-            # Calculate success rate
-            success_rate = 0
-            if total_calls > 0:
-                success_rate = round((won_calls / total_calls) * 100, 1)
-            
-            # Get sentiment breakdown
-            positive_sentiment = db.query(CallLog).filter(CallLog.sentiment == "positive").count()
-            negative_sentiment = db.query(CallLog).filter(CallLog.sentiment == "negative").count()
-            neutral_sentiment = db.query(CallLog).filter(CallLog.sentiment == "neutral").count()
-            
-            # Get today's metrics
-            today = datetime.now().date()
-            today_calls = db.query(CallLog).filter(func.date(CallLog.created_at) == today).count()
-            today_won = db.query(CallLog).filter(
-                func.date(CallLog.created_at) == today,
-                CallLog.call_outcome == "won"
-            ).count()
-            
-            # Get this week's metrics
-            week_ago = datetime.now() - timedelta(days=7)
-            week_calls = db.query(CallLog).filter(CallLog.created_at >= week_ago).count()
-            week_won = db.query(CallLog).filter(
-                CallLog.created_at >= week_ago,
-                CallLog.call_outcome == "won"
-            ).count()
-            
-            # Get recent call activity (last 7 days)
-            recent_activity = []
-            for i in range(7):
-                date = (datetime.now() - timedelta(days=i)).date()
-                day_calls = db.query(CallLog).filter(func.date(CallLog.created_at) == date).count()
-                day_won = db.query(CallLog).filter(
-                    func.date(CallLog.created_at) == date,
-                    CallLog.call_outcome == "won"
-                ).count()
-                recent_activity.append({
-                    "date": date.strftime("%Y-%m-%d"),
-                    "calls": day_calls,
-                    "won": day_won
-                })
-            
-            # Get top carriers by call volume
-            top_carriers = db.query(
-                CallLog.mc_number,
-                CallLog.carrier_name,
-                func.count(CallLog.id).label('call_count'),
-                func.sum(case((CallLog.call_outcome == "won", 1), else_=0)).label('won_count')
-            ).group_by(CallLog.mc_number, CallLog.carrier_name).order_by(func.count(CallLog.id).desc()).limit(5).all()
-            
-            # Get duration analytics
-            avg_duration = db.query(func.avg(CallLog.duration)).scalar() or 0
-            max_duration = db.query(func.max(CallLog.duration)).scalar() or 0
-            min_duration = db.query(func.min(CallLog.duration)).scalar() or 0
-            
-            # Get duration by outcome
-            duration_by_outcome = db.query(
-                CallLog.call_outcome,
-                func.avg(CallLog.duration).label('avg_duration'),
-                func.count(CallLog.id).label('call_count')
-            ).group_by(CallLog.call_outcome).all()
-            
-            # Get hourly call distribution (if we have enough data)
-            hourly_calls = []
-            for hour in range(24):
-                hour_calls = db.query(CallLog).filter(
-                    func.extract('hour', CallLog.created_at) == hour
-                ).count()
-                hourly_calls.append({"hour": hour, "calls": hour_calls})
-            
-            return {
-                "total_loads": total_loads,
-                "available_loads": available_loads,
-                "total_calls": total_calls,
-                "unique_carriers": unique_carriers,
-                "won_calls": won_calls,
-                "lost_calls": lost_calls,
-                "no_load_calls": no_load_calls,
-                "verification_failed_calls": verification_failed_calls,
-                "callback_needed": callback_needed,
-                "success_rate": success_rate,
-                "positive_sentiment": positive_sentiment,
-                "negative_sentiment": negative_sentiment,
-                "neutral_sentiment": neutral_sentiment,
-                "today_calls": today_calls,
-                "today_won": today_won,
-                "week_calls": week_calls,
-                "week_won": week_won,
-                "recent_activity": recent_activity,
-                "top_carriers": [{"mc_number": c.mc_number, "carrier_name": c.carrier_name, "call_count": c.call_count, "won_count": c.won_count} for c in top_carriers],
-                "avg_duration": round(avg_duration, 1),
-                "max_duration": max_duration,
-                "min_duration": min_duration,
-                "duration_by_outcome": [{"outcome": d.call_outcome, "avg_duration": round(d.avg_duration or 0, 1), "call_count": d.call_count} for d in duration_by_outcome],
-                "hourly_calls": hourly_calls
-            }
+        # Revalidated on every poll: a client holding the current version gets a 304
+        # before the cache is read, so it never waits on (or triggers) a recompute
+        peeked = dashboard_cache.peek()
+        if peeked is not None:
+            version, status, age = peeked
+            unchanged = not_modified(request, metrics_tag(version), "no-cache", dashboard_cache.headers(status, age))
+            if unchanged is not None:
+                return unchanged
+        metrics, status, age = await dashboard_cache.get()
+        return cached_response(request, metrics_body(metrics), "no-cache", dashboard_cache.headers(status, age))
     except Exception as e:
-        logger.error(f"Error in dashboard metrics: {e}")
+        logger.error("Error in dashboard metrics: %s", e)
         return {"error": str(e)}
 
+@app.get("/dashboard-events")
+async def get_dashboard_events():
+    """Server-sent events: a metrics snapshot, then the fields that change as calls land"""
+    return StreamingResponse(
+        dashboard_events.stream(),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/verification-metrics")
+def get_verification_metrics():
+    """MC verification cache hit ratio and FMCSA call savings"""
+    return verification_metrics()
@@ -0,0 +1,138 @@
+from sqlalchemy import bindparam, delete, func, inspect, or_, select, update, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+import logging
+
+from app.database import Base
+from app.models.load import Load, CallLog, SEARCH_FIELDS_VERSION, load_search_fields
+from app.services.call_metrics import rebuild_rollups
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns(engine: Engine):
+    """ALTER existing tables to add columns declared on the models since they were created"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                if column.server_default is not None:
+                    # Existing rows need a value before NOT NULL can hold
+                    column_type += f" DEFAULT {column.server_default.arg}"
+                    if not column.nullable:
+                        column_type += " NOT NULL"
+                logger.info("Adding column %s.%s (%s)", table.name, column.name, column_type)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+
+def dedupe_call_sessions(engine: Engine):
+    """
+    Make call_logs.session_id unique on databases created before it was.
+    Keeps the first log of each session, drops the old non-unique index so
+    create_missing_indexes builds the unique one, and rebuilds the rollups
+    if any retried summaries were removed.
+    """
+    index = next(index for index in CallLog.__table__.indexes if list(index.columns) == [CallLog.session_id])
+    existing = {item["name"]: item for item in inspect(engine).get_indexes(CallLog.__tablename__)}
+    if index.name not in existing or existing[index.name]["unique"]:
+        return
+
+    first_logs = select(func.min(CallLog.id)).where(CallLog.session_id.is_not(None)).group_by(CallLog.session_id)
+    with engine.begin() as conn:
+        removed = conn.execute(
+            delete(CallLog).where(CallLog.session_id.is_not(None), CallLog.id.not_in(first_logs))
+        ).rowcount
+        conn.execute(text(f"DROP INDEX {index.name}"))
+    if removed:
+        logger.info("Removed %s duplicate call logs from retried summaries", removed)
+        with Session(engine) as db:
+            rebuild_rollups(db)
+
+
+def normalize_call_timestamps(engine: Engine):
+    """
+    Rewrite SQLite call_logs.created_at values stored with fractional seconds
+    (or a 'T' separator) in the CURRENT_TIMESTAMP format. Mixed formats
+    compare wrongly as text, which broke range filters and /calls cursors.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        fixed = conn.execute(text(
+            "UPDATE call_logs SET created_at = datetime(created_at) WHERE created_at <> datetime(created_at)"
+        )).rowcount
+    if fixed:
+        logger.info("Normalized %s call log timestamps", fixed)
+
+
+def create_missing_indexes(engine: Engine):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def analyze_sqlite(engine: Engine):
+    """
+    Refresh SQLite planner statistics (PostgreSQL's autovacuum does this on
+    its own). Without them SQLite assumes any created_at range is narrow and
+    never picks the (mc_number, created_at) index for carrier rankings. The
+    sampled ANALYZE takes about a millisecond, so it runs on every start.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        conn.execute(text("PRAGMA analysis_limit=1000"))
+        conn.execute(text("ANALYZE"))
+
+
+def backfill_load_search_columns(engine: Engine):
+    """
+    Populate derived search columns for loads written before they existed,
+    or with an older SEARCH_FIELDS_VERSION. Every row visited is stamped with
+    the current version, including places the gazetteer does not know, so
+    later starts skip them.
+    """
+    stale = or_(Load.search_fields_version.is_(None), Load.search_fields_version < SEARCH_FIELDS_VERSION)
+    total = 0
+    last_id = 0
+    with engine.begin() as conn:
+        while True:
+            rows = conn.execute(
+                select(Load.load_id, Load.origin, Load.destination, Load.equipment_type, Load.pickup_datetime)
+                .where(stale, Load.load_id > last_id)
+                .order_by(Load.load_id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            conn.execute(
+                update(Load).where(Load.load_id == bindparam("row_id")),
+                [{"row_id": row.load_id,
+                  **load_search_fields(row.origin, row.destination, row.equipment_type, row.pickup_datetime)}
+                 for row in rows],
+            )
+            total += len(rows)
+            last_id = rows[-1].load_id
+    if total:
+        logger.info("Backfilled search columns for %s loads", total)
+
+
+def run_migrations(engine: Engine):
+    """Bring an existing database up to the current models; safe to run on every start"""
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    dedupe_call_sessions(engine)
+    normalize_call_timestamps(engine)
+    create_missing_indexes(engine)
+    backfill_load_search_columns(engine)
+    analyze_sqlite(engine)
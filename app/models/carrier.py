@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+
+class MCVerificationCache(Base):
+    """FMCSA verification results shared across workers"""
+    __tablename__ = "mc_verification_cache"
+
+    mc_number = Column(String, primary_key=True)
+    status = Column(String, nullable=False)  # verified, not_allowed, not_found
+    carrier_name = Column(String, nullable=True)
+    checked_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class CarrierSnapshot(Base):
+    """Local copy of the FMCSA carrier census, keyed by normalized MC docket number"""
+    __tablename__ = "carrier_snapshots"
+
+    docket_number = Column(String, primary_key=True)
+    dot_number = Column(String, nullable=True)
+    legal_name = Column(String, nullable=True)
+    allowed_to_operate = Column(String, nullable=True)  # Y / N, NULL when the census has no status
+    snapshot_at = Column(DateTime, nullable=False)
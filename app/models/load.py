@@ -1,6 +1,133 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Text, JSON, UniqueConstraint, Index, event
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
+from typing import Optional
+import re
 from app.database import Base
+from app.geocoding import gazetteer, SearchArea
+
+US_STATES = {
+    "al", "ak", "az", "ar", "ca", "co", "ct", "de", "dc", "fl", "ga", "hi", "id", "il", "in", "ia",
+    "ks", "ky", "la", "me", "md", "ma", "mi", "mn", "ms", "mo", "mt", "ne", "nv", "nh", "nj", "nm",
+    "ny", "nc", "nd", "oh", "ok", "or", "pa", "ri", "sc", "sd", "tn", "tx", "ut", "vt", "va", "wa",
+    "wv", "wi", "wy",
+}
+
+# On SQLite, timestamps are text compared as strings. Store and bind them to the second, in the
+# same format as the CURRENT_TIMESTAMP default, so rows written either way compare correctly.
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
+def normalize_equipment(equipment_type: Optional[str]) -> Optional[str]:
+    """'  Dry  Van ' -> 'dry van'"""
+    if equipment_type is None:
+        return None
+    return re.sub(r"\s+", " ", equipment_type).strip().lower()
+
+
+def normalize_location(location: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """Split free text like 'Chicago, IL' or 'Chicago IL' into lowercase (city, state)"""
+    if not location:
+        return None, None
+    text = re.sub(r"\s+", " ", location).strip().lower()
+    if "," in text:
+        city, _, state = text.rpartition(",")
+        return city.strip() or None, state.strip() or None
+    parts = text.rsplit(" ", 1)
+    if len(parts) == 2 and parts[1] in US_STATES:
+        return parts[0], parts[1]
+    return text or None, None
+
+
+def normalize_lane_preference(preference: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """normalize_location, with metro aliases like 'Chicagoland' mapped to their city"""
+    city, state = normalize_location(preference)
+    if city and not state:
+        place = gazetteer.alias(city)
+        if place is not None:
+            return place.city.lower(), place.state.lower()
+    return city, state
+
+
+def geocode_location(location: Optional[str]) -> Optional[tuple[float, float]]:
+    """(lat, lon) from the bundled gazetteer, or None when the place is unknown"""
+    place = gazetteer.lookup(*normalize_location(location))
+    return (place.lat, place.lon) if place is not None else None
+
+
+class LanePreference:
+    """
+    One end of a carrier's lane preference. Matches by name ('Chicago, IL',
+    'TX', 'Chicagoland'), or within radius_miles of the place when a radius
+    is given and the place is in the gazetteer.
+    """
+
+    def __init__(self, end: str, preference: str, radius_miles: Optional[float] = None):
+        self.end = end
+        self.preference = preference
+        self.city, self.state = normalize_lane_preference(preference)
+        self.point = geocode_location(preference)
+        self.area = None
+        if radius_miles and radius_miles > 0 and self.point is not None:
+            self.area = SearchArea(self.point[0], self.point[1], float(radius_miles))
+
+    def matches_name(self, city: Optional[str], state: Optional[str]) -> bool:
+        if self.state:
+            return city == self.city and state == self.state
+        if self.city and len(self.city) == 2 and self.city.isalpha():
+            return state == self.city or city == self.city
+        return city == self.city
+
+    def coordinates(self, load) -> tuple[Optional[float], Optional[float]]:
+        if self.end == "origin":
+            return load.origin_lat, load.origin_lon
+        return load.destination_lat, load.destination_lon
+
+    def matches(self, load) -> bool:
+        if self.area is not None:
+            return self.area.contains(*self.coordinates(load))
+        if self.end == "origin":
+            return self.matches_name(load.origin_city, load.origin_state)
+        return self.matches_name(load.destination_city, load.destination_state)
+
+
+def lane_preferences(origin: str, destination: str, origin_radius: Optional[float] = None,
+                     destination_radius: Optional[float] = None) -> list[LanePreference]:
+    """The lane ends a carrier actually specified"""
+    lanes = []
+    if origin:
+        lanes.append(LanePreference("origin", origin, origin_radius))
+    if destination:
+        lanes.append(LanePreference("destination", destination, destination_radius))
+    return lanes
+
+
+# Bump when load_search_fields or the gazetteer data changes, so the startup backfill recomputes every load
+SEARCH_FIELDS_VERSION = 1
+
+
+def load_search_fields(origin, destination, equipment_type, pickup_datetime) -> dict:
+    """Derived, indexable search columns for a load, stamped with SEARCH_FIELDS_VERSION"""
+    origin_city, origin_state = normalize_location(origin)
+    destination_city, destination_state = normalize_location(destination)
+    origin_lat, origin_lon = geocode_location(origin) or (None, None)
+    destination_lat, destination_lon = geocode_location(destination) or (None, None)
+    return {
+        "equipment_norm": normalize_equipment(equipment_type),
+        "origin_city": origin_city,
+        "origin_state": origin_state,
+        "destination_city": destination_city,
+        "destination_state": destination_state,
+        "pickup_date": pickup_datetime.date() if pickup_datetime else None,
+        "origin_lat": origin_lat,
+        "origin_lon": origin_lon,
+        "destination_lat": destination_lat,
+        "destination_lon": destination_lon,
+        "search_fields_version": SEARCH_FIELDS_VERSION,
+    }
 
 
 class Load(Base):
@@ -19,14 +146,51 @@ class Load(Base):
     num_of_pieces = Column(Integer, nullable=True)
     miles = Column(Integer, nullable=True)
     dimensions = Column(String, nullable=True)
-    status = Column(String, default="available")
+    status = Column(String, default="available")  # available, held, booked, expired
+    # Optimistic concurrency: bumped by every hold/release/booking
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    held_until = Column(DateTime, nullable=True, index=True)
+    held_by = Column(String, nullable=True)
+    # Digest of the feed-owned columns, set for loads written by the import/sync; NULL for hand-entered loads
+    content_hash = Column(String, nullable=True)
+
+    # Normalized copies of the free-text fields, maintained on every write
+    equipment_norm = Column(String, nullable=True)
+    origin_city = Column(String, nullable=True)
+    origin_state = Column(String, nullable=True)
+    destination_city = Column(String, nullable=True)
+    destination_state = Column(String, nullable=True)
+    pickup_date = Column(Date, nullable=True)
+    # Gazetteer coordinates for radius searches; NULL when the place is unknown
+    origin_lat = Column(Float, nullable=True)
+    origin_lon = Column(Float, nullable=True)
+    destination_lat = Column(Float, nullable=True)
+    destination_lon = Column(Float, nullable=True)
+    # SEARCH_FIELDS_VERSION the columns above were derived with; NULL for loads from before they existed
+    search_fields_version = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_loads_status_equipment_pickup", "status", "equipment_norm", "pickup_date"),
+        Index("ix_loads_status_origin", "status", "origin_city", "origin_state"),
+        Index("ix_loads_status_destination", "status", "destination_city", "destination_state"),
+        Index("ix_loads_status_origin_geo", "status", "origin_lat", "origin_lon"),
+        Index("ix_loads_status_destination_geo", "status", "destination_lat", "destination_lon"),
+    )
+
+
+@event.listens_for(Load, "before_insert")
+@event.listens_for(Load, "before_update")
+def _set_load_search_fields(mapper, connection, target):
+    for column, value in load_search_fields(target.origin, target.destination, target.equipment_type, target.pickup_datetime).items():
+        setattr(target, column, value)
 
 
 class CallLog(Base):
     __tablename__ = "call_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String, index=True)
+    # HappyRobot retries webhooks; one call log per call session
+    session_id = Column(String, unique=True, index=True)
     mc_number = Column(String, index=True)
     carrier_name = Column(String, index=True)
     load_id = Column(String, index=True)
@@ -34,6 +198,23 @@ class CallLog(Base):
     sentiment = Column(String, index=True)     
     call_summary = Column(Text)
     duration = Column(Integer) 
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(Timestamp, default=func.now(), index=True)
+
+    # Date-range analytics and call listings, overall and per carrier
+    __table_args__ = (Index("ix_call_logs_mc_number_created_at", "mc_number", "created_at"),)
+
 
+class CallMetricRollup(Base):
+    """Pre-aggregated call counters, one row per (bucket_type, bucket_key)"""
+    __tablename__ = "call_metric_rollups"
+    __table_args__ = (UniqueConstraint("bucket_type", "bucket_key", name="uq_call_metric_rollups_bucket"),)
 
+    id = Column(Integer, primary_key=True)
+    bucket_type = Column(String, nullable=False)  # all, day, hour, outcome, sentiment, carrier, mc, day_detail
+    bucket_key = Column(String, nullable=False)
+    calls = Column(Integer, nullable=False, default=0)
+    won = Column(Integer, nullable=False, default=0)
+    duration_sum = Column(Integer, nullable=False, default=0)
+    duration_count = Column(Integer, nullable=False, default=0)
+    duration_min = Column(Integer, nullable=True)
+    duration_max = Column(Integer, nullable=True)
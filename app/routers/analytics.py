@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Header, HTTPException, Query
+from typing import Optional
+import logging
+import os
+
+from dotenv import load_dotenv
+
+from app.database import get_async_db_context
+from app.services.call_analytics import CALLS_PAGE_SIZE, compute_analytics, list_calls
+
+load_dotenv()
+
+WEBHOOK_API_KEY = os.getenv("WEBHOOK_API_KEY")
+router = APIRouter()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+@router.get("/analytics")
+async def call_analytics(start: Optional[str] = None, end: Optional[str] = None, bucket: str = "day",
+                         outcome: Optional[list[str]] = Query(None), sentiment: Optional[list[str]] = Query(None),
+                         mc_number: Optional[str] = None, top: int = Query(5, ge=1, le=100),
+                         x_api_key: str = Header(None)):
+    """Call metrics for any date range [start, end), filtered and bucketed by hour, day or week"""
+
+    if x_api_key != WEBHOOK_API_KEY:
+        raise HTTPException(status_code=403, detail="Invalid API Key")
+
+    async with get_async_db_context() as db:
+        try:
+            return await db.run_sync(lambda session: compute_analytics(
+                session, start, end, bucket, outcome, sentiment, mc_number, top_carriers=top))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/calls")
+async def calls_listing(cursor: Optional[str] = None, limit: int = CALLS_PAGE_SIZE,
+                        start: Optional[str] = None, end: Optional[str] = None,
+                        outcome: Optional[list[str]] = Query(None), sentiment: Optional[list[str]] = Query(None),
+                        mc_number: Optional[str] = None, x_api_key: str = Header(None)):
+    """Call logs newest first; pass next_cursor back (with the same filters) for the following page"""
+
+    if x_api_key != WEBHOOK_API_KEY:
+        raise HTTPException(status_code=403, detail="Invalid API Key")
+
+    async with get_async_db_context() as db:
+        try:
+            return await db.run_sync(lambda session: list_calls(
+                session, cursor, limit, start=start, end=end, outcomes=outcome, sentiments=sentiment, mc_number=mc_number))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
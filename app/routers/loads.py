@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Request, Header, HTTPException
+from starlette.concurrency import run_in_threadpool
+from tempfile import SpooledTemporaryFile
+from typing import Optional
+import csv
+import io
+import logging
+import os
+
+from dotenv import load_dotenv
+
+from app.database import get_db_context
+from app.services.load_import import import_loads
+from app.services.streaming import iter_records
+
+load_dotenv()
+
+WEBHOOK_API_KEY = os.getenv("WEBHOOK_API_KEY")
+# Request bodies larger than this are spooled to a temporary file instead of memory
+LOAD_IMPORT_SPOOL_BYTES = int(os.getenv("LOAD_IMPORT_SPOOL_BYTES", str(1024 * 1024)))
+router = APIRouter()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def body_format(content_type: Optional[str], requested: Optional[str]) -> str:
+    """csv or json from ?format=, else from the Content-Type header"""
+    if requested:
+        if requested not in ("csv", "json", "ndjson"):
+            raise HTTPException(status_code=400, detail="format must be csv, json or ndjson")
+        return requested
+    if content_type and "csv" in content_type.lower():
+        return "csv"
+    return "json"
+
+def run_import(body, fmt: str) -> dict:
+    """Blocking part of the bulk import: parse the spooled body and upsert it"""
+    body.seek(0)
+    with io.TextIOWrapper(body, encoding="utf-8", newline="") as f, get_db_context() as db:
+        return import_loads(db, iter_records(f, fmt))
+
+@router.post("/loads/bulk")
+async def bulk_load_import(request: Request, format: Optional[str] = None,
+                           x_api_key: str = Header(None), content_type: str = Header(None)):
+    """Upsert loads from a CSV, JSON array or NDJSON body of any size"""
+
+    if x_api_key != WEBHOOK_API_KEY:
+        raise HTTPException(status_code=403, detail="Invalid API Key")
+
+    fmt = body_format(content_type, format)
+    body = SpooledTemporaryFile(max_size=LOAD_IMPORT_SPOOL_BYTES)
+    try:
+        async for chunk in request.stream():
+            body.write(chunk)
+        try:
+            stats = await run_in_threadpool(run_import, body, fmt)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            # Malformed JSON or text encoding; rows already committed stay imported
+            raise HTTPException(status_code=400, detail=f"Could not parse {fmt} body: {e}")
+    finally:
+        body.close()
+
+    logger.info("Bulk load import: %d imported, %d invalid of %d records in %ss (%d rows/s)",
+                stats["imported"], stats["invalid"], stats["read"], stats["seconds"], stats["rows_per_second"])
+    return {"status": "success", **stats}
@@ -1,22 +1,49 @@
 from fastapi import APIRouter, Request, Header, HTTPException
-from app.database import get_db_context
-from app.models.load import Load, CallLog
+from starlette.concurrency import run_in_threadpool
+from app.database import get_async_db_context
+from app.models.load import Load
 from dotenv import load_dotenv
 from app.services.fmcsa_verification import verify_mc_number
-from sqlalchemy import func
+from app.services.call_log_writer import call_log_writer
+from app.services.load_search import get_load_search, batch_load_search, parse_available_dates, load_total_rate
+from app.services.load_scoring import best_scored_loads
+from app.services.load_reservations import (
+    LOAD_HOLD_CANDIDATES, LOAD_HOLD_SECONDS, hold_first_available, release_session_holds, book_load,
+)
+from typing import Optional
 import json
 import os
 import logging
-from datetime import datetime
+import uuid
 
 load_dotenv() 
 
 WEBHOOK_API_KEY = os.getenv("WEBHOOK_API_KEY")
+# Largest number of carrier queries accepted by the batch load search endpoint
+LOAD_SEARCH_BATCH_MAX = int(os.getenv("LOAD_SEARCH_BATCH_MAX", "500"))
+# Hold offered loads so concurrent calls cannot both win the same one
+LOAD_HOLDS_ENABLED = os.getenv("LOAD_HOLDS_ENABLED", "true").lower() in ("1", "true", "yes")
 router = APIRouter()
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+def log_request(name: str, payload):
+    """Full webhook payloads are only serialized when DEBUG logging is on"""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s request: %s", name, json.dumps(payload))
+
+def parse_radius(value) -> Optional[float]:
+    """Positive radius in miles, or None for name-only lane matching"""
+    if value in (None, ""):
+        return None
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        logger.warning("Invalid radius %r, matching lanes by name", value)
+        return None
+    return radius if radius > 0 else None
+
 @router.post("/webhook/happyrobot/verify_mc")
 async def verify_mc_endpoint(request: Request, x_api_key: str = Header(None)):
     """Dedicated endpoint for MC verification"""
@@ -25,7 +52,7 @@ async def verify_mc_endpoint(request: Request, x_api_key: str = Header(None)):
         raise HTTPException(status_code=403, detail="Invalid API Key")
 
     payload = await request.json()
-    logger.info(f"MC Verification request: {json.dumps(payload, indent=2)}")
+    log_request("MC verification", payload)
     
     mc_number = payload.get("mc_number", "")
     
@@ -37,17 +64,26 @@ async def verify_mc_endpoint(request: Request, x_api_key: str = Header(None)):
         }
     
     # Verify MC number
-    is_verified, carrier_name = verify_mc_number(mc_number)
-    
-    logger.info(f"MC {mc_number} verification result: {is_verified}, Carrier: {carrier_name}")
-    
-    if is_verified:
+    result = await verify_mc_number(mc_number)
+    carrier_name = result.carrier_name
+
+    logger.info("MC %s verification result: %s, Carrier: %s", mc_number, result.status, carrier_name,
+                extra={"mc_number": mc_number, "verification_status": result.status})
+
+    if result.verified:
         return {
             "verified": True,
             "message": "MC number verified successfully",
             "carrier_name": carrier_name,
             "say": f"Excellent! Your MC number {mc_number} has been verified. Welcome, {carrier_name}! You're eligible to work with us. Let me search for available loads that match your equipment."
         }
+    elif result.status == "pending":
+        return {
+            "verified": False,
+            "verification_pending": True,
+            "message": "MC number verification pending",
+            "say": "I wasn't able to complete the verification of your MC number just now. Let me look for loads for you in the meantime, and we'll confirm your eligibility before booking."
+        }
     else:
         return {
             "verified": False,
@@ -55,6 +91,140 @@ async def verify_mc_endpoint(request: Request, x_api_key: str = Header(None)):
             "say": "I'm sorry, but your MC number is not eligible to work with us at this time. Please contact our compliance department for more information."
         }
 
+def match_load(search, payload: dict, db=None, hold_for: Optional[str] = None) -> dict:
+    """
+    Match one carrier capability payload against a search backend and build
+    the voice-agent response. Shared by the single and batch endpoints.
+    With hold_for, the offered load is held for that caller so concurrent
+    calls are not offered the same load.
+    """
+    # Extract search criteria from carrier
+    equipment_type = payload.get("equipment_type", "")
+    origin_preference = payload.get("origin", "")
+    destination_preference = payload.get("destination", "")
+    weight_capacity = payload.get("weight_capacity", 0)  # Carrier's weight capacity
+    available_dates = payload.get("available_dates", [])  # List of dates when carrier is available
+    # Optional deadhead radius around origin/destination, in miles
+    origin_radius = parse_radius(payload.get("origin_radius_miles"))
+    destination_radius = parse_radius(payload.get("destination_radius_miles"))
+    
+    logger.info("Carrier capabilities - Equipment: %s, Origin: %s (radius %s), Destination: %s (radius %s), Weight Capacity: %s lbs, Available Dates: %s",
+                equipment_type, origin_preference, origin_radius, destination_preference, destination_radius, weight_capacity, available_dates)
+
+    # STEP 1: Check if equipment type exists at all
+    if equipment_type:
+        if not search.equipment_available(equipment_type):
+            logger.warning("Equipment type '%s' does not exist in database", equipment_type)
+            return {
+                "load_found": False,
+                "message": "Equipment type not available",
+                "say": f"I'm sorry, but we don't have any {equipment_type} equipment available. Our available equipment types are: Dry Van, Flatbed, Reefer, and Power Only. Would you like to search for loads with any of these equipment types?"
+            }
+    
+    # STEP 2: Find the best-paying load across ALL available dates in one ranked pass
+    load = None
+    target_dates = parse_available_dates(available_dates)
+    holding = db is not None and hold_for is not None
+    best_loads = best_scored_loads(
+        search,
+        equipment_type=equipment_type,
+        origin=origin_preference,
+        destination=destination_preference,
+        weight_capacity=weight_capacity,
+        dates=target_dates,
+        limit=LOAD_HOLD_CANDIDATES if holding else 1,
+        origin_radius=origin_radius,
+        destination_radius=destination_radius,
+    )
+    if holding:
+        best_loads = [held for held in [hold_first_available(db, best_loads, hold_for)] if held]
+    if best_loads:
+        load = best_loads[0]
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Selected absolute best load: ID %s on %s with total rate $%s",
+                        load.load_id, load.pickup_datetime.date(), f"{load_total_rate(load):,.2f}")
+    else:
+        logger.info("No loads found for any of the available dates")
+    
+    # STEP 3: If no exact match, try partial matches for location only (equipment type already verified)
+    if not load:
+        logger.info("No exact match found, trying partial matches for location...")
+        for _ in range(LOAD_HOLD_CANDIDATES if holding else 1):
+            load = search.partial_match(equipment_type, origin_preference, destination_preference,
+                                        origin_radius=origin_radius, destination_radius=destination_radius)
+            if not load or not holding or hold_first_available(db, [load], hold_for):
+                break
+            load = None
+        
+        # If still no match, return no loads found message
+        if not load:
+            logger.warning("No matching loads found for the criteria")
+            criteria_parts = []
+            if equipment_type:
+                criteria_parts.append(f"{equipment_type} equipment")
+            if weight_capacity:
+                criteria_parts.append(f"weight capacity {weight_capacity} lbs")
+            if available_dates:
+                criteria_parts.append(f"available {', '.join(available_dates)}")
+            if origin_preference:
+                criteria_parts.append(f"from {origin_preference}" + (f" (within {origin_radius:g} miles)" if origin_radius else ""))
+            if destination_preference:
+                criteria_parts.append(f"to {destination_preference}" + (f" (within {destination_radius:g} miles)" if destination_radius else ""))
+            
+            criteria_text = ", ".join(criteria_parts) if criteria_parts else "your criteria"
+            
+            return {
+                "load_found": False,
+                "message": "No matching loads found",
+                "say": f"I'm sorry, but I couldn't find any loads matching {criteria_text}. Would you like me to search for other available loads?"
+            }
+    
+    # STEP 5: Return the best load found
+    if load:
+        logger.info("Load found: ID %s, Equipment: %s, Commodity: %s, Origin: %s, Destination: %s",
+                    load.load_id, load.equipment_type, load.commodity_type, load.origin, load.destination,
+                    extra={"load_id": load.load_id})
+        
+        # Calculate pricing based on the load details
+        base_rate = load.loadboard_rate
+        miles = getattr(load, 'miles', 0) or 0
+        
+        # Calculate total rate based on miles and rate per mile
+        if miles > 0:
+            total_rate = base_rate * miles
+            per_mile_rate = f" (${base_rate:.2f} per mile)"
+        else:
+            total_rate = base_rate
+            per_mile_rate = ""
+        
+        # Format the response message - tell carrier what they'll be carrying
+        commodity_info = f"You'll be carrying {load.commodity_type}" if load.commodity_type else "You'll be carrying freight"
+        pieces_info = f" ({load.num_of_pieces} pieces)" if getattr(load, 'num_of_pieces', None) else ""
+        
+        return {
+            "status": "success",
+            "message": "Load found",
+            "say": f"I found the best load for you! Load ID {load.load_id}, from {load.origin} to {load.destination}, pickup on {load.pickup_datetime.strftime('%Y-%m-%d %H:%M')}, delivery on {load.delivery_datetime.strftime('%Y-%m-%d %H:%M')}. {commodity_info}{pieces_info} weighing {load.weight:,} lbs. Your {equipment_type} can handle this perfectly! The total rate is ${total_rate:,.2f}{per_mile_rate}. Are you interested in this load?",
+            "load_found": True,
+            "load_id": load.load_id,
+            "base_rate": base_rate,
+            "total_rate": total_rate,
+            "per_mile_rate": per_mile_rate.strip(),
+            "origin": load.origin,
+            "destination": load.destination,
+            "weight": load.weight,
+            "commodity": load.commodity_type,
+            "num_of_pieces": getattr(load, 'num_of_pieces', None),
+            **({"hold_id": hold_for, "hold_seconds": LOAD_HOLD_SECONDS} if holding else {})
+        }
+    else:
+        return {
+            "status": "no_loads",
+            "message": "No matching loads found",
+            "say": f"I don't have any loads that match your {equipment_type} equipment and preferences right now. Would you like me to check for loads in different areas or with different equipment requirements?",
+            "load_found": False
+        }
+
 @router.post("/webhook/happyrobot/load_search")
 async def search_load_endpoint(request: Request, x_api_key: str = Header(None)):
     """Dedicated endpoint for load search"""
@@ -64,187 +234,77 @@ async def search_load_endpoint(request: Request, x_api_key: str = Header(None)):
         raise HTTPException(status_code=403, detail="Invalid API Key")
     
     payload = await request.json()
-    logger.info(f"Load search request: {json.dumps(payload, indent=2)}")
-    
-    # Extract search criteria from carrier
-    equipment_type = payload.get("equipment_type", "")
-    origin_preference = payload.get("origin", "")
-    destination_preference = payload.get("destination", "")
-    weight_capacity = payload.get("weight_capacity", 0)  # Carrier's weight capacity
-    available_dates = payload.get("available_dates", [])  # List of dates when carrier is available
-    
-    logger.info(f"Carrier capabilities - Equipment: {equipment_type}, Origin: {origin_preference}, Destination: {destination_preference}, Weight Capacity: {weight_capacity} lbs, Available Dates: {available_dates}")
+    log_request("Load search", payload)
     
+    # Hold the offered load for this call until the summary books or releases it
+    hold_for = (payload.get("session_id") or uuid.uuid4().hex) if LOAD_HOLDS_ENABLED else None
+
     # Find best matching load
-    with get_db_context() as db:
+    async with get_async_db_context() as db:
         try:
-            # STEP 1: Check if equipment type exists at all
-            if equipment_type:
-                equipment_exists = db.query(Load).filter(
-                    Load.status == "available",
-                    Load.equipment_type.ilike(equipment_type)
-                ).first()
-                
-                if not equipment_exists:
-                    logger.warning(f"Equipment type '{equipment_type}' does not exist in database")
-                    return {
-                        "load_found": False,
-                        "message": "Equipment type not available",
-                        "say": f"I'm sorry, but we don't have any {equipment_type} equipment available. Our available equipment types are: Dry Van, Flatbed, Reefer, and Power Only. Would you like to search for loads with any of these equipment types?"
-                    }
-            
-            # STEP 2: Find loads matching carrier's criteria - check ALL dates for best rate
-            load = None
-            best_total_rate = 0
-            all_candidate_loads = []
-            
-            # Check each available date and collect all matching loads
-            for available_date in available_dates:
-                logger.info(f"Checking loads for date: {available_date}")
-                
-                base_query = db.query(Load).filter(Load.status == "available")
-                
-                if equipment_type:
-                    base_query = base_query.filter(Load.equipment_type.ilike(equipment_type))
-                if origin_preference:
-                    base_query = base_query.filter(Load.origin.ilike(f"%{origin_preference}%"))
-                if destination_preference:
-                    base_query = base_query.filter(Load.destination.ilike(f"%{destination_preference}%"))
-                
-                # Match pickup date - convert to datetime for proper comparison
-                try:
-                    target_date = datetime.strptime(available_date, "%Y-%m-%d").date()
-                    base_query = base_query.filter(func.date(Load.pickup_datetime) == target_date)
-                    logger.info(f"Filtering loads for pickup date: {target_date}")
-                except ValueError:
-                    logger.warning(f"Invalid date format: {available_date}, skipping date filter")
-                    continue
-                
-                # Filter by weight capacity
-                if weight_capacity > 0:
-                    base_query = base_query.filter(Load.weight <= weight_capacity)
-                
-                # Get all loads for this date
-                loads = base_query.all()
-                if loads:
-                    logger.info(f"Found {len(loads)} loads for date {available_date}")
-                    all_candidate_loads.extend(loads)
-                else:
-                    logger.info(f"No loads found for date {available_date}")
-            
-            # Now find the absolute best load across ALL dates
-            if all_candidate_loads:
-                logger.info(f"Evaluating {len(all_candidate_loads)} total loads across all dates")
-                
-                for candidate_load in all_candidate_loads:
-                    base_rate = candidate_load.loadboard_rate
-                    miles = getattr(candidate_load, 'miles', 0) or 0
-                    total_rate = base_rate * miles if miles > 0 else base_rate
-                    
-                    if total_rate > best_total_rate:
-                        best_total_rate = total_rate
-                        load = candidate_load
-                        logger.info(f"Found better load: ID {candidate_load.load_id} on {candidate_load.pickup_datetime.date()} with total rate ${total_rate:,.2f}")
-                
-                if load:
-                    logger.info(f"Selected absolute best load: ID {load.load_id} on {load.pickup_datetime.date()} with total rate ${best_total_rate:,.2f}")
-            else:
-                logger.info("No loads found for any of the available dates")
-            
-            # STEP 3: If no exact match, try partial matches for location only (equipment type already verified)
-            if not load:
-                logger.info("No exact match found, trying partial matches for location...")
-                partial_query = db.query(Load).filter(
-                    Load.status == "available",
-                    Load.equipment_type.ilike(equipment_type) if equipment_type else True
-                )
-                
-                # Try partial matches for origin/destination only
-                if origin_preference or destination_preference:
-                    from sqlalchemy import or_
-                    conditions = []
-                    if origin_preference:
-                        conditions.append(Load.origin.ilike(f"%{origin_preference}%"))
-                    if destination_preference:
-                        conditions.append(Load.destination.ilike(f"%{destination_preference}%"))
-                    
-                    partial_query = partial_query.filter(or_(*conditions))
-                    load = partial_query.first()
-                
-                # If still no match, return no loads found message
-                if not load:
-                    logger.warning("No matching loads found for the criteria")
-                    criteria_parts = []
-                    if equipment_type:
-                        criteria_parts.append(f"{equipment_type} equipment")
-                    if weight_capacity:
-                        criteria_parts.append(f"weight capacity {weight_capacity} lbs")
-                    if available_dates:
-                        criteria_parts.append(f"available {', '.join(available_dates)}")
-                    if origin_preference:
-                        criteria_parts.append(f"from {origin_preference}")
-                    if destination_preference:
-                        criteria_parts.append(f"to {destination_preference}")
-                    
-                    criteria_text = ", ".join(criteria_parts) if criteria_parts else "your criteria"
-                    
-                    return {
-                        "load_found": False,
-                        "message": "No matching loads found",
-                        "say": f"I'm sorry, but I couldn't find any loads matching {criteria_text}. Would you like me to search for other available loads?"
-                    }
-            
-            # STEP 5: Return the best load found
-            if load:
-                logger.info(f"Load found: ID {load.load_id}, Equipment: {load.equipment_type}, Commodity: {load.commodity_type}, Origin: {load.origin}, Destination: {load.destination}")
-                
-                # Calculate pricing based on the load details
-                base_rate = load.loadboard_rate
-                miles = getattr(load, 'miles', 0) or 0
-                
-                # Calculate total rate based on miles and rate per mile
-                if miles > 0:
-                    total_rate = base_rate * miles
-                    per_mile_rate = f" (${base_rate:.2f} per mile)"
-                else:
-                    total_rate = base_rate
-                    per_mile_rate = ""
-                
-                # Format the response message - tell carrier what they'll be carrying
-                commodity_info = f"You'll be carrying {load.commodity_type}" if load.commodity_type else "You'll be carrying freight"
-                pieces_info = f" ({load.num_of_pieces} pieces)" if getattr(load, 'num_of_pieces', None) else ""
-                
-                return {
-                    "status": "success",
-                    "message": "Load found",
-                    "say": f"I found the best load for you! Load ID {load.load_id}, from {load.origin} to {load.destination}, pickup on {load.pickup_datetime.strftime('%Y-%m-%d %H:%M')}, delivery on {load.delivery_datetime.strftime('%Y-%m-%d %H:%M')}. {commodity_info}{pieces_info} weighing {load.weight:,} lbs. Your {equipment_type} can handle this perfectly! The total rate is ${total_rate:,.2f}{per_mile_rate}. Are you interested in this load?",
-                    "load_found": True,
-                    "load_id": load.load_id,
-                    "base_rate": base_rate,
-                    "total_rate": total_rate,
-                    "per_mile_rate": per_mile_rate.strip(),
-                    "origin": load.origin,
-                    "destination": load.destination,
-                    "weight": load.weight,
-                    "commodity": load.commodity_type,
-                    "num_of_pieces": getattr(load, 'num_of_pieces', None)
-                }
-            else:
-                return {
-                    "status": "no_loads",
-                    "message": "No matching loads found",
-                    "say": f"I don't have any loads that match your {equipment_type} equipment and preferences right now. Would you like me to check for loads in different areas or with different equipment requirements?",
-                    "load_found": False
-                }
-                
+            return await db.run_sync(lambda session: match_load(get_load_search(session), payload, db=session, hold_for=hold_for))
         except Exception as e:
-            logger.error(f"Error searching loads: {e}")
+            logger.error("Error searching loads: %s", e)
             return {
                 "status": "error",
                 "message": f"Failed to search loads: {str(e)}",
                 "say": "I'm sorry, there was an error searching for loads. Please try again."
             }
 
+def match_batch(search, queries: list) -> list[dict]:
+    """match_load for each query in order; a query that fails gets an error result of its own"""
+    results = []
+    for query in queries:
+        try:
+            result = match_load(search, query)
+        except Exception as e:
+            logger.error("Error searching loads: %s", e)
+            result = {
+                "status": "error",
+                "message": f"Failed to search loads: {str(e)}",
+                "say": "I'm sorry, there was an error searching for loads. Please try again."
+            }
+        if isinstance(query, dict) and "query_id" in query:
+            result = {"query_id": query["query_id"], **result}
+        results.append(result)
+    return results
+
+@router.post("/webhook/happyrobot/load_search/batch")
+async def batch_load_search_endpoint(request: Request, x_api_key: str = Header(None)):
+    """Run many carrier load searches against one shared candidate set"""
+
+    # Verify API key
+    if x_api_key != WEBHOOK_API_KEY:
+        raise HTTPException(status_code=403, detail="Invalid API Key")
+
+    payload = await request.json()
+    queries = payload.get("queries") if isinstance(payload, dict) else None
+    if not isinstance(queries, list) or not queries:
+        raise HTTPException(status_code=400, detail="queries must be a non-empty list")
+    if len(queries) > LOAD_SEARCH_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {LOAD_SEARCH_BATCH_MAX} queries per batch")
+    logger.info("Batch load search request: %d queries", len(queries))
+
+    async with get_async_db_context() as db:
+        try:
+            search = await db.run_sync(batch_load_search, queries)
+        except Exception as e:
+            logger.error("Error loading batch search candidates: %s", e)
+            return {
+                "status": "error",
+                "message": f"Failed to search loads: {str(e)}",
+                "results": []
+            }
+
+    # Matching is CPU-bound; keep it off the event loop so streams and other webhooks keep being served
+    results = await run_in_threadpool(match_batch, search, queries)
+
+    return {
+        "status": "success",
+        "count": len(results),
+        "results": results
+    }
+
 @router.post("/webhook/happyrobot/summary")
 async def summary_endpoint(request: Request, x_api_key: str = Header(None)):
     """Endpoint to save call summary, outcome, and sentiment"""
@@ -254,7 +314,7 @@ async def summary_endpoint(request: Request, x_api_key: str = Header(None)):
         raise HTTPException(status_code=403, detail="Invalid API Key")
     
     payload = await request.json()
-    logger.info(f"Summary request: {json.dumps(payload, indent=2)}")
+    log_request("Summary", payload)
     
     # Extract summary data
     summary = payload.get("summary", "")
@@ -264,33 +324,66 @@ async def summary_endpoint(request: Request, x_api_key: str = Header(None)):
     mc_number = payload.get("mc_number", "")
     carrier_name = payload.get("carrier_name", "")
     duration = payload.get("duration", 0)
+    load_id = payload.get("load_id")
+    hold_id = payload.get("hold_id") or session_id
+    logger.info("Call summary for session %s: outcome %s, sentiment %s", session_id, call_outcome, sentiment,
+                extra={"session_id": session_id, "call_outcome": call_outcome})
+
+    # Only numeric load ids can be booked; others are still logged as sent
+    try:
+        booking_id = int(load_id) if load_id is not None else None
+    except (TypeError, ValueError):
+        logger.warning("Summary for session %s names load %r, which is not a load id; not booking it", session_id, load_id)
+        booking_id = None
     
-    with get_db_context() as db:
-        try:
-            # Create new CallLog entry
-            call_log = CallLog(
-                session_id=session_id,
-                mc_number=mc_number,
-                carrier_name=carrier_name,
-                call_outcome=call_outcome,
-                sentiment=sentiment,
-                duration=duration,
-                call_summary=summary
-            )
-            
-            db.add(call_log)
-            db.commit()
+    try:
+        # Acknowledged once spooled; the background writer inserts it with the next batch
+        queued = await call_log_writer.submit(
+            session_id=session_id,
+            mc_number=mc_number,
+            carrier_name=carrier_name,
+            call_outcome=call_outcome,
+            sentiment=sentiment,
+            duration=duration,
+            call_summary=summary,
+            load_id=str(load_id) if load_id is not None else None
+        )
 
+        if queued is None:
+            # HappyRobot retried a summary we already acknowledged; it was recorded (and booked) once
+            logger.info("Duplicate summary for session %s ignored", session_id, extra={"session_id": session_id})
             return {
                 "status": "success",
                 "message": "Call summary saved successfully",
-                "say": "Thank you for the call summary. The information has been recorded."
-            }
-            
-        except Exception as e:
-            logger.error(f"Error saving call summary: {e}")
-            return {
-                "status": "error",
-                "message": f"Failed to save call summary: {str(e)}",
-                "say": "There was an error saving the call summary."
+                "say": "Thank you for the call summary. The information has been recorded.",
+                "duplicate": True
             }
+
+        # Book the offered load on a win; every other load held during the call goes back on the board
+        load_booked = None
+        if hold_id:
+            # The summary is already saved, so a failure here must not be reported as one
+            try:
+                async with get_async_db_context() as db:
+                    if call_outcome == "won" and booking_id is not None:
+                        load_booked = await db.run_sync(book_load, booking_id, hold_id)
+                        if not load_booked:
+                            logger.warning("Load %s could not be booked for %s; it was taken or removed", load_id, hold_id)
+                    await db.run_sync(release_session_holds, hold_id, booking_id if load_booked else None)
+            except Exception as e:
+                logger.error("Failed to settle load holds for %s: %s", hold_id, e)
+
+        return {
+            "status": "success",
+            "message": "Call summary saved successfully",
+            "say": "Thank you for the call summary. The information has been recorded.",
+            **({"load_booked": load_booked} if load_booked is not None else {})
+        }
+
+    except Exception as e:
+        logger.error("Error saving call summary: %s", e)
+        return {
+            "status": "error",
+            "message": f"Failed to save call summary: {str(e)}",
+            "say": "There was an error saving the call summary."
+        }
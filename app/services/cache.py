@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidateCache:
+    """
+    Single-value cache shared by every request in the worker.
+
+    Fresh values (younger than ttl) are served directly. Values up to
+    ttl + stale_ttl old are served immediately while one background task
+    recomputes them. Older or missing values are computed once, with all
+    concurrent callers awaiting the same computation.
+
+    version counts the distinct values computed, so it can serve as a
+    validator that is checked without reading the value (see peek()).
+    """
+
+    def __init__(self, loader: Callable[[], Any], ttl: float, stale_ttl: float):
+        """loader is a coroutine function, or a blocking function run in the threadpool"""
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._value = None
+        self._computed_at: Optional[float] = None
+        self._fresh = False
+        self._generation = 0
+        self.version = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def invalidate(self):
+        """Mark the cached value stale; the next request triggers a refresh"""
+        self._generation += 1
+        self._fresh = False
+
+    def age(self) -> Optional[float]:
+        if self._computed_at is None:
+            return None
+        return time.monotonic() - self._computed_at
+
+    async def _refresh(self):
+        generation = self._generation
+        if asyncio.iscoroutinefunction(self.loader):
+            value = await self.loader()
+        else:
+            value = await run_in_threadpool(self.loader)
+        if value != self._value:
+            self.version += 1
+        self._value = value
+        self._computed_at = time.monotonic()
+        # A write that landed while we were computing leaves the result stale
+        self._fresh = generation == self._generation
+        return value
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+            self._refresh_task.add_done_callback(self._log_refresh_error)
+        return self._refresh_task
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Cache refresh failed: %s", task.exception())
+
+    def peek(self) -> Optional[tuple[int, str, float]]:
+        """
+        (version, status, age) of the held value without computing anything,
+        or None when it misses an invalidate() or has expired and only get()
+        can answer. Past ttl the background refresh get() would start is
+        started here too.
+        """
+        age = self.age()
+        if age is None or not self._fresh or age >= self.ttl + self.stale_ttl:
+            return None
+        if age < self.ttl:
+            return self.version, "HIT", age
+        self._start_refresh()
+        return self.version, "STALE", age
+
+    async def get(self) -> tuple[Any, str, float]:
+        """Returns (value, status, age_seconds) where status is HIT, STALE or MISS"""
+        age = self.age()
+        if age is not None:
+            if self._fresh and age < self.ttl:
+                self.hits += 1
+                return self._value, "HIT", age
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._start_refresh()
+                return self._value, "STALE", age
+
+        self.misses += 1
+        value = await asyncio.shield(self._start_refresh())
+        return value, "MISS", 0.0
+
+    async def latest(self) -> Any:
+        """
+        Value reflecting every invalidate() so far, joining a refresh already
+        in flight. A refresh that started before the last invalidate is
+        followed by one more; writes racing that one are left to the next call.
+        """
+        for _ in range(2):
+            age = self.age()
+            if self._fresh and age is not None and age < self.ttl:
+                break
+            await asyncio.shield(self._start_refresh())
+        return self._value
+
+    def headers(self, status: str, age: float) -> dict:
+        return {
+            "X-Cache": status,
+            "X-Cache-Age": f"{age:.1f}",
+            "X-Cache-Hits": str(self.hits + self.stale_hits),
+            "X-Cache-Misses": str(self.misses),
+        }
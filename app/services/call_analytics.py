@@ -0,0 +1,281 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Union
+import base64
+import json
+import logging
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.load import CallLog, CallMetricRollup
+from app.services.call_metrics import day_detail_key_range, decode_key, encode_key
+
+BUCKET_SIZES = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+BUCKETS = tuple(BUCKET_SIZES)
+# Caps hour buckets at roughly half a year per request
+ANALYTICS_MAX_BUCKETS = 5000
+# Range used when the caller gives no start
+DEFAULT_RANGE_DAYS = 7
+CALLS_PAGE_SIZE = 50
+CALLS_MAX_PAGE_SIZE = 500
+CALL_FIELDS = ("id", "session_id", "mc_number", "carrier_name", "load_id", "call_outcome", "sentiment",
+               "duration", "call_summary", "created_at")
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, like every timestamp in the database"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_time(value: Union[datetime, str, None]) -> Optional[datetime]:
+    """Query parameter as naive UTC: a date (midnight) or an ISO timestamp, with Z or an offset"""
+    if value is None or isinstance(value, datetime):
+        return to_utc(value)
+    raw = str(value).strip()
+    try:
+        return to_utc(datetime.fromisoformat(raw[:-1] + "+00:00" if raw.endswith("Z") else raw))
+    except ValueError:
+        raise ValueError(f"invalid date or timestamp {raw!r}")
+
+
+def time_bucket(db: Session, bucket: str):
+    """
+    SQL expression truncating created_at to the start of its hour, day or
+    (Monday-based) week; date_trunc on PostgreSQL, strftime/date on SQLite.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(bucket, CallLog.created_at)
+    if bucket == "hour":
+        return func.strftime("%Y-%m-%d %H:00:00", CallLog.created_at)
+    if bucket == "day":
+        return func.date(CallLog.created_at)
+    # Forward to Sunday (or stay on it), then back to that week's Monday
+    return func.date(CallLog.created_at, "weekday 0", "-6 days")
+
+
+def bucket_start(value) -> str:
+    """ISO timestamp for a bucket, whichever type the dialect returned it as"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value.isoformat()
+
+
+def call_filters(start: Union[datetime, str, None] = None, end: Union[datetime, str, None] = None,
+                 outcomes: Optional[list[str]] = None, sentiments: Optional[list[str]] = None,
+                 mc_number: Optional[str] = None) -> list:
+    """WHERE clauses for a created_at range [start, end) and optional outcome, sentiment and carrier filters"""
+    conditions = []
+    if start is not None:
+        conditions.append(CallLog.created_at >= parse_time(start))
+    if end is not None:
+        conditions.append(CallLog.created_at < parse_time(end))
+    if outcomes:
+        conditions.append(CallLog.call_outcome.in_(outcomes))
+    if sentiments:
+        conditions.append(CallLog.sentiment.in_(sentiments))
+    if mc_number:
+        conditions.append(CallLog.mc_number == mc_number)
+    return conditions
+
+
+def _day_bucket(day: date, bucket: str) -> str:
+    """bucket_start() of the day or (Monday) week containing day"""
+    if bucket == "week":
+        day -= timedelta(days=day.weekday())
+    return datetime.combine(day, time.min).isoformat()
+
+
+def _top_carriers(db: Session, start: datetime, end: datetime, conditions: list, limit: int,
+                  filtered: bool) -> list[dict]:
+    """
+    Carriers with the most calls in the range. When the range spans every
+    call and nothing is filtered, the ranking is read from the mc rollups;
+    otherwise calls are counted on the (mc_number, created_at) index, which
+    covers that query. Names and wins are then read for the winners only.
+    """
+    oldest = db.query(func.min(CallLog.created_at)).scalar()
+    newest = db.query(func.max(CallLog.created_at)).scalar()
+    whole_history = (
+        not filtered and oldest is not None and start <= oldest and newest < end
+        and db.query(CallLog.id).filter(CallLog.created_at.is_(None)).first() is None
+    )
+    calls = func.count(CallLog.id).label("calls")
+    won = func.coalesce(func.sum(case((CallLog.call_outcome == "won", 1), else_=0)), 0).label("won")
+    if whole_history:
+        ranked = {
+            decode_key(row.bucket_key): (row.calls, row.won) for row in
+            db.query(CallMetricRollup.bucket_key, CallMetricRollup.calls, CallMetricRollup.won)
+            .filter(CallMetricRollup.bucket_type == "mc", CallMetricRollup.bucket_key != encode_key(None))
+            .order_by(CallMetricRollup.calls.desc(), CallMetricRollup.bucket_key)
+            .limit(limit)
+        }
+        names = dict(
+            db.query(CallLog.mc_number, func.max(CallLog.carrier_name))
+            .filter(CallLog.mc_number.in_(list(ranked)))
+            .group_by(CallLog.mc_number)
+        ) if ranked else {}
+        return [{"mc_number": mc, "carrier_name": names.get(mc), "call_count": counts[0], "won_count": counts[1]}
+                for mc, counts in ranked.items()]
+
+    leaders = [
+        row.mc_number for row in
+        db.query(CallLog.mc_number, calls)
+        .filter(CallLog.mc_number.is_not(None), *conditions)
+        .group_by(CallLog.mc_number)
+        .order_by(calls.desc(), CallLog.mc_number)
+        .limit(limit)
+    ]
+    if not leaders:
+        return []
+    carriers = {
+        row.mc_number: row for row in
+        db.query(CallLog.mc_number, func.max(CallLog.carrier_name).label("carrier_name"), calls, won)
+        .filter(CallLog.mc_number.in_(leaders), *conditions)
+        .group_by(CallLog.mc_number)
+    }
+    return [{"mc_number": mc, "carrier_name": carriers[mc].carrier_name, "call_count": carriers[mc].calls,
+             "won_count": int(carriers[mc].won)} for mc in leaders]
+
+
+def compute_analytics(db: Session, start: Union[datetime, str, None] = None, end: Union[datetime, str, None] = None,
+                      bucket: str = "day", outcomes: Optional[list[str]] = None,
+                      sentiments: Optional[list[str]] = None, mc_number: Optional[str] = None,
+                      top_carriers: int = 5) -> dict:
+    """
+    Call counts, wins and durations over [start, end) (default: the last
+    week), as a time series in hour/day/week buckets plus breakdowns by
+    outcome, sentiment and carrier.
+
+    Day and week series read whole days from the day_detail rollups, so
+    their cost follows the number of days rather than calls; partial first
+    and last days, hour buckets and single-carrier requests are grouped
+    from call_logs over the created_at or (mc_number, created_at) index.
+    """
+    end = parse_time(end) or datetime.utcnow()
+    start = parse_time(start) or end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start >= end:
+        raise ValueError("start must be before end")
+    bucket_column = time_bucket(db, bucket).label("bucket")
+    if (end - start) / BUCKET_SIZES[bucket] > ANALYTICS_MAX_BUCKETS:
+        raise ValueError(f"at most {ANALYTICS_MAX_BUCKETS} {bucket} buckets per request; use a coarser bucket")
+
+    series = {}
+    by_outcome = {}
+    by_sentiment = {}
+
+    def add(key, outcome, sentiment, calls, won, duration_sum, duration_count):
+        point = series.setdefault(key, {"calls": 0, "won": 0, "duration_sum": 0, "duration_count": 0})
+        point["calls"] += calls
+        point["won"] += won
+        point["duration_sum"] += duration_sum or 0
+        point["duration_count"] += duration_count
+        by_outcome[outcome] = by_outcome.get(outcome, 0) + calls
+        by_sentiment[sentiment] = by_sentiment.get(sentiment, 0) + calls
+
+    def add_calls(range_start, range_end):
+        if range_start >= range_end:
+            return
+        grouped = (
+            db.query(bucket_column, CallLog.call_outcome, CallLog.sentiment, func.count(CallLog.id).label("calls"),
+                     func.sum(CallLog.duration).label("duration_sum"), func.count(CallLog.duration).label("duration_count"))
+            .filter(*call_filters(range_start, range_end, outcomes, sentiments, mc_number))
+            .group_by(bucket_column, CallLog.call_outcome, CallLog.sentiment)
+        )
+        for row in grouped:
+            won = row.calls if row.call_outcome == "won" else 0
+            add(bucket_start(row.bucket), row.call_outcome, row.sentiment, row.calls, won, row.duration_sum, row.duration_count)
+
+    def add_rollups(first_day, end_day):
+        low, high = day_detail_key_range(first_day, end_day)
+        rows = db.query(CallMetricRollup.bucket_key, CallMetricRollup.calls, CallMetricRollup.won,
+                        CallMetricRollup.duration_sum, CallMetricRollup.duration_count).filter(
+            CallMetricRollup.bucket_type == "day_detail",
+            CallMetricRollup.bucket_key >= low,
+            CallMetricRollup.bucket_key < high,
+        )
+        for row in rows:
+            day, outcome, sentiment = decode_key(row.bucket_key)
+            if (outcomes and outcome not in outcomes) or (sentiments and sentiment not in sentiments):
+                continue
+            add(_day_bucket(date.fromisoformat(day), bucket), outcome, sentiment,
+                row.calls, row.won, row.duration_sum, row.duration_count)
+
+    first_day = start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+    end_day = end.date()
+    if bucket != "hour" and not mc_number and first_day < end_day:
+        add_calls(start, datetime.combine(first_day, time.min))
+        add_rollups(first_day, end_day)
+        add_calls(datetime.combine(end_day, time.min), end)
+    else:
+        add_calls(start, end)
+
+    conditions = call_filters(start, end, outcomes, sentiments, mc_number)
+    total_calls = sum(point["calls"] for point in series.values())
+    total_won = sum(point["won"] for point in series.values())
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "bucket": bucket,
+        "total_calls": total_calls,
+        "won_calls": total_won,
+        "success_rate": round(total_won / total_calls * 100, 1) if total_calls else 0,
+        "series": [
+            {"bucket": key, "calls": point["calls"], "won": point["won"],
+             "avg_duration": round(point["duration_sum"] / point["duration_count"], 1) if point["duration_count"] else None}
+            for key, point in sorted(series.items())
+        ],
+        "by_outcome": by_outcome,
+        "by_sentiment": by_sentiment,
+        "top_carriers": _top_carriers(db, start, end, conditions, top_carriers,
+                                      filtered=bool(outcomes or sentiments or mc_number)),
+    }
+
+
+def encode_cursor(created_at: datetime, call_id: int) -> str:
+    """Opaque position after which the next page starts"""
+    raw = json.dumps([created_at.isoformat(), call_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, call_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(call_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid cursor: {e}")
+
+
+def list_calls(db: Session, cursor: Optional[str] = None, limit: int = CALLS_PAGE_SIZE, **filters) -> dict:
+    """
+    One page of call logs, newest first, with keyset pagination: the cursor
+    holds the (created_at, id) of the last call returned and the next page
+    continues strictly after it, so deep pages cost the same as the first.
+    filters are the call_filters() arguments.
+    """
+    if not 1 <= limit <= CALLS_MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {CALLS_MAX_PAGE_SIZE}")
+    query = db.query(CallLog).filter(CallLog.created_at.is_not(None), *call_filters(**filters))
+    if cursor:
+        created_at, call_id = decode_cursor(cursor)
+        # Written as a bounded range so the planner seeks the created_at index straight to the cursor
+        query = query.filter(
+            CallLog.created_at <= created_at,
+            or_(CallLog.created_at < created_at, CallLog.id < call_id),
+        )
+    rows = query.order_by(CallLog.created_at.desc(), CallLog.id.desc()).limit(limit + 1).all()
+
+    page = rows[:limit]
+    calls = []
+    for row in page:
+        call = {field: getattr(row, field) for field in CALL_FIELDS}
+        call["created_at"] = row.created_at.isoformat()
+        calls.append(call)
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    return {"calls": calls, "count": len(calls), "next_cursor": next_cursor}
@@ -0,0 +1,326 @@
+from collections import OrderedDict
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import get_async_db_context, dialect_insert
+from app.models.load import CallLog
+from app.services.call_metrics import record_call_metrics
+from app.services.dashboard_metrics import dashboard_cache
+from app.services.dashboard_events import dashboard_events
+
+# Where acknowledged-but-unwritten call summaries are journaled until they reach the database
+CALL_LOG_SPOOL_DIR = os.getenv("CALL_LOG_SPOOL_DIR", "./spool")
+# A batch is written once it has this many calls, or after CALL_LOG_FLUSH_MS
+CALL_LOG_BATCH_SIZE = int(os.getenv("CALL_LOG_BATCH_SIZE", "100"))
+CALL_LOG_FLUSH_MS = int(os.getenv("CALL_LOG_FLUSH_MS", "200"))
+# After this many failed attempts a batch is written call by call, and calls the database rejects are dead-lettered
+CALL_LOG_MAX_ATTEMPTS = int(os.getenv("CALL_LOG_MAX_ATTEMPTS", "3"))
+# Session ids remembered in memory so webhook retries are rejected without a database lookup
+CALL_LOG_RECENT_KEYS = int(os.getenv("CALL_LOG_RECENT_KEYS", "10000"))
+
+CALL_LOG_FIELDS = ("session_id", "mc_number", "carrier_name", "load_id", "call_outcome", "sentiment", "call_summary", "duration")
+# Columns the rollups need back from the rows that were actually inserted
+ROLLUP_COLUMNS = ("id", "mc_number", "carrier_name", "call_outcome", "sentiment", "duration", "created_at")
+SEGMENT_PATTERN = re.compile(r"call_logs-(\d+)-(\d+)-(\d+)\.ndjson$")
+# Calls the database refused, kept next to the spool for inspection; never replayed
+DEAD_LETTER_FILE = "dead_letter.ndjson"
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def _pid_alive(pid: int) -> bool:
+    """True when another live process may still be appending to its spool"""
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _rejected(error: Exception) -> bool:
+    """True when the database refused the statement itself rather than being unreachable"""
+    return isinstance(error, exc.StatementError) and not isinstance(error, (exc.OperationalError, exc.InterfaceError))
+
+
+def write_call_logs(db: Session, records: list[dict]) -> int:
+    """
+    Insert one batch of spooled calls and their rollup counters in a single
+    transaction. Calls whose session_id is already logged are skipped, so
+    they never reach the rollups either. created_at is the time the call was
+    acknowledged, so a call replayed after an outage lands in its own bucket.
+    """
+    table = CallLog.__table__
+    now = datetime.utcnow()
+    rows = [
+        {**{field: record.get(field) for field in CALL_LOG_FIELDS},
+         "created_at": datetime.fromisoformat(record["created_at"]) if record.get("created_at") else now}
+        for record in records
+    ]
+    stmt = dialect_insert(db, table).on_conflict_do_nothing(index_elements=[table.c.session_id])
+    inserted = db.execute(stmt.returning(*(table.c[column] for column in ROLLUP_COLUMNS)), rows).all()
+    record_call_metrics(db, inserted)
+    db.commit()
+    return len(inserted)
+
+
+class CallLogWriter:
+    """
+    Write-behind queue for call summaries.
+
+    submit() fsyncs the call to an append-only spool segment and returns, so
+    the webhook is acknowledged without touching the database. A background
+    task seals the segment every batch_size calls or flush_ms and writes it
+    in one transaction; the segment file is deleted only after the commit.
+    Segments left behind by a crash are replayed on start(), and stop()
+    drains whatever is still queued.
+
+    Retries of a recently queued session_id are dropped before spooling;
+    older duplicates are skipped by the unique index when the batch is written.
+    A batch that fails max_attempts times is written one call at a time, and
+    calls the database rejects are moved to the dead-letter file so they
+    cannot hold up the calls queued behind them.
+    """
+
+    def __init__(self, spool_dir: str = CALL_LOG_SPOOL_DIR, batch_size: int = CALL_LOG_BATCH_SIZE,
+                 flush_ms: int = CALL_LOG_FLUSH_MS, recent_keys: int = CALL_LOG_RECENT_KEYS,
+                 max_attempts: int = CALL_LOG_MAX_ATTEMPTS, session_context=get_async_db_context):
+        self.spool_dir = Path(spool_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.recent_keys = recent_keys
+        self.max_attempts = max_attempts
+        self.session_context = session_context
+        self.stats = {"queued": 0, "written": 0, "duplicates": 0, "batches": 0, "failures": 0, "replayed": 0,
+                      "dead_lettered": 0}
+        # Failed attempts at the oldest sealed segment
+        self._head_failures = 0
+        self._recent: OrderedDict[str, None] = OrderedDict()
+        self._run_id = time.time_ns()
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._path: Optional[Path] = None
+        self._pending: list[dict] = []
+        # Sealed segments awaiting their database write, oldest first
+        self._sealed: list[tuple[Path, list[dict]]] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def backlog(self) -> int:
+        """Calls acknowledged but not yet committed"""
+        return len(self._pending) + sum(len(records) for _, records in self._sealed)
+
+    def _remember(self, session_id: Optional[str]) -> bool:
+        """Record a session_id; False if it was already seen recently"""
+        if session_id is None:
+            return True
+        if session_id in self._recent:
+            self._recent.move_to_end(session_id)
+            return False
+        self._recent[session_id] = None
+        if len(self._recent) > self.recent_keys:
+            self._recent.popitem(last=False)
+        return True
+
+    def _append(self, record: dict):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.spool_dir.mkdir(parents=True, exist_ok=True)
+                self._sequence += 1
+                self._path = self.spool_dir / f"call_logs-{os.getpid()}-{self._run_id}-{self._sequence:06d}.ndjson"
+                self._file = open(self._path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending.append(record)
+
+    def _seal(self):
+        """Close the active segment and queue it for writing; new calls start a fresh one"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._sealed.append((self._path, self._pending))
+            self._file, self._path, self._pending = None, None, []
+
+    async def submit(self, **fields) -> Optional[dict]:
+        """
+        Durably queue one call summary; created_at is the time it was acknowledged.
+        Returns None for a retry of a session_id queued recently.
+        """
+        record = {field: fields.get(field) for field in CALL_LOG_FIELDS}
+        # A blank session id is no key at all; it must not collide with other blank ones
+        record["session_id"] = record["session_id"] or None
+        if not self._remember(record["session_id"]):
+            self.stats["duplicates"] += 1
+            return None
+        record["created_at"] = datetime.utcnow().isoformat()
+        try:
+            await run_in_threadpool(self._append, record)
+        except Exception:
+            # Not acknowledged, so a retry must be accepted
+            self._recent.pop(record["session_id"], None)
+            raise
+        self.stats["queued"] += 1
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return record
+
+    def _dead_letter(self, record: dict, error: Exception):
+        line = json.dumps({"record": record, "error": str(error), "failed_at": datetime.utcnow().isoformat()},
+                          separators=(",", ":"), default=str) + "\n"
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.spool_dir / DEAD_LETTER_FILE, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _write_batch(self, records: list[dict]) -> int:
+        async with self.session_context() as db:
+            return await db.run_sync(write_call_logs, records)
+
+    async def _write_each(self, records: list[dict]):
+        """
+        Write a batch call by call, dead-lettering calls the database rejects.
+        Raises if the database is unreachable, leaving only the calls not yet
+        handled in records.
+        """
+        while records:
+            try:
+                written = await self._write_batch(records[:1])
+            except Exception as e:
+                if not _rejected(e):
+                    raise
+                logger.error("Dead-lettering call log for session %s: %s", records[0].get("session_id"), e)
+                await run_in_threadpool(self._dead_letter, records[0], e)
+                self.stats["dead_lettered"] += 1
+            else:
+                self.stats["written"] += written
+                self.stats["duplicates"] += 1 - written
+                if written:
+                    dashboard_cache.invalidate()
+            records.pop(0)
+
+    def _failed(self, records: list[dict], error: Exception) -> bool:
+        self._head_failures += 1
+        self.stats["failures"] += 1
+        logger.error("Failed to write %s spooled call logs (attempt %s), will retry: %s", len(records), self._head_failures, error)
+        return False
+
+    async def flush(self) -> bool:
+        """Write every queued call; False if the database write failed and will be retried"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            self._seal()
+            while self._sealed:
+                path, records = self._sealed[0]
+                pending = bool(records)
+                if records and self._head_failures < self.max_attempts:
+                    try:
+                        written = await self._write_batch(records)
+                    except Exception as e:
+                        return self._failed(records, e)
+                    if written < len(records):
+                        logger.info("Skipped %s call logs already recorded for their session", len(records) - written)
+                    self.stats["written"] += written
+                    self.stats["duplicates"] += len(records) - written
+                elif records:
+                    try:
+                        await self._write_each(records)
+                    except Exception as e:
+                        return self._failed(records, e)
+                if pending:
+                    self.stats["batches"] += 1
+                    dashboard_cache.invalidate()
+                    dashboard_events.notify()
+                self._sealed.pop(0)
+                self._head_failures = 0
+                with suppress(FileNotFoundError):
+                    path.unlink()
+            return True
+
+    def _recover(self) -> int:
+        """Queue segments a previous (crashed or killed) process never wrote"""
+        if not self.spool_dir.exists():
+            return 0
+        segments = []
+        for path in self.spool_dir.iterdir():
+            match = SEGMENT_PATTERN.match(path.name)
+            if match is None:
+                continue
+            pid, run_id, sequence = (int(part) for part in match.groups())
+            if run_id == self._run_id or _pid_alive(pid):
+                continue
+            segments.append(((run_id, sequence), path))
+
+        recovered = 0
+        for _, path in sorted(segments):
+            records = []
+            with open(path, encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Only the last line of a segment can be torn, by a crash mid-write
+                        logger.warning("Skipping unreadable line %s of %s", number, path.name)
+            self._sealed.append((path, records))
+            recovered += len(records)
+            for record in records:
+                self._remember(record.get("session_id"))
+        if recovered:
+            logger.info("Replaying %s call logs from %s spool segments", recovered, len(segments))
+        self.stats["replayed"] += recovered
+        return recovered
+
+    async def run(self):
+        """Background task: write a batch whenever one fills up or flush_ms passes"""
+        while not self._stopping:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def start(self):
+        """Replay leftover spool segments, then start the background writer"""
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        await run_in_threadpool(self._recover)
+        await self.flush()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the background writer and drain the queue"""
+        if self._task is not None:
+            # Let an in-flight batch commit rather than cancelling it halfway
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if not await self.flush():
+            logger.error("%s call logs left in %s for replay on next start", self.backlog(), self.spool_dir)
+
+
+# Shared by every summary request in the worker
+call_log_writer = CallLogWriter()
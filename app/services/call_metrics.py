@@ -0,0 +1,189 @@
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from datetime import date
+import json
+import logging
+
+from app.database import dialect_insert
+from app.models.load import CallLog, CallMetricRollup
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("calls", "won", "duration_sum", "duration_count", "duration_min", "duration_max")
+
+
+def encode_key(value) -> str:
+    """Encode a bucket value so NULL, '' and real values stay distinct"""
+    return json.dumps(value)
+
+
+def decode_key(key: str):
+    return json.loads(key)
+
+
+def _call_buckets(call_log: CallLog) -> list[tuple[str, str]]:
+    """All (bucket_type, bucket_key) pairs a call contributes to"""
+    buckets = [
+        ("all", ""),
+        ("outcome", encode_key(call_log.call_outcome)),
+        ("sentiment", encode_key(call_log.sentiment)),
+        ("carrier", encode_key([call_log.mc_number, call_log.carrier_name])),
+        ("mc", encode_key(call_log.mc_number)),
+    ]
+    if call_log.created_at is not None:
+        day = call_log.created_at.strftime("%Y-%m-%d")
+        buckets.append(("day", day))
+        buckets.append(("hour", str(call_log.created_at.hour)))
+        buckets.append(("day_detail", encode_key([day, call_log.call_outcome, call_log.sentiment])))
+    return buckets
+
+
+def day_detail_key_range(first_day: date, end_day: date) -> tuple[str, str]:
+    """
+    bucket_key bounds selecting day_detail rollups for days in [first_day, end_day).
+    Keys are JSON lists starting with the ISO day, so they sort by day.
+    """
+    return "[" + json.dumps(first_day.isoformat()), "[" + json.dumps(end_day.isoformat())
+
+
+def _empty_counters() -> dict:
+    return {"calls": 0, "won": 0, "duration_sum": 0, "duration_count": 0, "duration_min": None, "duration_max": None}
+
+
+def _add_call(counters: dict, call_log: CallLog):
+    counters["calls"] += 1
+    if call_log.call_outcome == "won":
+        counters["won"] += 1
+    duration = call_log.duration
+    if duration is not None:
+        counters["duration_sum"] += duration
+        counters["duration_count"] += 1
+        if counters["duration_min"] is None or duration < counters["duration_min"]:
+            counters["duration_min"] = duration
+        if counters["duration_max"] is None or duration > counters["duration_max"]:
+            counters["duration_max"] = duration
+
+
+def record_call_metrics(db: Session, call_logs: list[CallLog]):
+    """
+    Fold newly inserted calls into the rollup table.
+    Runs inside the caller's transaction so counters commit with the calls.
+    """
+    deltas = {}
+    for call_log in call_logs:
+        for bucket in _call_buckets(call_log):
+            _add_call(deltas.setdefault(bucket, _empty_counters()), call_log)
+    if not deltas:
+        return
+
+    table = CallMetricRollup.__table__
+    stmt = dialect_insert(db, table)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.bucket_type, table.c.bucket_key],
+        set_={
+            "calls": table.c.calls + excluded.calls,
+            "won": table.c.won + excluded.won,
+            "duration_sum": table.c.duration_sum + excluded.duration_sum,
+            "duration_count": table.c.duration_count + excluded.duration_count,
+            "duration_min": case(
+                (table.c.duration_min.is_(None), excluded.duration_min),
+                (excluded.duration_min < table.c.duration_min, excluded.duration_min),
+                else_=table.c.duration_min,
+            ),
+            "duration_max": case(
+                (table.c.duration_max.is_(None), excluded.duration_max),
+                (excluded.duration_max > table.c.duration_max, excluded.duration_max),
+                else_=table.c.duration_max,
+            ),
+        },
+    )
+    db.execute(stmt, [
+        {"bucket_type": bucket_type, "bucket_key": bucket_key, **counters}
+        for (bucket_type, bucket_key), counters in deltas.items()
+    ])
+
+
+def compute_rollups(db: Session) -> dict:
+    """Recompute every rollup bucket from raw call_logs with one GROUP BY per bucket type"""
+    aggregates = [
+        func.count(CallLog.id),
+        func.coalesce(func.sum(case((CallLog.call_outcome == "won", 1), else_=0)), 0),
+        func.coalesce(func.sum(CallLog.duration), 0),
+        func.count(CallLog.duration),
+        func.min(CallLog.duration),
+        func.max(CallLog.duration),
+    ]
+    day = func.date(CallLog.created_at)
+    hour = func.extract("hour", CallLog.created_at)
+    groupings = {
+        "outcome": ([CallLog.call_outcome], lambda r: encode_key(r[0])),
+        "sentiment": ([CallLog.sentiment], lambda r: encode_key(r[0])),
+        "carrier": ([CallLog.mc_number, CallLog.carrier_name], lambda r: encode_key([r[0], r[1]])),
+        "mc": ([CallLog.mc_number], lambda r: encode_key(r[0])),
+        "day": ([day], lambda r: str(r[0])),
+        "hour": ([hour], lambda r: str(int(r[0]))),
+        "day_detail": ([day, CallLog.call_outcome, CallLog.sentiment], lambda r: encode_key([str(r[0]), r[1], r[2]])),
+    }
+
+    rollups = {}
+    total = db.query(*aggregates).one()
+    if total[0]:
+        rollups[("all", "")] = dict(zip(COUNTER_FIELDS, total))
+    for bucket_type, (group_columns, make_key) in groupings.items():
+        query = db.query(*group_columns, *aggregates).group_by(*group_columns)
+        if bucket_type in ("day", "hour", "day_detail"):
+            query = query.filter(CallLog.created_at.isnot(None))
+        for row in query:
+            width = len(group_columns)
+            rollups[(bucket_type, make_key(row))] = dict(zip(COUNTER_FIELDS, row[width:]))
+    return rollups
+
+
+def _stored_rollups(db: Session) -> dict:
+    return {
+        (row.bucket_type, row.bucket_key): {field: getattr(row, field) for field in COUNTER_FIELDS}
+        for row in db.query(CallMetricRollup)
+    }
+
+
+def rebuild_rollups(db: Session) -> int:
+    """Replace the rollup table with counters recomputed from call_logs"""
+    rollups = compute_rollups(db)
+    db.query(CallMetricRollup).delete()
+    if rollups:
+        db.execute(CallMetricRollup.__table__.insert(), [
+            {"bucket_type": bucket_type, "bucket_key": bucket_key, **counters}
+            for (bucket_type, bucket_key), counters in rollups.items()
+        ])
+    db.commit()
+    logger.info("Rebuilt %s call metric rollups", len(rollups))
+    return len(rollups)
+
+
+def check_rollups(db: Session) -> list[str]:
+    """Compare stored rollups against call_logs; returns a list of mismatches"""
+    expected = compute_rollups(db)
+    stored = _stored_rollups(db)
+    problems = []
+    for bucket in sorted(expected.keys() | stored.keys()):
+        want = {k: (int(v) if v is not None else None) for k, v in expected.get(bucket, _empty_counters()).items()}
+        have = stored.get(bucket, _empty_counters())
+        if want != have:
+            problems.append(f"{bucket[0]}[{bucket[1]}]: expected {want}, stored {have}")
+    return problems
+
+
+def ensure_rollups(db: Session):
+    """Backfill rollups for databases created before the rollup table, or its day_detail buckets, existed"""
+    if db.query(CallLog.id).first() is None:
+        return
+    missing = db.query(CallMetricRollup.id).first() is None or (
+        # Every call with a timestamp has a day_detail bucket
+        db.query(CallMetricRollup.id).filter(CallMetricRollup.bucket_type == "day_detail").first() is None
+        and db.query(CallLog.id).filter(CallLog.created_at.isnot(None)).first() is not None
+    )
+    if missing:
+        logger.info("Call metric rollups are missing, rebuilding from call_logs")
+        rebuild_rollups(db)
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+import logging
+import os
+import time
+
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.carrier import CarrierSnapshot
+from app.services.verification_cache import VerificationResult, normalize_mc_number
+
+# Snapshot rows older than this fall back to the live FMCSA API
+FMCSA_SNAPSHOT_MAX_AGE_HOURS = float(os.getenv("FMCSA_SNAPSHOT_MAX_AGE_HOURS", "72"))
+SNAPSHOT_BATCH_SIZE = 5000
+
+# Census exports and QCMobile dumps name the same fields differently
+DOCKET_FIELDS = ("docket_number", "DOCKET_NUMBER", "mc_number", "MC_NUMBER", "docketNumber")
+DOT_FIELDS = ("dot_number", "DOT_NUMBER", "dotNumber")
+NAME_FIELDS = ("legal_name", "LEGAL_NAME", "legalName")
+ALLOWED_FIELDS = ("allowed_to_operate", "ALLOWED_TO_OPERATE", "allowedToOperate")
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def _first(record: dict, fields: tuple) -> Optional[str]:
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def parse_census_record(record: dict) -> Optional[dict]:
+    """Map one census row to carrier_snapshots columns; None when it has no MC docket"""
+    if isinstance(record.get("carrier"), dict):
+        record = record["carrier"]
+
+    docket = _first(record, DOCKET_FIELDS)
+    if docket is None and str(record.get("DOCKET1PREFIX", "")).strip().upper() == "MC":
+        docket = _first(record, ("DOCKET1",))
+    if docket is None:
+        return None
+    docket = normalize_mc_number(docket)
+    if not docket.isdigit():
+        return None
+
+    allowed = _first(record, ALLOWED_FIELDS)
+    if allowed is None and record.get("STATUS_CODE"):
+        # Census status: A = active
+        allowed = "Y" if str(record["STATUS_CODE"]).strip().upper() == "A" else "N"
+
+    return {
+        "docket_number": docket,
+        "dot_number": _first(record, DOT_FIELDS),
+        "legal_name": _first(record, NAME_FIELDS),
+        "allowed_to_operate": allowed.upper()[:1] if allowed else None,
+    }
+
+
+def import_snapshot(db: Session, records: Iterable[dict], snapshot_at: datetime = None, batch_size: int = SNAPSHOT_BATCH_SIZE) -> dict:
+    """
+    Upsert census records into carrier_snapshots in fixed-size batches.
+    records is consumed lazily, so memory stays bounded by batch_size.
+    """
+    snapshot_at = snapshot_at or datetime.utcnow()
+    table = CarrierSnapshot.__table__
+    stmt = dialect_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.docket_number],
+        set_={
+            "dot_number": stmt.excluded.dot_number,
+            "legal_name": stmt.excluded.legal_name,
+            "allowed_to_operate": stmt.excluded.allowed_to_operate,
+            "snapshot_at": stmt.excluded.snapshot_at,
+        },
+    )
+
+    stats = {"read": 0, "imported": 0, "skipped": 0}
+    started = time.monotonic()
+    batch = {}
+
+    def flush():
+        if batch:
+            db.execute(stmt, list(batch.values()))
+            db.commit()
+            stats["imported"] += len(batch)
+            batch.clear()
+
+    for record in records:
+        stats["read"] += 1
+        row = parse_census_record(record)
+        if row is None:
+            stats["skipped"] += 1
+            continue
+        row["snapshot_at"] = snapshot_at
+        # Later rows for the same docket win, and a batch may not repeat a key
+        batch[row["docket_number"]] = row
+        if len(batch) >= batch_size:
+            flush()
+            logger.info("Imported %s carriers (%s rows read)", stats["imported"], stats["read"])
+    flush()
+
+    elapsed = time.monotonic() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["rows_per_second"] = round(stats["read"] / elapsed) if elapsed > 0 else stats["read"]
+    return stats
+
+
+def lookup_carrier(db: Session, clean_mc: str, max_age_hours: float = FMCSA_SNAPSHOT_MAX_AGE_HOURS) -> Optional[VerificationResult]:
+    """Answer a verification from the local snapshot; None for misses, stale or status-less rows"""
+    row = db.get(CarrierSnapshot, clean_mc)
+    if row is None or row.allowed_to_operate is None:
+        return None
+    if row.snapshot_at < datetime.utcnow() - timedelta(hours=max_age_hours):
+        return None
+    carrier_name = row.legal_name or "Unknown"
+    if row.allowed_to_operate == "Y":
+        return VerificationResult("verified", carrier_name)
+    return VerificationResult("not_allowed", carrier_name)
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After failure_threshold failures in a row the circuit opens and callers
+    are short-circuited. Once reset_timeout has passed, a single background
+    probe is allowed through (half-open); its outcome closes or re-opens
+    the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+        self.short_circuits = 0
+        self.transitions = 0
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning("Circuit '%s' %s -> %s (consecutive failures: %s)", self.name, self.state, state, self.consecutive_failures)
+        self.state = state
+        self.transitions += 1
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+
+    def allow_request(self) -> bool:
+        """True when a caller may go upstream; otherwise count a short circuit"""
+        if self.state == CLOSED:
+            return True
+        self.short_circuits += 1
+        return False
+
+    def record_success(self):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self._transition(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._transition(OPEN)
+
+    def maybe_probe(self, probe: Callable[[], Awaitable[bool]]):
+        """
+        Start one background probe once the reset timeout has elapsed.
+        probe() returns True when the upstream answered properly.
+        """
+        if self.state != OPEN or time.monotonic() - self.opened_at < self.reset_timeout:
+            return
+        if self._probe_task is not None and not self._probe_task.done():
+            return
+        self._transition(HALF_OPEN)
+        self._probe_task = asyncio.ensure_future(self._run_probe(probe))
+
+    async def _run_probe(self, probe: Callable[[], Awaitable[bool]]):
+        try:
+            healthy = await probe()
+        except Exception as e:
+            logger.warning("Circuit '%s' probe raised: %r", self.name, e)
+            healthy = False
+        if healthy:
+            self.record_success()
+        else:
+            self.record_failure()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.state != CLOSED and self.opened_at else 0,
+            "successes": self.successes,
+            "failures": self.failures,
+            "short_circuits": self.short_circuits,
+            "transitions": self.transitions,
+        }
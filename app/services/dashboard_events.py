@@ -0,0 +1,159 @@
+from typing import AsyncIterator, Optional
+import asyncio
+import json
+import logging
+import os
+import time
+
+from app.services.cache import StaleWhileRevalidateCache
+from app.services.dashboard_metrics import dashboard_cache
+
+# Calls flushed within this window are pushed to dashboards as one update
+DASHBOARD_EVENTS_DEBOUNCE_MS = int(os.getenv("DASHBOARD_EVENTS_DEBOUNCE_MS", "250"))
+# Re-check metrics this often while anyone is listening, to pick up writes made by other workers
+DASHBOARD_EVENTS_POLL_SECONDS = float(os.getenv("DASHBOARD_EVENTS_POLL_SECONDS", "30"))
+DASHBOARD_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("DASHBOARD_EVENTS_KEEPALIVE_SECONDS", "15"))
+# Streams are closed after this long and the browser reconnects, so open tabs never hold up a shutdown
+DASHBOARD_EVENTS_MAX_SECONDS = float(os.getenv("DASHBOARD_EVENTS_MAX_SECONDS", "120"))
+# Events buffered for a slow subscriber before it is resynced with a snapshot
+DASHBOARD_EVENTS_QUEUE_SIZE = 16
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def metrics_delta(previous: dict, current: dict) -> dict:
+    """Top-level metric fields whose value changed; lists are sent whole"""
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+
+def format_event(event: str, event_id: int, data: dict) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+
+
+class DashboardBroadcaster:
+    """
+    Pushes dashboard metrics to every open dashboard over server-sent events.
+
+    A new subscriber gets a full snapshot, then only the fields that change.
+    Metrics are computed once per change for all subscribers, through the
+    same cache /dashboard-metrics uses, and nothing is computed while nobody
+    is listening.
+    """
+
+    def __init__(self, cache: StaleWhileRevalidateCache,
+                 debounce_ms: int = DASHBOARD_EVENTS_DEBOUNCE_MS,
+                 poll_seconds: float = DASHBOARD_EVENTS_POLL_SECONDS):
+        self.cache = cache
+        self.debounce = debounce_ms / 1000
+        self.poll_seconds = poll_seconds
+        self.stats = {"subscribers": 0, "computations": 0, "events": 0, "resyncs": 0}
+        self._subscribers: set[asyncio.Queue] = set()
+        self._metrics: Optional[dict] = None
+        self._event_id = 0
+        self._changed: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self):
+        """Metrics may have changed; push an update to subscribers shortly"""
+        if self._changed is not None and self._subscribers:
+            self._changed.set()
+
+    async def _publish(self, fresh: bool) -> Optional[dict]:
+        """Compute metrics once and queue the changed fields for every subscriber"""
+        async with self._lock:
+            if fresh:
+                metrics = await self.cache.latest()
+            else:
+                metrics, _, _ = await self.cache.get()
+            self.stats["computations"] += 1
+            if self._metrics is not None:
+                delta = metrics_delta(self._metrics, metrics)
+                if delta:
+                    self._event_id += 1
+                    for queue in self._subscribers:
+                        self._put(queue, ("delta", self._event_id, delta), metrics)
+            self._metrics = metrics
+            return metrics
+
+    def _put(self, queue: asyncio.Queue, event: tuple, metrics: dict):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Deltas only make sense in order; replace the backlog with the full state
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(("snapshot", self._event_id, metrics))
+            self.stats["resyncs"] += 1
+
+    async def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber; its queue starts with a snapshot of the current metrics"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if self._metrics is None or not self._subscribers:
+            # Nobody was listening, so the last broadcast state may be out of date
+            await self._publish(fresh=True)
+        queue = asyncio.Queue(maxsize=DASHBOARD_EVENTS_QUEUE_SIZE)
+        queue.put_nowait(("snapshot", self._event_id, self._metrics))
+        self._subscribers.add(queue)
+        self.stats["subscribers"] = len(self._subscribers)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        self.stats["subscribers"] = len(self._subscribers)
+
+    async def stream(self, max_seconds: float = DASHBOARD_EVENTS_MAX_SECONDS,
+                     keepalive: float = DASHBOARD_EVENTS_KEEPALIVE_SECONDS) -> AsyncIterator[str]:
+        """Server-sent event stream for one dashboard connection"""
+        queue = await self.subscribe()
+        deadline = time.monotonic() + max_seconds
+        try:
+            # Tell EventSource to reconnect quickly when the stream ends
+            yield "retry: 1000\n\n"
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    event, event_id, data = await asyncio.wait_for(queue.get(), min(keepalive, remaining))
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                self.stats["events"] += 1
+                yield format_event(event, event_id, data)
+        finally:
+            self.unsubscribe(queue)
+
+    async def run(self):
+        """Recompute after notify() (debounced) or every poll_seconds while subscribed"""
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.poll_seconds)
+                notified = True
+            except asyncio.TimeoutError:
+                notified = False
+            if notified:
+                await asyncio.sleep(self.debounce)
+            self._changed.clear()
+            if not self._subscribers:
+                continue
+            try:
+                await self._publish(fresh=notified)
+            except Exception as e:
+                logger.error("Dashboard event update failed: %s", e)
+
+    async def start(self):
+        self._changed = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# Shared by every dashboard connected to this worker
+dashboard_events = DashboardBroadcaster(dashboard_cache)
@@ -0,0 +1,153 @@
+from sqlalchemy import func, case, or_, and_
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, time
+import os
+import logging
+
+from app.database import get_async_db_context
+from app.models.load import Load, CallLog, CallMetricRollup
+from app.services.call_metrics import encode_key, decode_key
+from app.services.cache import StaleWhileRevalidateCache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Call outcomes and sentiments reported by HappyRobot, keyed by dashboard field
+OUTCOME_FIELDS = {
+    "won_calls": "won",
+    "lost_calls": "lost",
+    "no_load_calls": "no-load",
+    "verification_failed_calls": "verification-failed",
+    "callback_needed": "callback-needed",
+}
+SENTIMENT_FIELDS = {
+    "positive_sentiment": "positive",
+    "negative_sentiment": "negative",
+    "neutral_sentiment": "neutral",
+}
+
+RECENT_DAYS = 7
+
+# Seconds a computed result is served as fresh, then served stale while refreshing
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "15"))
+DASHBOARD_CACHE_STALE_TTL = float(os.getenv("DASHBOARD_CACHE_STALE_TTL", "300"))
+
+
+def _count_if(condition):
+    """Conditional aggregate counting rows that match condition"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def compute_dashboard_metrics(db: Session, now: datetime = None) -> dict:
+    """
+    Build the dashboard metrics from the call_metric_rollups table.
+    Cost is proportional to the number of buckets, not the number of calls.
+    """
+    now = now or datetime.now()
+    today = now.date()
+    week_ago = now - timedelta(days=7)
+    days = [today - timedelta(days=i) for i in range(RECENT_DAYS)]
+
+    load_row = db.query(
+        func.count(Load.load_id).label("total_loads"),
+        _count_if(Load.status == "available").label("available_loads"),
+    ).one()
+
+    # Small bucket types are read in one query; day buckets only from the last week onwards
+    rows = db.query(CallMetricRollup).filter(or_(
+        CallMetricRollup.bucket_type.in_(["all", "outcome", "sentiment", "hour"]),
+        and_(CallMetricRollup.bucket_type == "day", CallMetricRollup.bucket_key >= week_ago.strftime("%Y-%m-%d")),
+    )).all()
+    buckets = {}
+    for row in rows:
+        buckets.setdefault(row.bucket_type, {})[row.bucket_key] = row
+
+    def calls(bucket_type, key):
+        row = buckets.get(bucket_type, {}).get(key)
+        return row.calls if row else 0
+
+    def won(bucket_type, key):
+        row = buckets.get(bucket_type, {}).get(key)
+        return row.won if row else 0
+
+    unique_carriers = db.query(func.count(CallMetricRollup.id)).filter(CallMetricRollup.bucket_type == "mc").scalar()
+    top_carriers = db.query(CallMetricRollup).filter(
+        CallMetricRollup.bucket_type == "carrier"
+    ).order_by(CallMetricRollup.calls.desc()).limit(5).all()
+
+    # The week window starts mid-day; whole days come from rollups, the partial first day from call_logs
+    week_start_day = week_ago.strftime("%Y-%m-%d")
+    boundary_end = datetime.combine(week_ago.date() + timedelta(days=1), time.min)
+    boundary = db.query(
+        func.count(CallLog.id).label("calls"),
+        _count_if(CallLog.call_outcome == "won").label("won"),
+    ).filter(CallLog.created_at >= week_ago, CallLog.created_at < boundary_end).one()
+    week_days = [key for key in buckets.get("day", {}) if key > week_start_day]
+    week_calls = boundary.calls + sum(calls("day", key) for key in week_days)
+    week_won = int(boundary.won) + sum(won("day", key) for key in week_days)
+
+    total = buckets.get("all", {}).get("")
+    total_calls = total.calls if total else 0
+    won_calls = calls("outcome", encode_key("won"))
+    success_rate = 0
+    if total_calls > 0:
+        success_rate = round((won_calls / total_calls) * 100, 1)
+
+    recent_activity = [
+        {"date": day.strftime("%Y-%m-%d"), "calls": calls("day", day.strftime("%Y-%m-%d")), "won": won("day", day.strftime("%Y-%m-%d"))}
+        for day in days
+    ]
+
+    # GROUP BY orders NULL outcomes first, then alphabetically
+    outcomes = sorted(
+        ((decode_key(key), row) for key, row in buckets.get("outcome", {}).items()),
+        key=lambda item: (item[0] is not None, item[0] or ""),
+    )
+    duration_by_outcome = [
+        {
+            "outcome": outcome,
+            "avg_duration": round(row.duration_sum / row.duration_count if row.duration_count else 0, 1),
+            "call_count": row.calls,
+        }
+        for outcome, row in outcomes
+    ]
+
+    avg_duration = total.duration_sum / total.duration_count if total and total.duration_count else 0
+
+    metrics = {
+        "total_loads": load_row.total_loads,
+        "available_loads": int(load_row.available_loads),
+        "total_calls": total_calls,
+        "unique_carriers": unique_carriers,
+    }
+    metrics.update({field: calls("outcome", encode_key(value)) for field, value in OUTCOME_FIELDS.items()})
+    metrics["success_rate"] = success_rate
+    metrics.update({field: calls("sentiment", encode_key(value)) for field, value in SENTIMENT_FIELDS.items()})
+    metrics.update({
+        "today_calls": recent_activity[0]["calls"],
+        "today_won": recent_activity[0]["won"],
+        "week_calls": week_calls,
+        "week_won": week_won,
+        "recent_activity": recent_activity,
+        "top_carriers": [
+            {"mc_number": mc_number, "carrier_name": carrier_name, "call_count": c.calls, "won_count": c.won}
+            for c in top_carriers
+            for mc_number, carrier_name in [decode_key(c.bucket_key)]
+        ],
+        "avg_duration": round(avg_duration, 1),
+        "max_duration": (total.duration_max if total else None) or 0,
+        "min_duration": (total.duration_min if total else None) or 0,
+        "duration_by_outcome": duration_by_outcome,
+        "hourly_calls": [{"hour": h, "calls": calls("hour", str(h))} for h in range(24)],
+    })
+    return metrics
+
+
+async def load_dashboard_metrics() -> dict:
+    """Compute dashboard metrics with a fresh async session"""
+    async with get_async_db_context() as db:
+        return await db.run_sync(compute_dashboard_metrics)
+
+
+# Shared by every dashboard tab polling this worker
+dashboard_cache = StaleWhileRevalidateCache(load_dashboard_metrics, DASHBOARD_CACHE_TTL, DASHBOARD_CACHE_STALE_TTL)
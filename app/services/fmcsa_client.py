@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FMCSA_API_KEY = os.getenv("FMCSA_API_KEY")
+FMCSA_BASE_URL = os.getenv("FMCSA_BASE_URL", "https://mobile.fmcsa.dot.gov/qc/services")
+FMCSA_TIMEOUT = float(os.getenv("FMCSA_TIMEOUT", "5"))  # seconds per attempt
+FMCSA_MAX_CONCURRENCY = int(os.getenv("FMCSA_MAX_CONCURRENCY", "10"))
+FMCSA_MAX_RETRIES = int(os.getenv("FMCSA_MAX_RETRIES", "2"))
+FMCSA_BACKOFF_BASE = float(os.getenv("FMCSA_BACKOFF_BASE", "0.25"))
+FMCSA_BACKOFF_MAX = float(os.getenv("FMCSA_BACKOFF_MAX", "2"))
+# Share of the remaining latency budget an attempt leaves for the retries after it
+FMCSA_RETRY_RESERVE = float(os.getenv("FMCSA_RETRY_RESERVE", "0.25"))
+
+# Configure logging
+logger = logging.getLogger(__name__)
+# httpx logs every request URL at INFO, which would include the webKey
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+class FMCSAError(Exception):
+    """FMCSA could not be reached or returned an unusable response"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FMCSAClient:
+    """
+    Asyncio FMCSA QCMobile client sharing one keep-alive connection pool.
+    Concurrency is bounded by a semaphore and transient failures
+    (transport errors, 429 and 5xx) are retried with jittered backoff.
+    Given a latency budget, an attempt may use what is left of it except a
+    retry_reserve share, so a slow but healthy answer gets most of the budget
+    and a hung first attempt still leaves room for a retry.
+    """
+
+    def __init__(
+        self,
+        base_url: str = FMCSA_BASE_URL,
+        api_key: Optional[str] = FMCSA_API_KEY,
+        timeout: float = FMCSA_TIMEOUT,
+        max_concurrency: int = FMCSA_MAX_CONCURRENCY,
+        max_retries: int = FMCSA_MAX_RETRIES,
+        backoff_base: float = FMCSA_BACKOFF_BASE,
+        backoff_max: float = FMCSA_BACKOFF_MAX,
+        retry_reserve: float = FMCSA_RETRY_RESERVE,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_reserve = retry_reserve
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def get_carrier(self, docket_number: str, timeout: Optional[float] = None,
+                          budget: Optional[float] = None) -> dict:
+        """Fetch the carrier record for an MC docket number as parsed JSON, within budget seconds if given"""
+        params = {"format": "json"}
+        if self.api_key:
+            params["webKey"] = self.api_key
+        path = f"/carriers/docket-number/{docket_number}"
+        attempts = self.max_retries + 1
+        deadline = time.monotonic() + budget if budget is not None else None
+
+        last_error = None
+        made = 0
+        for attempt in range(attempts):
+            if attempt:
+                delay = self._backoff(attempt - 1)
+                if deadline is not None:
+                    delay = min(delay, max(deadline - time.monotonic(), 0))
+                await asyncio.sleep(delay)
+            attempt_timeout = timeout or self.timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                last = attempt == attempts - 1
+                attempt_timeout = min(attempt_timeout, remaining if last else remaining * (1 - self.retry_reserve))
+            made += 1
+            try:
+                async with self._semaphore:
+                    response = await self._get_client().get(path, params=params, timeout=attempt_timeout)
+            except httpx.TransportError as e:
+                last_error = e
+                logger.warning("FMCSA request for MC %s failed (attempt %s): %r", docket_number, attempt + 1, e)
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                last_error = FMCSAError(f"HTTP {response.status_code}", response.status_code)
+                logger.warning("FMCSA returned %s for MC %s (attempt %s)", response.status_code, docket_number, attempt + 1)
+                continue
+            if response.status_code >= 400:
+                raise FMCSAError(f"HTTP {response.status_code}", response.status_code)
+            try:
+                return response.json()
+            except ValueError as e:
+                raise FMCSAError(f"Invalid JSON from FMCSA: {e}") from e
+
+        raise FMCSAError(f"FMCSA unavailable after {made} attempts: {last_error!r}")
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Shared by every request in the worker
+fmcsa_client = FMCSAClient()
@@ -1,71 +1,155 @@
-
-import requests
-import os
+import asyncio
 import json
 import logging
-from typing import Dict, Optional
-from dotenv import load_dotenv
+import os
+from typing import Optional
 
-load_dotenv() 
+from app.database import get_async_db_context
+from app.services.fmcsa_client import fmcsa_client, FMCSAError
+from app.services.carrier_snapshot import lookup_carrier
+from app.services.verification_cache import verification_cache, VerificationResult, normalize_mc_number
+from app.services.singleflight import SingleFlight
+from app.services.circuit_breaker import CircuitBreaker
 
-FMCSA_API_KEY = os.getenv("FMCSA_API_KEY")
+# Seconds a live carrier call may wait on FMCSA before we answer "pending"
+FMCSA_LATENCY_BUDGET = float(os.getenv("FMCSA_LATENCY_BUDGET", "3"))
+FMCSA_BREAKER_FAILURES = int(os.getenv("FMCSA_BREAKER_FAILURES", "5"))
+FMCSA_BREAKER_RESET = float(os.getenv("FMCSA_BREAKER_RESET", "30"))
+# Answer from the imported carrier_snapshots table before calling FMCSA
+FMCSA_SNAPSHOT_ENABLED = os.getenv("FMCSA_SNAPSHOT_ENABLED", "true").lower() in ("1", "true", "yes")
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-def verify_mc_number(mc_number: str) -> tuple[bool, str]:
+# Upstream FMCSA lookups made by this worker
+fmcsa_stats = {"api_calls": 0, "api_errors": 0, "budget_exceeded": 0, "snapshot_hits": 0}
+# Concurrent verifications of the same MC share one upstream lookup
+mc_lookups = SingleFlight()
+fmcsa_breaker = CircuitBreaker("fmcsa", FMCSA_BREAKER_FAILURES, FMCSA_BREAKER_RESET)
+
+async def verify_mc_number(mc_number: str) -> VerificationResult:
     """
     Check if carrier with MC number is eligible to work with using FMCSA API.
-    Returns (is_verified, carrier_name) tuple.
+    Returns a VerificationResult; status is "pending" when FMCSA could not
+    answer within the latency budget and nothing usable is cached.
     """
-    # Clean the MC number (remove MC prefix if present)
-    clean_mc = mc_number.replace("MC", "").replace("mc", "").strip()
-    
+    clean_mc = normalize_mc_number(mc_number)
+    if not clean_mc.isdigit():
+        # FMCSA dockets are numeric; no need to ask upstream
+        logger.warning("❌ MC %r is not a valid docket number", mc_number)
+        return VerificationResult("not_found")
+
+    cached = await verification_cache.get(clean_mc)
+    if cached is not None:
+        logger.info("MC %s served from verification cache: %s", clean_mc, cached.status)
+        return cached
+
+    if FMCSA_SNAPSHOT_ENABLED:
+        async with get_async_db_context() as db:
+            local = await db.run_sync(lookup_carrier, clean_mc)
+        if local is not None:
+            fmcsa_stats["snapshot_hits"] += 1
+            logger.info("MC %s served from carrier snapshot: %s", clean_mc, local.status)
+            return local
+
     # Use real FMCSA API for verification
-    return verify_with_fmcsa_api(clean_mc)
+    return await mc_lookups.do(clean_mc, lambda: _lookup_and_cache(clean_mc))
+
+def _fallback(clean_mc: str) -> VerificationResult:
+    """Last known answer for this MC, or pending when we have none"""
+    stale = verification_cache.get_stale(clean_mc)
+    if stale is not None:
+        logger.info("MC %s served stale from verification cache: %s", clean_mc, stale.status)
+        return stale
+    return VerificationResult("pending")
+
+async def _lookup_within_budget(clean_mc: str) -> VerificationResult:
+    """FMCSA lookup capped at the latency budget; slow answers count as errors"""
+    try:
+        # The client fits its attempts into the budget; wait_for is only the backstop
+        return await asyncio.wait_for(verify_with_fmcsa_api(clean_mc, FMCSA_LATENCY_BUDGET), FMCSA_LATENCY_BUDGET)
+    except asyncio.TimeoutError:
+        fmcsa_stats["budget_exceeded"] += 1
+        logger.warning("FMCSA lookup for MC %s exceeded %ss budget", clean_mc, FMCSA_LATENCY_BUDGET)
+        return VerificationResult("error")
 
-def verify_with_fmcsa_api(clean_mc: str) -> tuple[bool, str]:
+async def _probe(clean_mc: str) -> bool:
+    """Half-open probe; caches a good answer so the next caller benefits"""
+    result = await _lookup_within_budget(clean_mc)
+    if result.status == "error":
+        return False
+    await verification_cache.set(clean_mc, result)
+    return True
+
+async def _lookup_and_cache(clean_mc: str) -> VerificationResult:
+    if not fmcsa_breaker.allow_request():
+        fmcsa_breaker.maybe_probe(lambda: _probe(clean_mc))
+        return _fallback(clean_mc)
+
+    result = await _lookup_within_budget(clean_mc)
+    if result.status == "error":
+        fmcsa_breaker.record_failure()
+        return _fallback(clean_mc)
+
+    fmcsa_breaker.record_success()
+    await verification_cache.set(clean_mc, result)
+    return result
+
+async def verify_with_fmcsa_api(clean_mc: str, budget: Optional[float] = None) -> VerificationResult:
     """
-    Verify MC number using the official FMCSA API.
-    Returns (is_verified, carrier_name) tuple.
+    Verify MC number using the official FMCSA API, within budget seconds if given.
+    Returns a VerificationResult; status is "error" when FMCSA could not answer.
     """
-    # FMCSA API endpoint
-    url = f"https://mobile.fmcsa.dot.gov/qc/services/carriers/docket-number/{clean_mc}?format=json"
-    
-    # Add webKey 
-    if FMCSA_API_KEY:
-        url += f"&webKey={FMCSA_API_KEY}"
-
-    logger.info(f"FMCSA API URL: {url}")
-    
+    logger.info("Querying FMCSA for MC %s", clean_mc)
+    fmcsa_stats["api_calls"] += 1
+
     try:
+        data = await fmcsa_client.get_carrier(clean_mc, budget=budget)
+
+        # The full response is large; only serialize it when someone is reading DEBUG
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("FMCSA API Response: %s", json.dumps(data))
 
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        logger.debug(f"FMCSA API Response: {json.dumps(data, indent=2)}")
-        
         # Check if carrier exists and is allowed to operate
-        if "content" in data and len(data["content"]) > 0:
+        if data.get("content"):
             carrier_info = data["content"][0]["carrier"]
-            logger.debug(f"Carrier info: {carrier_info}")
+            logger.debug("Carrier info: %s", carrier_info)
             allowed_to_operate = carrier_info.get("allowedToOperate", "N")
             carrier_name = carrier_info.get("legalName", "Unknown")
-            
-            logger.info(f"MC {clean_mc} - allowedToOperate: {allowed_to_operate}, carrier_name: {carrier_name}")
-            
+
+            logger.info("MC %s - allowedToOperate: %s, carrier_name: %s", clean_mc, allowed_to_operate, carrier_name)
+
             if allowed_to_operate == "Y":
-                logger.info(f"✅ MC {clean_mc} VERIFIED - {carrier_name}")
-                return True, carrier_name
+                logger.info("✅ MC %s VERIFIED - %s", clean_mc, carrier_name)
+                return VerificationResult("verified", carrier_name)
             else:
-                logger.warning(f"❌ MC {clean_mc} NOT VERIFIED - {carrier_name}")
-                return False, carrier_name
+                logger.warning("❌ MC %s NOT VERIFIED - %s", clean_mc, carrier_name)
+                return VerificationResult("not_allowed", carrier_name)
         else:
-            logger.warning(f"❌ MC {clean_mc} not found in FMCSA database")
-            return False, "Unknown"
-            
-    except Exception as e:
-        logger.error(f"❌ FMCSA API error for MC {clean_mc}: {e}")
-        return False, "Unknown"
+            logger.warning("❌ MC %s not found in FMCSA database", clean_mc)
+            return VerificationResult("not_found")
+
+    except FMCSAError as e:
+        if e.status_code in (400, 404):
+            logger.warning("❌ MC %s rejected by FMCSA: %s", clean_mc, e)
+            return VerificationResult("not_found")
+        fmcsa_stats["api_errors"] += 1
+        logger.error("❌ FMCSA API error for MC %s: %s", clean_mc, e)
+        return VerificationResult("error")
+    except (KeyError, IndexError, TypeError, AttributeError) as e:
+        fmcsa_stats["api_errors"] += 1
+        logger.error("❌ FMCSA API error for MC %s: %s", clean_mc, e)
+        return VerificationResult("error")
 
+def verification_metrics() -> dict:
+    """Cache effectiveness and upstream call counts for the metrics endpoint"""
+    cache = verification_cache.stats()
+    return {
+        "cache": cache,
+        "fmcsa": {
+            **fmcsa_stats,
+            "calls_saved": cache["memory_hits"] + cache["db_hits"] + fmcsa_stats["snapshot_hits"] + mc_lookups.coalesced,
+        },
+        "coalescing": mc_lookups.stats(),
+        "circuit_breaker": fmcsa_breaker.stats(),
+    }
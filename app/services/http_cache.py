@@ -0,0 +1,87 @@
+from typing import Optional
+import gzip
+import hashlib
+
+import brotli
+from fastapi import Request, Response
+
+# Bodies smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 512
+
+
+def etag(tag: str, encoding: str = "identity") -> str:
+    return f'"{tag}"' if encoding == "identity" else f'"{tag}-{encoding}"'
+
+
+def matching_etag(if_none_match: Optional[str], tag: str) -> Optional[str]:
+    """The client's ETag for any encoding of tag (weak comparison; they share one content), if it sent one"""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag(tag)
+    for sent in if_none_match.split(","):
+        sent = sent.strip().removeprefix("W/")
+        if sent == etag(tag) or (sent.startswith(f'"{tag}-') and sent.endswith('"')):
+            return sent
+    return None
+
+
+def not_modified(request: Request, tag: str, cache_control: str, headers: Optional[dict] = None) -> Optional[Response]:
+    """304 when the client already holds a version of the body tagged tag; None when it needs the body"""
+    sent = matching_etag(request.headers.get("if-none-match"), tag)
+    if sent is None:
+        return None
+    return Response(status_code=304, headers={"ETag": sent, "Cache-Control": cache_control, "Vary": "Accept-Encoding",
+                                              **(headers or {})})
+
+
+class CachedBody:
+    """
+    A response body prepared once: identity bytes plus precompressed brotli
+    and gzip variants, with an ETag per variant. The tag is a content hash
+    unless the caller supplies a version of its own.
+    """
+
+    def __init__(self, body: bytes, media_type: str, tag: Optional[str] = None):
+        self.media_type = media_type
+        self.tag = tag or hashlib.sha256(body).hexdigest()[:16]
+        self.variants = {"identity": body}
+        if len(body) >= COMPRESS_MIN_BYTES:
+            self.variants["br"] = brotli.compress(body)
+            self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+
+    def etag(self, encoding: str = "identity") -> str:
+        return etag(self.tag, encoding)
+
+
+def choose_encoding(accept_encoding: Optional[str], available) -> str:
+    """Best available encoding the client accepts (br over gzip), else identity"""
+    accepted = {}
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def cached_response(request: Request, cached: CachedBody, cache_control: str, headers: Optional[dict] = None) -> Response:
+    """200 with the best precompressed variant, or 304 with no body when the client's copy is current"""
+    unchanged = not_modified(request, cached.tag, cache_control, headers)
+    if unchanged is not None:
+        return unchanged
+    encoding = choose_encoding(request.headers.get("accept-encoding"), cached.variants)
+    response_headers = {"ETag": cached.etag(encoding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    response_headers.update(headers or {})
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=cached.variants[encoding], media_type=cached.media_type, headers=response_headers)
+
@@ -0,0 +1,187 @@
+from datetime import datetime
+from typing import Iterable
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+
+from sqlalchemy import case, text
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.load import Load, load_search_fields
+from app.services.load_index import load_index
+
+LOAD_IMPORT_BATCH_SIZE = int(os.getenv("LOAD_IMPORT_BATCH_SIZE", "2000"))
+# Row errors echoed back to the caller; the rest are only counted
+LOAD_IMPORT_MAX_ERRORS = 20
+
+REQUIRED_FIELDS = ("origin", "destination", "pickup_datetime", "delivery_datetime", "equipment_type",
+                   "loadboard_rate", "weight", "commodity_type")
+OPTIONAL_FIELDS = ("notes", "num_of_pieces", "miles", "dimensions")
+# Columns a feed owns; status, version and holds belong to the booking flow
+FEED_COLUMNS = REQUIRED_FIELDS + OPTIONAL_FIELDS
+DERIVED_COLUMNS = ("equipment_norm", "origin_city", "origin_state", "destination_city", "destination_state",
+                   "pickup_date", "origin_lat", "origin_lon", "destination_lat", "destination_lon", "search_fields_version")
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _parse_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        raw = str(value).strip()
+        parsed = datetime.fromisoformat(raw[:-1] + "+00:00" if raw.endswith("Z") else raw)
+    # Pickup and delivery times are local wall-clock times (dates, search and
+    # what the agent says all read them that way), so an offset is dropped, not applied
+    return parsed.replace(tzinfo=None)
+
+
+def _parse_float(value) -> float:
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{value!r} is not a finite number")
+    return number
+
+
+def _parse_int(value) -> int:
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"{value!r} is not a whole number")
+    return int(number)
+
+
+PARSERS = {
+    "load_id": _parse_int,
+    "pickup_datetime": _parse_datetime,
+    "delivery_datetime": _parse_datetime,
+    "loadboard_rate": _parse_float,
+    "weight": _parse_int,
+    "num_of_pieces": _parse_int,
+    "miles": _parse_int,
+}
+
+
+def parse_load_record(record: dict) -> dict:
+    """
+    Validate one CSV/JSON record and map it to loads columns, including the
+    derived search fields. Raises ValueError naming the first bad field.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    row = {}
+    for field in ("load_id",) + FEED_COLUMNS:
+        value = record.get(field)
+        if _blank(value):
+            if field in REQUIRED_FIELDS:
+                raise ValueError(f"{field} is required")
+            row[field] = None
+            continue
+        parser = PARSERS.get(field, lambda raw: str(raw).strip())
+        try:
+            row[field] = parser(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} has invalid value {value!r}")
+
+    if row["loadboard_rate"] < 0 or row["weight"] < 0:
+        raise ValueError("loadboard_rate and weight must not be negative")
+    if row["delivery_datetime"] < row["pickup_datetime"]:
+        raise ValueError("delivery_datetime is before pickup_datetime")
+    row["content_hash"] = content_hash(row)
+    row.update(load_search_fields(row["origin"], row["destination"], row["equipment_type"], row["pickup_datetime"]))
+    return row
+
+
+def content_hash(row: dict) -> str:
+    """Digest of the feed-owned columns; equal hashes mean the feed has nothing new for a load"""
+    canonical = json.dumps([row[column] for column in FEED_COLUMNS], default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def upsert_statement(db: Session):
+    """
+    INSERT ... ON CONFLICT (load_id) DO UPDATE of the feed-owned columns,
+    returning the ids written. Updates bump version, and a load the feed had
+    dropped (expired) comes back as available.
+    """
+    table = Load.__table__
+    stmt = dialect_insert(db, table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.load_id],
+        set_={
+            **{column: stmt.excluded[column] for column in FEED_COLUMNS + DERIVED_COLUMNS + ("content_hash",)},
+            "status": case((table.c.status == "expired", stmt.excluded.status), else_=table.c.status),
+            "version": table.c.version + 1,
+        },
+    ).returning(table.c.load_id)
+
+
+def write_loads(db: Session, keyed: list[dict], unkeyed: list[dict] = ()) -> list[int]:
+    """Upsert rows carrying a load_id and insert the rest in one transaction; returns the ids written"""
+    load_ids = []
+    if keyed:
+        load_ids += db.execute(upsert_statement(db), keyed).scalars().all()
+        if db.get_bind().dialect.name == "postgresql":
+            # Explicit ids do not advance the serial; keep it ahead of them for unkeyed inserts
+            db.execute(text("SELECT setval(pg_get_serial_sequence('loads', 'load_id'), "
+                            "GREATEST((SELECT MAX(load_id) FROM loads), 1))"))
+    if unkeyed:
+        load_ids += db.execute(Load.__table__.insert().returning(Load.__table__.c.load_id), list(unkeyed)).scalars().all()
+    db.commit()
+    load_index.refresh(db, load_ids)
+    return load_ids
+
+
+def import_loads(db: Session, records: Iterable[dict], batch_size: int = LOAD_IMPORT_BATCH_SIZE) -> dict:
+    """
+    Upsert load board records in fixed-size batches, one transaction each.
+    Records with a load_id update that load in place (feed columns only) or
+    create it; records without one are always inserted. records is consumed
+    lazily, so memory stays bounded by batch_size.
+    """
+    stats = {"read": 0, "imported": 0, "invalid": 0, "errors": []}
+    started = time.monotonic()
+    keyed = {}
+    unkeyed = []
+
+    def flush():
+        if keyed or unkeyed:
+            write_loads(db, list(keyed.values()), unkeyed)
+            stats["imported"] += len(keyed) + len(unkeyed)
+            keyed.clear()
+            unkeyed.clear()
+
+    for number, record in enumerate(records, 1):
+        stats["read"] += 1
+        try:
+            row = parse_load_record(record)
+        except ValueError as e:
+            stats["invalid"] += 1
+            if len(stats["errors"]) < LOAD_IMPORT_MAX_ERRORS:
+                stats["errors"].append(f"record {number}: {e}")
+            continue
+        row["status"] = "available"
+        row["version"] = 0
+        if row["load_id"] is None:
+            del row["load_id"]
+            unkeyed.append(row)
+        else:
+            # Later rows for the same load win, and a batch may not repeat a key
+            keyed[row["load_id"]] = row
+        if len(keyed) + len(unkeyed) >= batch_size:
+            flush()
+            logger.info("Imported %d loads (%d records read)", stats["imported"], stats["read"])
+    flush()
+
+    elapsed = time.monotonic() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["rows_per_second"] = round(stats["read"] / elapsed) if elapsed > 0 else stats["read"]
+    return stats
@@ -0,0 +1,430 @@
+from bisect import bisect_right, insort
+from math import floor
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Iterable, Optional
+import heapq
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.load import Load, LanePreference, lane_preferences, normalize_equipment
+from app.geocoding import SearchArea, approx_distance
+from app.services.load_scoring import CandidateArrays, scoring_row
+
+# Full reload interval, so writes made by other workers show up
+LOAD_INDEX_REFRESH_SECONDS = float(os.getenv("LOAD_INDEX_REFRESH_SECONDS", "60"))
+# Cell size of the spatial grid behind radius searches
+LOAD_INDEX_GRID_DEGREES = float(os.getenv("LOAD_INDEX_GRID_DEGREES", "0.5"))
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LoadRecord:
+    """Immutable copy of the Load columns the search path reads"""
+    load_id: int
+    origin: str
+    destination: str
+    pickup_datetime: datetime
+    delivery_datetime: datetime
+    equipment_type: str
+    loadboard_rate: float
+    weight: int
+    commodity_type: str
+    num_of_pieces: Optional[int]
+    miles: Optional[int]
+    status: str
+    version: int
+    equipment_norm: Optional[str]
+    origin_city: Optional[str]
+    origin_state: Optional[str]
+    destination_city: Optional[str]
+    destination_state: Optional[str]
+    pickup_date: Optional[date]
+    origin_lat: Optional[float]
+    origin_lon: Optional[float]
+    destination_lat: Optional[float]
+    destination_lon: Optional[float]
+
+    @classmethod
+    def from_load(cls, load) -> "LoadRecord":
+        return cls(**{f.name: getattr(load, f.name) for f in fields(cls)})
+
+    @property
+    def total_rate(self) -> float:
+        miles = self.miles or 0
+        return self.loadboard_rate * miles if miles > 0 else self.loadboard_rate
+
+
+RECORD_COLUMNS = [getattr(Load, f.name) for f in fields(LoadRecord)]
+
+
+def _location_tokens(city: Optional[str], state: Optional[str]) -> list[tuple[str, str]]:
+    tokens = []
+    if city:
+        tokens.append(("city", city))
+    if state:
+        tokens.append(("state", state))
+    return tokens
+
+
+class _LaneMap:
+    """token -> load ids for one lane end, mirroring load_search.location_filter"""
+
+    def __init__(self):
+        self._ids: dict[tuple[str, str], set[int]] = {}
+
+    def add(self, load_id: int, city: Optional[str], state: Optional[str]):
+        for token in _location_tokens(city, state):
+            self._ids.setdefault(token, set()).add(load_id)
+
+    def remove(self, load_id: int, city: Optional[str], state: Optional[str]):
+        for token in _location_tokens(city, state):
+            ids = self._ids.get(token)
+            if ids is not None:
+                ids.discard(load_id)
+                if not ids:
+                    del self._ids[token]
+
+    def match(self, lane: LanePreference) -> set[int]:
+        by_city = self._ids.get(("city", lane.city), set())
+        if lane.state:
+            return by_city & self._ids.get(("state", lane.state), set())
+        if lane.city and len(lane.city) == 2 and lane.city.isalpha():
+            return by_city | self._ids.get(("state", lane.city), set())
+        return by_city
+
+
+class _GeoGrid:
+    """Fixed-size lat/lon cells -> load ids for one lane end, for radius searches"""
+
+    def __init__(self, cell_degrees: float = LOAD_INDEX_GRID_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._cells: dict[tuple[int, int], set[int]] = {}
+        self._points: dict[int, tuple[float, float]] = {}
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return floor(lat / self.cell_degrees), floor(lon / self.cell_degrees)
+
+    def add(self, load_id: int, lat: Optional[float], lon: Optional[float]):
+        if lat is None or lon is None:
+            return
+        self._points[load_id] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), set()).add(load_id)
+
+    def remove(self, load_id: int):
+        point = self._points.pop(load_id, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        ids = self._cells[cell]
+        ids.discard(load_id)
+        if not ids:
+            del self._cells[cell]
+
+    def within(self, area: SearchArea) -> set[int]:
+        """Load ids within the radius; only cells overlapping its bounding box are scanned"""
+        min_lat, max_lat, min_lon, max_lon = area.bounds()
+        low_row, low_col = self._cell(min_lat, min_lon)
+        high_row, high_col = self._cell(max_lat, max_lon)
+        ids = set()
+        for row in range(low_row, high_row + 1):
+            for col in range(low_col, high_col + 1):
+                for load_id in self._cells.get((row, col), ()):
+                    lat, lon = self._points[load_id]
+                    if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon and area.contains(lat, lon):
+                        ids.add(load_id)
+        return ids
+
+
+class _ScoringColumns:
+    """
+    Scoring columns of every indexed load, one array slot per load, so a
+    search scores its candidates by gathering their slots. Slots of removed
+    loads are reused; the arrays double when full.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.arrays = CandidateArrays.empty(capacity)
+        self._slots: dict[int, int] = {}
+        self._free: list[int] = []
+
+    def add(self, record: LoadRecord):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            if slot == len(self.arrays):
+                self.arrays = self.arrays.resized(2 * slot)
+        self._slots[record.load_id] = slot
+        self.arrays.set_row(slot, scoring_row(record))
+
+    def remove(self, load_id: int):
+        slot = self._slots.pop(load_id, None)
+        if slot is not None:
+            self._free.append(slot)
+
+    def take(self, load_ids: list[int]) -> CandidateArrays:
+        slots = np.fromiter(map(self._slots.__getitem__, load_ids), dtype=np.int64, count=len(load_ids))
+        return self.arrays.take(slots)
+
+
+class LoadIndex:
+    """
+    In-process index of available loads.
+
+    Loads are bucketed by (equipment, pickup date); each bucket keeps
+    (weight, load_id) pairs sorted so a weight-capacity filter is a bisect.
+    Origin and destination token maps answer lane preferences with set
+    lookups, and per-end spatial grids answer radius searches. Scoring
+    columns are kept as arrays alongside. The index is fed from committed
+    ORM changes and periodically reloaded in full.
+    """
+
+    def __init__(self, refresh_seconds: float = LOAD_INDEX_REFRESH_SECONDS, write_through: bool = False):
+        """write_through: follow committed ORM changes once loaded (the shared index only)"""
+        self.refresh_seconds = refresh_seconds
+        self.write_through = write_through
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+        self._reset()
+
+    def _reset(self):
+        self._records: dict[int, LoadRecord] = {}
+        self._buckets: dict[tuple[Optional[str], Optional[date]], list[tuple[int, int]]] = {}
+        self._equipment_by_date: dict[Optional[date], set[Optional[str]]] = {}
+        self._equipment_counts: dict[Optional[str], int] = {}
+        self._origins = _LaneMap()
+        self._destinations = _LaneMap()
+        self._origin_grid = _GeoGrid()
+        self._destination_grid = _GeoGrid()
+        self._scoring = _ScoringColumns()
+
+    # Maintenance
+
+    def rebuild(self, db: Session):
+        """Reload every available load"""
+        rows = db.query(*RECORD_COLUMNS).filter(Load.status == "available").all()
+        self.load_records(LoadRecord(*row) for row in rows)
+
+    def load_records(self, records: Iterable[LoadRecord]):
+        with self._lock:
+            self._reset()
+            for record in records:
+                self._add(record)
+            self._loaded_at = time.monotonic()
+        if self.write_through:
+            _listen_for_load_changes()
+        logger.info("Load index rebuilt with %s available loads", len(self._records))
+
+    def ensure_fresh(self, db: Session):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.rebuild(db)
+
+    def loaded(self) -> bool:
+        """False until the first load and after invalidate(); nothing reads the index meanwhile"""
+        return self._loaded_at is not None
+
+    def refresh(self, db: Session, load_ids: Iterable[int]):
+        """Re-read specific loads after Core writes, which bypass the ORM events below"""
+        load_ids = list(load_ids)
+        # With the database search backend the index is never loaded, so this costs no query
+        if not load_ids or not self.loaded():
+            return
+        rows = db.query(*RECORD_COLUMNS).filter(Load.load_id.in_(load_ids)).all()
+        self.apply(records=[LoadRecord(*row) for row in rows])
+
+    def invalidate(self):
+        """Force a full reload before the next search"""
+        self._loaded_at = None
+
+    def apply(self, records: Iterable[LoadRecord] = (), deleted_ids: Iterable[int] = ()):
+        """Incrementally apply changed loads; non-available loads drop out of the index"""
+        if not self.loaded():
+            return
+        with self._lock:
+            for load_id in deleted_ids:
+                self._remove(load_id)
+            for record in records:
+                self._remove(record.load_id)
+                if record.status == "available":
+                    self._add(record)
+
+    def _add(self, record: LoadRecord):
+        self._records[record.load_id] = record
+        key = (record.equipment_norm, record.pickup_date)
+        insort(self._buckets.setdefault(key, []), (record.weight, record.load_id))
+        self._equipment_by_date.setdefault(record.pickup_date, set()).add(record.equipment_norm)
+        self._equipment_counts[record.equipment_norm] = self._equipment_counts.get(record.equipment_norm, 0) + 1
+        self._origins.add(record.load_id, record.origin_city, record.origin_state)
+        self._destinations.add(record.load_id, record.destination_city, record.destination_state)
+        self._origin_grid.add(record.load_id, record.origin_lat, record.origin_lon)
+        self._destination_grid.add(record.load_id, record.destination_lat, record.destination_lon)
+        self._scoring.add(record)
+
+    def _remove(self, load_id: int):
+        record = self._records.pop(load_id, None)
+        if record is None:
+            return
+        key = (record.equipment_norm, record.pickup_date)
+        bucket = self._buckets[key]
+        bucket.remove((record.weight, record.load_id))
+        if not bucket:
+            del self._buckets[key]
+            equipment = self._equipment_by_date[record.pickup_date]
+            equipment.discard(record.equipment_norm)
+            if not equipment:
+                del self._equipment_by_date[record.pickup_date]
+        self._equipment_counts[record.equipment_norm] -= 1
+        if not self._equipment_counts[record.equipment_norm]:
+            del self._equipment_counts[record.equipment_norm]
+        self._origins.remove(record.load_id, record.origin_city, record.origin_state)
+        self._destinations.remove(record.load_id, record.destination_city, record.destination_state)
+        self._origin_grid.remove(record.load_id)
+        self._destination_grid.remove(record.load_id)
+        self._scoring.remove(record.load_id)
+
+    def __len__(self):
+        return len(self._records)
+
+    # Search, same interface as load_search.DatabaseLoadSearch
+
+    def equipment_available(self, equipment_type: str) -> bool:
+        return self._equipment_counts.get(normalize_equipment(equipment_type), 0) > 0
+
+    def _lane_matches(self, lane: LanePreference) -> set[int]:
+        if lane.end == "origin":
+            names, grid = self._origins, self._origin_grid
+        else:
+            names, grid = self._destinations, self._destination_grid
+        if lane.area is not None:
+            return grid.within(lane.area)
+        return names.match(lane)
+
+    def _matching_ids(self, equipment_type: str, origin: str, destination: str, weight_capacity: int,
+                      dates: list[date], origin_radius: Optional[float], destination_radius: Optional[float]) -> list[int]:
+        """Ids of the loads matching a search, in no particular order; call with the lock held"""
+        lanes = lane_preferences(origin, destination, origin_radius, destination_radius)
+        # Load ids allowed by the lane preferences; None when unconstrained
+        allowed = None
+        for lane in lanes:
+            matches = self._lane_matches(lane)
+            allowed = matches if allowed is None else allowed & matches
+        equipment = normalize_equipment(equipment_type) if equipment_type else None
+        load_ids = []
+        for pickup_date in set(dates):
+            keys = [equipment] if equipment_type else self._equipment_by_date.get(pickup_date, ())
+            for key in keys:
+                bucket = self._buckets.get((key, pickup_date))
+                if not bucket:
+                    continue
+                end = bisect_right(bucket, (weight_capacity, float("inf"))) if weight_capacity and weight_capacity > 0 else len(bucket)
+                load_ids += [load_id for _, load_id in bucket[:end] if allowed is None or load_id in allowed]
+        return load_ids
+
+    def best_loads(self, equipment_type: str, origin: str, destination: str,
+                   weight_capacity: int, dates: list[date], limit: int = 1,
+                   origin_radius: Optional[float] = None, destination_radius: Optional[float] = None) -> list[LoadRecord]:
+        if not dates:
+            return []
+        with self._lock:
+            load_ids = self._matching_ids(equipment_type, origin, destination, weight_capacity, dates,
+                                          origin_radius, destination_radius)
+            candidates = [record for record in map(self._records.__getitem__, load_ids) if record.total_rate > 0]
+        return heapq.nsmallest(limit, candidates, key=lambda r: (-r.total_rate, r.pickup_date, r.load_id))
+
+    def candidate_arrays(self, equipment_type: str, origin: str, destination: str,
+                         weight_capacity: int, dates: list[date], limit: int,
+                         origin_radius: Optional[float] = None, destination_radius: Optional[float] = None) -> CandidateArrays:
+        """Scoring columns of the first limit loads best_loads would return, gathered from the index arrays"""
+        if not dates:
+            return CandidateArrays.empty()
+        with self._lock:
+            load_ids = self._matching_ids(equipment_type, origin, destination, weight_capacity, dates,
+                                          origin_radius, destination_radius)
+            arrays = self._scoring.take(load_ids)
+        return arrays.take(np.flatnonzero(arrays.total_rate > 0)).best_by_total_rate(limit)
+
+    def loads_by_id(self, load_ids: list[int]) -> list[LoadRecord]:
+        """Records in the order given; loads that have left the index since are skipped"""
+        with self._lock:
+            return [self._records[load_id] for load_id in load_ids if load_id in self._records]
+
+    def partial_match(self, equipment_type: str, origin: str, destination: str,
+                      origin_radius: Optional[float] = None, destination_radius: Optional[float] = None) -> Optional[LoadRecord]:
+        lanes = lane_preferences(origin, destination, origin_radius, destination_radius)
+        if not lanes:
+            return None
+        anchor = next((lane for lane in lanes if lane.point is not None), None)
+        with self._lock:
+            ids = set()
+            for lane in lanes:
+                ids |= self._lane_matches(lane)
+            equipment = normalize_equipment(equipment_type) if equipment_type else None
+            records = [self._records[load_id] for load_id in ids]
+            if equipment_type:
+                records = [record for record in records if record.equipment_norm == equipment]
+        if not records:
+            return None
+        if anchor is None:
+            return min(records, key=lambda r: r.load_id)
+
+        def nearest_first(record):
+            distance = approx_distance(*anchor.coordinates(record), *anchor.point)
+            return (distance is None, distance or 0.0, record.load_id)
+        return min(records, key=nearest_first)
+
+
+# Shared by every request in the worker
+load_index = LoadIndex(write_through=True)
+
+
+# Write-through: stage changed loads at flush time, apply them once the transaction commits.
+# Registered when the shared index is first loaded, so the database search backend never runs them.
+
+def _stage_load_change(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("load_index_changes", {})[target.load_id] = LoadRecord.from_load(target)
+
+
+def _stage_load_delete(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("load_index_deletes", set()).add(target.load_id)
+
+
+def _apply_load_changes(session):
+    changes = session.info.pop("load_index_changes", None)
+    deletes = session.info.pop("load_index_deletes", None)
+    if changes or deletes:
+        load_index.apply(records=(changes or {}).values(), deleted_ids=deletes or ())
+
+
+def _discard_load_changes(session):
+    session.info.pop("load_index_changes", None)
+    session.info.pop("load_index_deletes", None)
+
+
+LOAD_CHANGE_LISTENERS = [
+    (Load, "after_insert", _stage_load_change),
+    (Load, "after_update", _stage_load_change),
+    (Load, "after_delete", _stage_load_delete),
+    (Session, "after_commit", _apply_load_changes),
+    (Session, "after_rollback", _discard_load_changes),
+]
+_listeners_lock = threading.Lock()
+
+
+def _listen_for_load_changes():
+    with _listeners_lock:
+        for target, identifier, listener in LOAD_CHANGE_LISTENERS:
+            if not event.contains(target, identifier, listener):
+                event.listen(target, identifier, listener)
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from typing import Optional
+import asyncio
+import logging
+import os
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from app.database import get_async_db_context
+from app.models.load import Load
+from app.services.load_index import load_index
+
+# How long an offered load stays held for the carrier on the line
+LOAD_HOLD_SECONDS = int(os.getenv("LOAD_HOLD_SECONDS", "300"))
+# Ranked candidates tried, in order, when the best one was just taken
+LOAD_HOLD_CANDIDATES = int(os.getenv("LOAD_HOLD_CANDIDATES", "5"))
+LOAD_HOLD_SWEEP_SECONDS = float(os.getenv("LOAD_HOLD_SWEEP_SECONDS", "30"))
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+reservation_stats = {"holds": 0, "conflicts": 0, "releases": 0, "bookings": 0, "expired": 0}
+
+
+def _conditional_update(db: Session, load_id: int, condition, **values) -> bool:
+    """UPDATE one load only if condition still holds; True when this caller won"""
+    result = db.execute(
+        update(Load)
+        .where(Load.load_id == load_id, condition)
+        .values(version=Load.version + 1, **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def hold_load(db: Session, load_id: int, version: int, held_by: str, ttl_seconds: int = LOAD_HOLD_SECONDS) -> bool:
+    """
+    Hold an available load at the version the caller saw. Losing the race
+    (someone else held, booked or edited it first) returns False.
+    """
+    held = _conditional_update(
+        db, load_id,
+        and_(Load.status == "available", Load.version == version),
+        status="held",
+        held_by=held_by,
+        held_until=datetime.utcnow() + timedelta(seconds=ttl_seconds),
+    )
+    reservation_stats["holds" if held else "conflicts"] += 1
+    # Either way the index copy is now out of date
+    load_index.refresh(db, [load_id])
+    return held
+
+
+def hold_first_available(db: Session, loads: list, held_by: str, ttl_seconds: int = LOAD_HOLD_SECONDS):
+    """Hold the first load in ranked order that nobody else holds"""
+    # Versions as ranked; each attempt commits, which expires ORM instances
+    for load, version in [(load, load.version) for load in loads]:
+        if hold_load(db, load.load_id, version, held_by, ttl_seconds):
+            logger.info("Load %s held for %s (%ss)", load.load_id, held_by, ttl_seconds)
+            return load
+        logger.info("Load %s was taken by another call, trying the next candidate", load.load_id)
+    return None
+
+
+def release_hold(db: Session, load_id: int, held_by: str) -> bool:
+    """Put a held load back on the board; only the holder can release it"""
+    released = _conditional_update(
+        db, load_id,
+        and_(Load.status == "held", Load.held_by == held_by),
+        status="available", held_by=None, held_until=None,
+    )
+    if released:
+        reservation_stats["releases"] += 1
+        load_index.refresh(db, [load_id])
+    return released
+
+
+def release_session_holds(db: Session, held_by: str, keep: Optional[int] = None) -> int:
+    """Put back every load still held by one call, except keep (the load it booked)"""
+    held = and_(Load.status == "held", Load.held_by == held_by)
+    if keep is not None:
+        held = and_(held, Load.load_id != keep)
+    load_ids = [row.load_id for row in db.query(Load.load_id).filter(held).all()]
+    if not load_ids:
+        return 0
+    db.execute(
+        update(Load)
+        .where(Load.load_id.in_(load_ids), held)
+        .values(status="available", held_by=None, held_until=None, version=Load.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    load_index.refresh(db, load_ids)
+    reservation_stats["releases"] += len(load_ids)
+    return len(load_ids)
+
+
+def book_load(db: Session, load_id: int, held_by: str) -> bool:
+    """Book a load held by this caller, or one still available after its hold expired"""
+    booked = _conditional_update(
+        db, load_id,
+        or_(and_(Load.status == "held", Load.held_by == held_by), Load.status == "available"),
+        status="booked", held_by=held_by, held_until=None,
+    )
+    if booked:
+        reservation_stats["bookings"] += 1
+        load_index.refresh(db, [load_id])
+    return booked
+
+
+def expire_holds(db: Session, now: Optional[datetime] = None) -> int:
+    """Return loads whose hold ran out to the board"""
+    now = now or datetime.utcnow()
+    expired = and_(Load.status == "held", Load.held_until < now)
+    load_ids = [row.load_id for row in db.query(Load.load_id).filter(expired).all()]
+    if not load_ids:
+        return 0
+    db.execute(
+        update(Load)
+        .where(Load.load_id.in_(load_ids), expired)
+        .values(status="available", held_by=None, held_until=None, version=Load.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    load_index.refresh(db, load_ids)
+    reservation_stats["expired"] += len(load_ids)
+    logger.info("Released %s expired load holds", len(load_ids))
+    return len(load_ids)
+
+
+async def run_hold_sweeper(interval: float = LOAD_HOLD_SWEEP_SECONDS):
+    """Background task: expire stale holds every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with get_async_db_context() as db:
+                await db.run_sync(expire_holds)
+        except Exception as e:
+            logger.error("Load hold sweep failed: %s", e)
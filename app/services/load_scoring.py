@@ -0,0 +1,250 @@
+from dataclasses import dataclass, fields
+from datetime import date
+from typing import Optional
+import logging
+import os
+
+import numpy as np
+
+from app.models.load import geocode_location
+from app.geocoding import EARTH_RADIUS_MILES
+
+# Every feature is oriented so that higher is better before weighting
+FEATURES = ("total_rate", "rate_per_mile", "deadhead", "pickup_proximity", "weight_utilization")
+DEFAULT_WEIGHTS = {"total_rate": 1.0}
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def parse_weights(spec: Optional[str]) -> dict[str, float]:
+    """'total_rate=1,deadhead=0.5' -> {'total_rate': 1.0, 'deadhead': 0.5}; unknown features are ignored"""
+    weights = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in FEATURES:
+            logger.warning("Ignoring unknown load score feature %r", name)
+            continue
+        try:
+            weight = float(value)
+        except ValueError:
+            logger.warning("Ignoring invalid weight %r for load score feature %r", value, name)
+            continue
+        if weight:
+            weights[name] = weight
+    return weights or dict(DEFAULT_WEIGHTS)
+
+
+LOAD_SCORE_WEIGHTS = parse_weights(os.getenv("LOAD_SCORE_WEIGHTS", "total_rate=1"))
+# Most candidates pulled from the search backend for scoring under non-default weights
+LOAD_SCORE_CANDIDATES = int(os.getenv("LOAD_SCORE_CANDIDATES", "5000"))
+
+
+def is_rate_only(weights: dict[str, float]) -> bool:
+    """True when the weights rank exactly like the backends' total-rate ordering"""
+    return set(weights) == {"total_rate"} and weights["total_rate"] > 0
+
+
+def scoring_row(load) -> tuple:
+    """(load_id, pickup_date, total_rate, miles, weight, origin_lat, origin_lon) of a Load or LoadRecord"""
+    miles = load.miles or 0
+    total_rate = load.loadboard_rate * miles if miles > 0 else load.loadboard_rate
+    return load.load_id, load.pickup_date, total_rate, load.miles, load.weight, load.origin_lat, load.origin_lon
+
+
+@dataclass
+class CandidateArrays:
+    """Column arrays for a batch of candidate loads; unknown values are NaN"""
+    load_id: np.ndarray
+    pickup_ordinal: np.ndarray
+    total_rate: np.ndarray
+    miles: np.ndarray
+    weight: np.ndarray
+    origin_lat: np.ndarray
+    origin_lon: np.ndarray
+
+    @classmethod
+    def empty(cls, count: int = 0) -> "CandidateArrays":
+        return cls(np.zeros(count, dtype=np.int64), np.zeros(count, dtype=np.int64),
+                   *(np.full(count, np.nan) for _ in range(5)))
+
+    @classmethod
+    def from_rows(cls, rows) -> "CandidateArrays":
+        """
+        Columns of scoring_row-shaped tuples, such as query rows selecting
+        load_search.SCORING_COLUMNS; fields after origin_lon are ignored.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+        load_id, pickup_date, total_rate, miles, weight, origin_lat, origin_lon = list(zip(*rows))[:7]
+        return cls(
+            load_id=np.array(load_id, dtype=np.int64),
+            pickup_ordinal=np.fromiter((day.toordinal() if day else 0 for day in pickup_date), dtype=np.int64, count=len(rows)),
+            # Float conversion turns None into NaN
+            total_rate=np.array(total_rate, dtype=np.float64),
+            miles=np.nan_to_num(np.array(miles, dtype=np.float64), nan=0.0),
+            weight=np.array(weight, dtype=np.float64),
+            origin_lat=np.array(origin_lat, dtype=np.float64),
+            origin_lon=np.array(origin_lon, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_loads(cls, loads: list) -> "CandidateArrays":
+        return cls.from_rows(map(scoring_row, loads))
+
+    def __len__(self):
+        return len(self.load_id)
+
+    def set_row(self, index: int, row: tuple):
+        """Overwrite one candidate in place from a scoring_row tuple"""
+        load_id, pickup_date, total_rate, miles, weight, origin_lat, origin_lon = row
+        self.load_id[index] = load_id
+        self.pickup_ordinal[index] = pickup_date.toordinal() if pickup_date else 0
+        self.total_rate[index] = total_rate
+        self.miles[index] = miles or 0
+        self.weight[index] = np.nan if weight is None else weight
+        self.origin_lat[index] = np.nan if origin_lat is None else origin_lat
+        self.origin_lon[index] = np.nan if origin_lon is None else origin_lon
+
+    def take(self, indices: np.ndarray) -> "CandidateArrays":
+        """Copy of the candidates at indices, in that order"""
+        return type(self)(**{f.name: getattr(self, f.name)[indices] for f in fields(self)})
+
+    def resized(self, count: int) -> "CandidateArrays":
+        """Copy with room for count candidates; slots past the current length are empty"""
+        grown = self.empty(count)
+        kept = min(count, len(self))
+        for f in fields(self):
+            getattr(grown, f.name)[:kept] = getattr(self, f.name)[:kept]
+        return grown
+
+    def best_by_total_rate(self, limit: int) -> "CandidateArrays":
+        """
+        The first limit candidates in the backends' order: total rate, then
+        earliest pickup, then load_id. Only the band at or above the limit-th
+        rate is sorted.
+        """
+        count = len(self)
+        if limit <= 0:
+            return self.empty()
+        if count <= limit:
+            return self
+        threshold = np.partition(self.total_rate, count - limit)[count - limit]
+        band = np.flatnonzero(self.total_rate >= threshold)
+        order = np.lexsort((self.load_id[band], self.pickup_ordinal[band], -self.total_rate[band]))
+        return self.take(band[order[:limit]])
+
+
+def haversine_miles_array(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Vectorized geocoding.haversine_miles from one point to many"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def feature_columns(arrays: CandidateArrays, carrier_point: Optional[tuple[float, float]],
+                    dates: list[date], weight_capacity: int) -> dict[str, np.ndarray]:
+    """Raw feature values per candidate; NaN where a feature cannot be computed"""
+    count = len(arrays.load_id)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate_per_mile = np.where(arrays.miles > 0, arrays.total_rate / arrays.miles, np.nan)
+    if carrier_point is not None:
+        deadhead = -haversine_miles_array(carrier_point[0], carrier_point[1], arrays.origin_lat, arrays.origin_lon)
+    else:
+        deadhead = np.full(count, np.nan)
+    if dates:
+        pickup_proximity = -np.abs(arrays.pickup_ordinal - min(dates).toordinal()).astype(np.float64)
+    else:
+        pickup_proximity = np.full(count, np.nan)
+    if weight_capacity and weight_capacity > 0:
+        weight_utilization = arrays.weight / float(weight_capacity)
+    else:
+        weight_utilization = np.full(count, np.nan)
+    return {
+        "total_rate": arrays.total_rate,
+        "rate_per_mile": rate_per_mile,
+        "deadhead": deadhead,
+        "pickup_proximity": pickup_proximity,
+        "weight_utilization": weight_utilization,
+    }
+
+
+def score(features: dict[str, np.ndarray], weights: dict[str, float]) -> np.ndarray:
+    """
+    Weighted sum of min-max normalized features. Each feature is scaled to
+    0..1 within the batch so weights are comparable; missing values score 0.
+    """
+    total = None
+    for name, weight in weights.items():
+        values = features[name]
+        low, high = np.nanmin(values, initial=np.inf), np.nanmax(values, initial=-np.inf)
+        if np.isfinite(low) and high > low:
+            normalized = np.nan_to_num((values - low) / (high - low), nan=0.0)
+        else:
+            normalized = np.where(np.isnan(values), 0.0, 1.0)
+        total = weight * normalized if total is None else total + weight * normalized
+    return total
+
+
+def top_k(scores: np.ndarray, arrays: CandidateArrays, k: int) -> np.ndarray:
+    """
+    Indices of the k best scores, ties broken by earliest pickup then lowest
+    load_id. argpartition narrows to the top band before the final sort.
+    """
+    count = len(scores)
+    if count == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < count:
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        # Keep every candidate tied with the k-th score so tie-breaking stays deterministic
+        band = np.flatnonzero(scores >= threshold)
+    else:
+        band = np.arange(count)
+    order = np.lexsort((arrays.load_id[band], arrays.pickup_ordinal[band], -scores[band]))
+    return band[order[:k]]
+
+
+def rank(arrays: CandidateArrays, weights: dict[str, float], limit: int,
+         carrier_point: Optional[tuple[float, float]] = None, dates: Optional[list[date]] = None,
+         weight_capacity: int = 0) -> np.ndarray:
+    """Indices of the top `limit` candidates by weighted score"""
+    if len(arrays) == 0:
+        return np.empty(0, dtype=np.int64)
+    return top_k(score(feature_columns(arrays, carrier_point, dates or [], weight_capacity), weights), arrays, limit)
+
+
+def rank_loads(loads: list, weights: dict[str, float], limit: int, carrier_point: Optional[tuple[float, float]] = None,
+               dates: Optional[list[date]] = None, weight_capacity: int = 0) -> list:
+    """Top `limit` of already-fetched loads by weighted score"""
+    if not loads:
+        return []
+    arrays = CandidateArrays.from_loads(loads)
+    return [loads[i] for i in rank(arrays, weights, limit, carrier_point, dates, weight_capacity)]
+
+
+def best_scored_loads(search, equipment_type: str, origin: str, destination: str, weight_capacity: int,
+                      dates: list[date], limit: int = 1, origin_radius: Optional[float] = None,
+                      destination_radius: Optional[float] = None, weights: Optional[dict[str, float]] = None) -> list:
+    """
+    Best loads from either search backend under the configured ranking model.
+    Rate-only weights use the backend's own ordering. Anything else scores the
+    scoring columns of up to LOAD_SCORE_CANDIDATES matching loads, and only
+    the winners are read in full.
+    """
+    weights = weights or LOAD_SCORE_WEIGHTS
+    if is_rate_only(weights):
+        return search.best_loads(equipment_type, origin, destination, weight_capacity, dates, limit,
+                                 origin_radius=origin_radius, destination_radius=destination_radius)
+
+    arrays = search.candidate_arrays(equipment_type, origin, destination, weight_capacity, dates, LOAD_SCORE_CANDIDATES,
+                                     origin_radius=origin_radius, destination_radius=destination_radius)
+    if len(arrays) >= LOAD_SCORE_CANDIDATES:
+        logger.info("Scoring capped at the top %s loads by total rate", LOAD_SCORE_CANDIDATES)
+    carrier_point = geocode_location(origin) if origin else None
+    best = rank(arrays, weights, limit, carrier_point, dates, weight_capacity)
+    return search.loads_by_id(arrays.load_id[best].tolist())
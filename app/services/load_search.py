@@ -0,0 +1,241 @@
+from sqlalchemy import and_, or_, case, literal
+from sqlalchemy.orm import Session
+from datetime import datetime, date
+from typing import Optional
+import logging
+import os
+
+from math import cos, radians
+
+from app.models.load import Load, LanePreference, lane_preferences, normalize_equipment
+from app.geocoding import SearchArea
+from app.services.load_index import LoadIndex, LoadRecord, RECORD_COLUMNS, load_index
+from app.services.load_scoring import CandidateArrays
+
+# "db" queries the loads table per search, "index" answers from the in-process LoadIndex
+LOAD_SEARCH_BACKEND = os.getenv("LOAD_SEARCH_BACKEND", "db").lower()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def equipment_filter(equipment_type: str):
+    """Case-insensitive equipment match on the indexed normalized column"""
+    return Load.equipment_norm == normalize_equipment(equipment_type)
+
+
+def location_filter(city_column, state_column, lane: LanePreference):
+    """
+    Index-friendly equality match for a carrier's lane preference.
+    'Chicago, IL' matches city and state, 'TX' matches a state (or a city
+    literally named that), anything else matches the city name. Metro
+    aliases such as 'Chicagoland' resolve to their city first.
+    """
+    if lane.state:
+        return and_(city_column == lane.city, state_column == lane.state)
+    if lane.city and len(lane.city) == 2 and lane.city.isalpha():
+        return or_(state_column == lane.city, city_column == lane.city)
+    return city_column == lane.city
+
+
+def area_filter(lat_column, lon_column, area: SearchArea):
+    """Bounding box of a radius search; rows inside still need the exact distance check"""
+    min_lat, max_lat, min_lon, max_lon = area.bounds()
+    return and_(lat_column.between(min_lat, max_lat), lon_column.between(min_lon, max_lon))
+
+
+def lane_columns(lane: LanePreference):
+    """(city, state, lat, lon) columns for the lane's end of the load"""
+    if lane.end == "origin":
+        return Load.origin_city, Load.origin_state, Load.origin_lat, Load.origin_lon
+    return Load.destination_city, Load.destination_state, Load.destination_lat, Load.destination_lon
+
+
+def lane_filter(lane: LanePreference):
+    city_column, state_column, lat_column, lon_column = lane_columns(lane)
+    if lane.area is not None:
+        return area_filter(lat_column, lon_column, lane.area)
+    return location_filter(city_column, state_column, lane)
+
+
+def approx_distance_expr(lat_column, lon_column, lat: float, lon: float):
+    """SQL twin of geocoding.approx_distance, evaluated with the same operations"""
+    dlat = lat_column - literal(lat)
+    dlon = (lon_column - literal(lon)) * literal(cos(radians(lat)))
+    return dlat * dlat + dlon * dlon
+
+
+def nearest_anchor(lanes: list[LanePreference]) -> Optional[LanePreference]:
+    """Lane end the partial-match fallback measures distance from: the origin first, if it geocodes"""
+    for lane in lanes:
+        if lane.point is not None:
+            return lane
+    return None
+
+
+# Total payout: rate per mile times miles, or the flat rate when miles are unknown
+total_rate_expr = case((Load.miles > 0, Load.loadboard_rate * Load.miles), else_=Load.loadboard_rate)
+
+
+def load_total_rate(load) -> float:
+    miles = getattr(load, "miles", 0) or 0
+    return load.loadboard_rate * miles if miles > 0 else load.loadboard_rate
+
+
+def parse_available_dates(available_dates: list) -> list[date]:
+    """YYYY-MM-DD strings to dates, skipping (and logging) malformed entries"""
+    dates = []
+    for available_date in available_dates:
+        try:
+            dates.append(datetime.strptime(available_date, "%Y-%m-%d").date())
+        except (TypeError, ValueError):
+            logger.warning("Invalid date format: %s, skipping date filter", available_date)
+    return dates
+
+
+# What load scoring reads, in load_scoring.scoring_row order, then what radius lanes are checked against
+SCORING_COLUMNS = (Load.load_id, Load.pickup_date, total_rate_expr.label("total_rate"), Load.miles, Load.weight,
+                   Load.origin_lat, Load.origin_lon, Load.destination_lat, Load.destination_lon)
+
+
+def best_loads_query(db: Session, columns, equipment_type: str, origin: str, destination: str,
+                     weight_capacity: int, dates: list[date],
+                     origin_radius: Optional[float] = None, destination_radius: Optional[float] = None):
+    """
+    Matching available loads, best total rate first, then earliest pickup,
+    then lowest load_id, and the radius lanes whose exact distance check
+    is left to the caller (SQL only narrows them by bounding box).
+    """
+    query = db.query(*columns).filter(
+        Load.status == "available",
+        Load.pickup_date.in_(dates),
+        total_rate_expr > 0,
+    )
+    if equipment_type:
+        query = query.filter(equipment_filter(equipment_type))
+    lanes = lane_preferences(origin, destination, origin_radius, destination_radius)
+    for lane in lanes:
+        query = query.filter(lane_filter(lane))
+    if weight_capacity and weight_capacity > 0:
+        query = query.filter(Load.weight <= weight_capacity)
+
+    query = query.order_by(total_rate_expr.desc(), Load.pickup_date, Load.load_id)
+    return query, [lane for lane in lanes if lane.area is not None]
+
+
+def first_matching(query, radius_lanes: list[LanePreference], limit: int) -> list:
+    """The first limit rows of query inside every radius lane"""
+    if not radius_lanes:
+        return query.limit(limit).all()
+    rows = []
+    for row in query.yield_per(200):
+        if all(lane.matches(row) for lane in radius_lanes):
+            rows.append(row)
+            if len(rows) >= limit:
+                break
+    return rows
+
+
+def find_best_loads(db: Session, equipment_type: str, origin: str, destination: str,
+                    weight_capacity: int, dates: list[date], limit: int = 1,
+                    origin_radius: Optional[float] = None, destination_radius: Optional[float] = None) -> list[Load]:
+    """
+    Top loads by total rate across all of the carrier's dates, ranked in SQL.
+    Ties go to the earliest pickup, then the lowest load_id. Radius lanes are
+    narrowed by bounding box in SQL and checked exactly while reading rows.
+    """
+    if not dates:
+        return []
+    query, radius_lanes = best_loads_query(db, (Load,), equipment_type, origin, destination, weight_capacity, dates,
+                                           origin_radius, destination_radius)
+    return first_matching(query, radius_lanes, limit)
+
+
+class DatabaseLoadSearch:
+    """Load matching backed by indexed queries on the loads table"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def equipment_available(self, equipment_type: str) -> bool:
+        return self.db.query(Load.load_id).filter(
+            Load.status == "available",
+            equipment_filter(equipment_type)
+        ).first() is not None
+
+    def best_loads(self, equipment_type: str, origin: str, destination: str,
+                   weight_capacity: int, dates: list[date], limit: int = 1,
+                   origin_radius: Optional[float] = None, destination_radius: Optional[float] = None) -> list[Load]:
+        return find_best_loads(self.db, equipment_type, origin, destination, weight_capacity, dates, limit,
+                               origin_radius, destination_radius)
+
+    def candidate_arrays(self, equipment_type: str, origin: str, destination: str,
+                         weight_capacity: int, dates: list[date], limit: int,
+                         origin_radius: Optional[float] = None, destination_radius: Optional[float] = None) -> CandidateArrays:
+        """Scoring columns of the first limit loads best_loads would return, read as plain rows"""
+        if not dates:
+            return CandidateArrays.empty()
+        query, radius_lanes = best_loads_query(self.db, SCORING_COLUMNS, equipment_type, origin, destination,
+                                               weight_capacity, dates, origin_radius, destination_radius)
+        return CandidateArrays.from_rows(first_matching(query, radius_lanes, limit))
+
+    def loads_by_id(self, load_ids: list[int]) -> list[Load]:
+        """Loads in the order given; ids no longer in the table are skipped"""
+        if not load_ids:
+            return []
+        loads = {load.load_id: load for load in self.db.query(Load).filter(Load.load_id.in_(load_ids))}
+        return [loads[load_id] for load_id in load_ids if load_id in loads]
+
+    def partial_match(self, equipment_type: str, origin: str, destination: str,
+                      origin_radius: Optional[float] = None, destination_radius: Optional[float] = None) -> Optional[Load]:
+        """
+        Available load on either lane end, ignoring dates and weight. The one
+        nearest the carrier's origin (or destination) wins when it geocodes.
+        """
+        lanes = lane_preferences(origin, destination, origin_radius, destination_radius)
+        if not lanes:
+            return None
+        query = self.db.query(Load).filter(Load.status == "available", or_(*(lane_filter(lane) for lane in lanes)))
+        if equipment_type:
+            query = query.filter(equipment_filter(equipment_type))
+
+        anchor = nearest_anchor(lanes)
+        if anchor is None:
+            query = query.order_by(Load.load_id)
+        else:
+            _, _, lat_column, lon_column = lane_columns(anchor)
+            distance = approx_distance_expr(lat_column, lon_column, *anchor.point)
+            query = query.order_by(distance.is_(None), distance, Load.load_id)
+
+        for load in query.yield_per(200):
+            if any(lane.matches(load) for lane in lanes):
+                return load
+        return None
+
+
+def get_load_search(db: Session):
+    """Search backend selected by LOAD_SEARCH_BACKEND"""
+    if LOAD_SEARCH_BACKEND == "index":
+        load_index.ensure_fresh(db)
+        return load_index
+    return DatabaseLoadSearch(db)
+
+
+def batch_load_search(db: Session, queries: list):
+    """
+    Search backend for a batch of carrier queries: every available load the
+    batch could match is read in one query into a throwaway LoadIndex, so
+    each query is answered in memory. Dates are not narrowed because the
+    partial-match fallback ignores them.
+    """
+    if LOAD_SEARCH_BACKEND == "index":
+        load_index.ensure_fresh(db)
+        return load_index
+
+    query = db.query(*RECORD_COLUMNS).filter(Load.status == "available")
+    equipment_types = [q.get("equipment_type") if isinstance(q, dict) else None for q in queries]
+    if all(equipment_types):
+        query = query.filter(Load.equipment_norm.in_({normalize_equipment(e) for e in equipment_types}))
+    index = LoadIndex()
+    index.load_records(LoadRecord(*row) for row in query)
+    return index
@@ -0,0 +1,179 @@
+from contextlib import contextmanager
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from typing import Iterable, Optional
+import asyncio
+import io
+import logging
+import os
+import time
+
+import httpx
+from sqlalchemy import and_, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import get_db_context
+from app.models.load import Load
+from app.services.load_import import LOAD_IMPORT_BATCH_SIZE, LOAD_IMPORT_MAX_ERRORS, parse_load_record, write_loads
+from app.services.load_index import load_index
+from app.services.streaming import detect_format, iter_records
+
+# Load board feed to reconcile against: a file path or an http(s) URL (CSV, JSON array or NDJSON)
+LOAD_FEED_URL = os.getenv("LOAD_FEED_URL")
+# Seconds between background syncs, off unless set; past-pickup expiry runs even without a feed
+LOAD_SYNC_SECONDS = float(os.getenv("LOAD_SYNC_SECONDS", "0"))
+LOAD_FEED_TIMEOUT = float(os.getenv("LOAD_FEED_TIMEOUT", "60"))
+
+# Loads the feed can still take back; booked loads are never expired
+EXPIRABLE_STATUSES = ("available", "held")
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def open_feed(source: str, fmt: Optional[str] = None):
+    """Yield (text file, format) for a feed path or URL; URLs are downloaded to a spooled temp file first"""
+    if not source.startswith(("http://", "https://")):
+        with open(source, newline="", encoding="utf-8") as f:
+            yield f, fmt or detect_format(source)
+        return
+
+    with SpooledTemporaryFile(max_size=1024 * 1024) as body:
+        with httpx.stream("GET", source, timeout=LOAD_FEED_TIMEOUT, follow_redirects=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                body.write(chunk)
+            content_type = response.headers.get("content-type", "")
+        body.seek(0)
+        if fmt is None:
+            fmt = "csv" if "csv" in content_type else detect_format(source.split("?", 1)[0])
+        with io.TextIOWrapper(body, encoding="utf-8", newline="") as f:
+            yield f, fmt
+
+
+def _expire(db: Session, load_ids: list[int], condition, batch_size: int) -> int:
+    """Mark loads expired in chunks, re-checking condition so concurrent bookings win"""
+    expired = 0
+    for start in range(0, len(load_ids), batch_size):
+        chunk = load_ids[start:start + batch_size]
+        expired += db.execute(
+            update(Load)
+            .where(Load.load_id.in_(chunk), condition)
+            .values(status="expired", held_by=None, held_until=None, version=Load.version + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        load_index.refresh(db, chunk)
+    return expired
+
+
+def expire_past_pickups(db: Session, now: Optional[datetime] = None, batch_size: int = LOAD_IMPORT_BATCH_SIZE) -> int:
+    """
+    Expire available loads whose pickup time has passed. Pickup times are
+    local wall-clock times, so now defaults to the local time, not UTC.
+    """
+    now = now or datetime.now()
+    past = and_(Load.status == "available", Load.pickup_datetime < now)
+    load_ids = [row.load_id for row in db.query(Load.load_id).filter(past)]
+    return _expire(db, load_ids, past, batch_size)
+
+
+def sync_loads(db: Session, records: Iterable[dict], now: Optional[datetime] = None,
+               batch_size: int = LOAD_IMPORT_BATCH_SIZE) -> dict:
+    """
+    Reconcile loads against a full feed snapshot. Each batch of records is
+    compared by content hash with what is stored, and only added or changed
+    loads are written. Feed-managed loads (content_hash set) missing from the
+    feed are then expired, as are available loads whose pickup has passed.
+    Records without a load_id cannot be matched and count as invalid.
+    """
+    # Same local wall-clock frame as pickup_datetime
+    now = now or datetime.now()
+    stats = {"read": 0, "added": 0, "changed": 0, "unchanged": 0, "invalid": 0,
+             "expired_missing": 0, "expired_past": 0, "errors": []}
+    started = time.monotonic()
+    seen: set[int] = set()
+    batch: dict[int, dict] = {}
+
+    def invalid(number, message):
+        stats["invalid"] += 1
+        if len(stats["errors"]) < LOAD_IMPORT_MAX_ERRORS:
+            stats["errors"].append(f"record {number}: {message}")
+
+    def flush():
+        if not batch:
+            return
+        stored = {
+            row.load_id: row
+            for row in db.query(Load.load_id, Load.content_hash, Load.status).filter(Load.load_id.in_(list(batch)))
+        }
+        writes = []
+        for load_id, row in batch.items():
+            current = stored.get(load_id)
+            if current is None:
+                stats["added"] += 1
+            elif current.content_hash == row["content_hash"] and not (
+                    # Back in the feed after being expired, and still worth offering
+                    current.status == "expired" and row["pickup_datetime"] >= now):
+                stats["unchanged"] += 1
+                continue
+            else:
+                stats["changed"] += 1
+            writes.append(row)
+        if writes:
+            write_loads(db, writes)
+        batch.clear()
+
+    for number, record in enumerate(records, 1):
+        stats["read"] += 1
+        try:
+            row = parse_load_record(record)
+        except ValueError as e:
+            invalid(number, e)
+            continue
+        if row["load_id"] is None:
+            invalid(number, "load_id is required to sync")
+            continue
+        row["status"] = "available"
+        row["version"] = 0
+        seen.add(row["load_id"])
+        batch[row["load_id"]] = row
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    if seen:
+        managed = and_(Load.content_hash.is_not(None), Load.status.in_(EXPIRABLE_STATUSES))
+        missing = [row.load_id for row in db.query(Load.load_id).filter(managed) if row.load_id not in seen]
+        stats["expired_missing"] = _expire(db, missing, managed, batch_size)
+    else:
+        # An empty or unreadable feed must not wipe the board
+        logger.warning("Load feed had no valid records; not expiring missing loads")
+    stats["expired_past"] = expire_past_pickups(db, now, batch_size)
+
+    elapsed = time.monotonic() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["rows_per_second"] = round(stats["read"] / elapsed) if elapsed > 0 else stats["read"]
+    return stats
+
+
+def sync_from_source(source: Optional[str], fmt: Optional[str] = None) -> dict:
+    """One full sync against a feed path/URL; with no source, only expire past pickups"""
+    with get_db_context() as db:
+        if not source:
+            return {"expired_past": expire_past_pickups(db)}
+        with open_feed(source, fmt) as (f, feed_format):
+            return sync_loads(db, iter_records(f, feed_format))
+
+
+async def run_load_sync(source: Optional[str] = LOAD_FEED_URL, interval: float = LOAD_SYNC_SECONDS):
+    """Background task: reconcile with the load feed every interval seconds"""
+    while True:
+        try:
+            stats = await run_in_threadpool(sync_from_source, source)
+            logger.info("Load sync: %s", {key: value for key, value in stats.items() if key != "errors"})
+        except Exception as e:
+            logger.error("Load sync failed: %s", e)
+        await asyncio.sleep(interval)
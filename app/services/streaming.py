@@ -0,0 +1,78 @@
+import csv
+import json
+from typing import IO, Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_csv_records(f: IO[str]) -> Iterator[dict]:
+    """Yield CSV rows as dicts keyed by the header row, one row at a time"""
+    yield from csv.DictReader(f)
+
+
+def iter_json_records(f: IO[str]) -> Iterator[dict]:
+    """
+    Yield objects from either a top-level JSON array or NDJSON, reading the
+    file in fixed-size chunks so memory stays bounded by the largest record.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    in_array = None
+    eof = False
+
+    while True:
+        # Skip whitespace and array punctuation between records
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if in_array is None and pos < len(buffer):
+            in_array = buffer[pos] == "["
+            if in_array:
+                pos += 1
+                continue
+        if pos < len(buffer) and buffer[pos] == "]" and in_array:
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                if buffer[pos:].strip():
+                    raise
+                if in_array:
+                    # Cut off between records; don't pass a partial file off as complete
+                    raise json.JSONDecodeError("Unterminated array", buffer, pos)
+                return
+            chunk = f.read(CHUNK_SIZE)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            continue
+
+        # A number or literal may be cut off at a chunk boundary; read more before trusting it
+        if end == len(buffer) and not eof and not isinstance(record, (dict, list, str)):
+            chunk = f.read(CHUNK_SIZE)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            continue
+
+        pos = end
+        yield record
+
+
+def iter_records(f: IO[str], fmt: str) -> Iterator[dict]:
+    """Dispatch to the CSV or JSON/NDJSON reader"""
+    if fmt == "csv":
+        return iter_csv_records(f)
+    if fmt in ("json", "ndjson"):
+        return iter_json_records(f)
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def detect_format(path: str) -> str:
+    """Guess the record format from a file name"""
+    lowered = path.lower()
+    if lowered.endswith((".json", ".ndjson", ".jsonl")):
+        return "json"
+    return "csv"
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+import logging
+import os
+import re
+import time
+
+from sqlalchemy.orm import Session
+
+from app.database import get_async_db_context, dialect_insert
+from app.models.carrier import MCVerificationCache
+
+# Seconds each kind of FMCSA answer stays cached; transport errors are never cached
+CACHE_TTLS = {
+    "verified": int(os.getenv("FMCSA_CACHE_TTL_VERIFIED", "21600")),
+    "not_allowed": int(os.getenv("FMCSA_CACHE_TTL_NOT_ALLOWED", "3600")),
+    "not_found": int(os.getenv("FMCSA_CACHE_TTL_NOT_FOUND", "900")),
+}
+FMCSA_CACHE_SIZE = int(os.getenv("FMCSA_CACHE_SIZE", "10000"))
+# Share results across workers through the mc_verification_cache table
+FMCSA_CACHE_DB = os.getenv("FMCSA_CACHE_DB", "false").lower() in ("1", "true", "yes")
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class VerificationResult(NamedTuple):
+    status: str  # verified, not_allowed, not_found, error, pending
+    carrier_name: str = "Unknown"
+
+    @property
+    def verified(self) -> bool:
+        return self.status == "verified"
+
+
+def normalize_mc_number(mc_number: str) -> str:
+    """Strip the MC prefix, separators and leading zeros so '  mc-001515' == '1515'"""
+    clean_mc = re.sub(r"^MC[\s#:\-]*", "", mc_number.strip().upper()).strip()
+    if clean_mc.isdigit():
+        clean_mc = clean_mc.lstrip("0") or "0"
+    return clean_mc
+
+
+class VerificationCache:
+    """
+    Two-level cache of FMCSA verification results keyed by normalized MC number:
+    an in-process LRU, backed by an optional database table.
+    """
+
+    def __init__(self, max_size: int = FMCSA_CACHE_SIZE, ttls: dict = CACHE_TTLS, use_db: bool = FMCSA_CACHE_DB):
+        self.max_size = max_size
+        self.ttls = ttls
+        self.use_db = use_db
+        self._entries: OrderedDict[str, tuple[VerificationResult, float]] = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _remember(self, mc_number: str, result: VerificationResult, expires_at: float):
+        self._entries[mc_number] = (result, expires_at)
+        self._entries.move_to_end(mc_number)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, mc_number: str) -> Optional[VerificationResult]:
+        entry = self._entries.get(mc_number)
+        if entry is not None:
+            result, expires_at = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(mc_number)
+                self.memory_hits += 1
+                return result
+
+        if self.use_db:
+            async with get_async_db_context() as db:
+                row = await db.run_sync(self._load_row, mc_number)
+            if row is not None:
+                result, expires_at = row
+                self._remember(mc_number, result, expires_at)
+                self.db_hits += 1
+                return result
+
+        self.misses += 1
+        return None
+
+    def get_stale(self, mc_number: str) -> Optional[VerificationResult]:
+        """Last known result even if expired; expired entries stay until evicted by the LRU"""
+        entry = self._entries.get(mc_number)
+        return entry[0] if entry is not None else None
+
+    async def set(self, mc_number: str, result: VerificationResult):
+        ttl = self.ttls.get(result.status)
+        if not ttl:
+            return
+        self._remember(mc_number, result, time.time() + ttl)
+        self.stores += 1
+        if self.use_db:
+            await self._store_row(mc_number, result, ttl)
+
+    @staticmethod
+    def _load_row(db: Session, mc_number: str) -> Optional[tuple[VerificationResult, float]]:
+        now = datetime.utcnow()
+        row = db.query(MCVerificationCache).filter(
+            MCVerificationCache.mc_number == mc_number,
+            MCVerificationCache.expires_at > now,
+        ).first()
+        if row is None:
+            return None
+        remaining = (row.expires_at - now).total_seconds()
+        return VerificationResult(row.status, row.carrier_name or "Unknown"), time.time() + remaining
+
+    async def _store_row(self, mc_number: str, result: VerificationResult, ttl: int):
+        now = datetime.utcnow()
+        values = {
+            "mc_number": mc_number,
+            "status": result.status,
+            "carrier_name": result.carrier_name,
+            "checked_at": now,
+            "expires_at": now + timedelta(seconds=ttl),
+        }
+        try:
+            async with get_async_db_context() as db:
+                stmt = dialect_insert(db.sync_session, MCVerificationCache.__table__).values(**values)
+                stmt = stmt.on_conflict_do_update(index_elements=["mc_number"], set_=values)
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            logger.warning("Could not persist verification cache entry for MC %s: %s", mc_number, e)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "size": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "shared_db": self.use_db,
+        }
+
+
+# Shared by every request in the worker
+verification_cache = VerificationCache()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Compare the old and tuned SQLite engine settings under a webhook-like workload
+
+    python3 bench_db.py --writers 8 --readers 4 --seconds 10
+
+Writers save call summaries (CallLog insert + rollup upsert, one commit each,
+like /webhook/happyrobot/summary); readers recompute the dashboard metrics.
+Each profile runs against its own fresh database file.
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, build_engine
+from app.models.load import CallLog
+from app.services.call_metrics import record_call_metrics
+from app.services.dashboard_metrics import compute_dashboard_metrics
+
+OUTCOMES = ["won", "lost", "no_agreement", "transferred"]
+SENTIMENTS = ["positive", "neutral", "negative"]
+
+
+def write_summaries(factory, stop: threading.Event, stats: dict, lock: threading.Lock, seed: int):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        try:
+            with factory() as db:
+                call_log = CallLog(
+                    session_id=f"bench-{seed}-{rng.random()}",
+                    mc_number=str(rng.randint(100000, 999999)),
+                    carrier_name="Bench Carrier",
+                    call_outcome=rng.choice(OUTCOMES),
+                    sentiment=rng.choice(SENTIMENTS),
+                    duration=rng.randint(30, 900),
+                    call_summary="Benchmark call",
+                )
+                db.add(call_log)
+                db.flush()
+                record_call_metrics(db, [call_log])
+                db.commit()
+            key = "writes"
+        except OperationalError as e:
+            key = "locked" if "locked" in str(e) else "errors"
+        with lock:
+            stats[key] += 1
+
+
+def read_dashboard(factory, stop: threading.Event, stats: dict, lock: threading.Lock):
+    while not stop.is_set():
+        try:
+            with factory() as db:
+                compute_dashboard_metrics(db)
+            key = "reads"
+        except OperationalError as e:
+            key = "locked" if "locked" in str(e) else "errors"
+        with lock:
+            stats[key] += 1
+
+
+def run_profile(tuned: bool, writers: int, readers: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = build_engine(url, tuned=tuned)
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine)
+
+        stats = {"writes": 0, "reads": 0, "locked": 0, "errors": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+        threads = [threading.Thread(target=write_summaries, args=(factory, stop, stats, lock, i)) for i in range(writers)]
+        threads += [threading.Thread(target=read_dashboard, args=(factory, stop, stats, lock)) for _ in range(readers)]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        engine.dispose()
+    stats["elapsed"] = elapsed
+    return stats
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark the database engine settings")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"🔧 {args.writers} writers, {args.readers} readers, {args.seconds:g}s per profile")
+    for name, tuned in (("baseline", False), ("tuned", True)):
+        stats = run_profile(tuned, args.writers, args.readers, args.seconds)
+        elapsed = stats["elapsed"]
+        print(f"   {name:>8}: {stats['writes'] / elapsed:8.1f} writes/s  {stats['reads'] / elapsed:8.1f} reads/s  "
+              f"{stats['locked']} locked  {stats['errors']} other errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Measure the logging cost a load search request pays on its own thread
+
+    python3 bench_logging.py --requests 20000
+
+"before" replays the old handler logging: the payload pretty-printed at
+INFO, f-strings, and a synchronous stream handler. "lazy" is the new call
+sites (guarded payload dump, %-args) on the same synchronous handler; the
+remaining profiles add redaction and the QueueHandler that
+app.logging_config installs, at INFO and at WARNING. Output goes to
+/dev/null, so a real terminal or pipe only widens the gap for the queued
+profiles.
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from app.logging_config import build_handler
+
+PAYLOAD = {
+    "session_id": "bench-session",
+    "mc_number": "1515",
+    "equipment_type": "Dry Van",
+    "origin": "Chicago, IL",
+    "destination": "Dallas, TX",
+    "origin_radius_miles": 50,
+    "weight_capacity": 42000,
+    "available_dates": ["2025-09-10", "2025-09-11", "2025-09-12"],
+    "notes": "Carrier prefers morning pickups and drop and hook at the receiver",
+}
+LOAD = {"load_id": 1042, "equipment_type": "Dry Van", "commodity_type": "General freight",
+        "origin": "Chicago, IL", "destination": "Dallas, TX", "total_rate": 2437.5}
+
+
+def before(logger: logging.Logger):
+    p = PAYLOAD
+    logger.info(f"Load search request: {json.dumps(p, indent=2)}")
+    logger.info(f"Carrier capabilities - Equipment: {p['equipment_type']}, Origin: {p['origin']} (radius {p['origin_radius_miles']}), Destination: {p['destination']} (radius None), Weight Capacity: {p['weight_capacity']} lbs, Available Dates: {p['available_dates']}")
+    logger.info(f"Selected absolute best load: ID {LOAD['load_id']} on 2025-09-10 with total rate ${LOAD['total_rate']:,.2f}")
+    logger.info(f"Load found: ID {LOAD['load_id']}, Equipment: {LOAD['equipment_type']}, Commodity: {LOAD['commodity_type']}, Origin: {LOAD['origin']}, Destination: {LOAD['destination']}")
+
+
+def after(logger: logging.Logger):
+    p = PAYLOAD
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s request: %s", "Load search", json.dumps(p))
+    logger.info("Carrier capabilities - Equipment: %s, Origin: %s (radius %s), Destination: %s (radius %s), Weight Capacity: %s lbs, Available Dates: %s",
+                p["equipment_type"], p["origin"], p["origin_radius_miles"], p["destination"], None, p["weight_capacity"], p["available_dates"])
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Selected absolute best load: ID %s on %s with total rate $%s", LOAD["load_id"], "2025-09-10", f"{LOAD['total_rate']:,.2f}")
+    logger.info("Load found: ID %s, Equipment: %s, Commodity: %s, Origin: %s, Destination: %s",
+                LOAD["load_id"], LOAD["equipment_type"], LOAD["commodity_type"], LOAD["origin"], LOAD["destination"],
+                extra={"load_id": LOAD["load_id"]})
+
+
+def measure(name: str, request, handler: logging.Handler, level: int, use_queue: bool, requests: int) -> float:
+    logger = logging.getLogger(f"bench.{name}")
+    logger.propagate = False
+    logger.setLevel(level)
+    listener = None
+    if use_queue:
+        records = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(records))
+        listener = QueueListener(records, handler, respect_handler_level=True)
+        listener.start()
+    else:
+        logger.addHandler(handler)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        request(logger)
+    elapsed = time.perf_counter() - started
+
+    if listener is not None:
+        listener.stop()
+    handler.close()
+    return elapsed / requests * 1e6
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark per-request logging overhead")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+
+    def plain():
+        handler = logging.StreamHandler(devnull)
+        handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+        return handler
+
+    profiles = [
+        ("before", before, plain(), logging.INFO, False),
+        ("lazy", after, plain(), logging.INFO, False),
+        ("text", after, build_handler("text", devnull), logging.INFO, True),
+        ("json", after, build_handler("json", devnull), logging.INFO, True),
+        ("warning", after, build_handler("json", devnull), logging.WARNING, True),
+    ]
+
+    print(f"🔧 {args.requests} simulated load search requests per profile")
+    baseline = None
+    for name, request, handler, level, use_queue in profiles:
+        per_request = measure(name, request, handler, level, use_queue, args.requests)
+        baseline = baseline or per_request
+        print(f"   {name:>8}: {per_request:7.1f} µs/request on the caller  ({baseline / per_request:4.1f}x)")
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Time scored load search stage by stage on both search backends
+
+    python3 bench_scoring.py --loads 20000 --repeat 50
+
+Every load matches the search, so each backend returns LOAD_SCORE_CANDIDATES
+candidates to score. "fetch" reads their scoring columns, "score" is
+features, weighted sum and top-K over those arrays, and "winners" reads the
+top loads in full. "full rows" is the old path for comparison: every
+candidate read as an ORM Load, then rank_loads over those objects.
+"""
+
+import argparse
+import csv
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.geocoding import CITIES_PATH
+from app.models.load import Load, geocode_location
+from app.services.load_index import LoadIndex
+from app.services.load_scoring import LOAD_SCORE_CANDIDATES, parse_weights, rank, rank_loads
+from app.services.load_search import DatabaseLoadSearch, find_best_loads
+
+WEIGHTS = parse_weights("total_rate=1,rate_per_mile=0.5,deadhead=0.8,pickup_proximity=0.2,weight_utilization=0.3")
+# No lane filter, so every load is a candidate; deadhead is measured from the carrier in Chicago
+SEARCH = ("Dry Van", "", "", 45000, [date(2025, 9, 10), date(2025, 9, 11)])
+CARRIER = "Chicago, IL"
+
+
+def seed_loads(factory, count: int):
+    with CITIES_PATH.open(newline="") as cities:
+        lanes = [f"{row['city']}, {row['state']}" for row in csv.DictReader(cities)]
+    rng = random.Random(5)
+    with factory() as db:
+        for _ in range(count):
+            pickup = datetime(2025, 9, 10, 6) + timedelta(days=rng.randint(0, 1), hours=rng.randint(0, 12))
+            db.add(Load(origin=rng.choice(lanes), destination=rng.choice(lanes), pickup_datetime=pickup,
+                        delivery_datetime=pickup + timedelta(days=2), equipment_type="Dry Van",
+                        loadboard_rate=round(rng.uniform(1.5, 3.5), 2), weight=rng.randint(5000, 45000),
+                        commodity_type="General freight", miles=rng.choice([None, 250, 600, 1100]),
+                        status="available"))
+        db.commit()
+
+
+def timed(stages: dict, name: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    stages.setdefault(name, []).append(time.perf_counter() - started)
+    return result
+
+
+def run_backend(search, db, repeat: int) -> tuple[dict, int]:
+    point = geocode_location(CARRIER)
+    stages = {}
+    count = 0
+    for _ in range(repeat):
+        arrays = timed(stages, "fetch", lambda: search.candidate_arrays(*SEARCH, LOAD_SCORE_CANDIDATES))
+        best = timed(stages, "score", lambda: rank(arrays, WEIGHTS, 5, point, SEARCH[4], SEARCH[3]))
+        timed(stages, "winners", lambda: search.loads_by_id(arrays.load_id[best].tolist()))
+        count = len(arrays)
+    if isinstance(search, DatabaseLoadSearch):
+        for _ in range(max(1, repeat // 5)):
+            loads = timed(stages, "full rows", lambda: find_best_loads(db, *SEARCH, LOAD_SCORE_CANDIDATES))
+            timed(stages, "full rows", lambda: rank_loads(loads, WEIGHTS, 5, point, SEARCH[4], SEARCH[3]))
+    return stages, count
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark scored load search")
+    parser.add_argument("--loads", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine)
+        seed_loads(factory, args.loads)
+
+        with factory() as db:
+            index = LoadIndex()
+            index.rebuild(db)
+            print(f"🔧 {args.loads} loads, {args.repeat} searches per backend, median (min) ms")
+            for name, search in (("db", DatabaseLoadSearch(db)), ("index", index)):
+                stages, count = run_backend(search, db, args.repeat)
+                if "full rows" in stages:
+                    # Both halves of each old-path search were timed separately
+                    timings = stages["full rows"]
+                    stages["full rows"] = [a + b for a, b in zip(timings[::2], timings[1::2])]
+                summary = "  ".join(f"{stage} {statistics.median(t) * 1000:.3f} ({min(t) * 1000:.3f})"
+                                    for stage, t in stages.items())
+                print(f"   {name:>5}: {count} candidates  {summary}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Upsert loads from a load board export into the loads table
+
+    python3 import_loads.py loads.csv
+    python3 import_loads.py loads.ndjson --format json --batch-size 5000
+
+Records with a load_id update that load (or create it); records without one are inserted.
+"""
+
+import argparse
+
+from app.database import engine, get_db_context
+from app.migrations import run_migrations
+from app.services.load_import import import_loads, LOAD_IMPORT_BATCH_SIZE
+from app.services.streaming import iter_records, detect_format
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Bulk import loads from CSV, JSON or NDJSON")
+    parser.add_argument("path", help="CSV, JSON array or NDJSON file")
+    parser.add_argument("--format", choices=["csv", "json"], help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=LOAD_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+
+    fmt = args.format or detect_format(args.path)
+    with open(args.path, newline="", encoding="utf-8") as f, get_db_context() as db:
+        stats = import_loads(db, iter_records(f, fmt), batch_size=args.batch_size)
+
+    print(f"✅ Imported {stats['imported']} loads from {stats['read']} records "
+          f"({stats['invalid']} invalid) in {stats['seconds']}s - {stats['rows_per_second']} rows/s")
+    for error in stats["errors"]:
+        print(f"   - {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the call metrics rollup table
+
+    python3 rollups.py rebuild   # recompute rollups from call_logs
+    python3 rollups.py check     # report rollups that drifted from call_logs
+"""
+
+import argparse
+import sys
+
+from app.database import engine, get_db_context
+from app.migrations import run_migrations
+from app.services.call_metrics import rebuild_rollups, check_rollups
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Call metrics rollup maintenance")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    args = parser.parse_args()
+
+    run_migrations(engine)
+
+    with get_db_context() as db:
+        if args.command == "rebuild":
+            count = rebuild_rollups(db)
+            print(f"✅ Rebuilt {count} rollup buckets from call_logs")
+            return
+
+        problems = check_rollups(db)
+        if problems:
+            print(f"❌ {len(problems)} rollup buckets are inconsistent with call_logs:")
+            for problem in problems:
+                print(f"   - {problem}")
+            sys.exit(1)
+        print("✅ Rollups are consistent with call_logs")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,15 @@ from datetime import datetime, timedelta
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
-from app.database import engine, Base, get_db_context
+from app.database import engine, get_db_context
+from app.migrations import run_migrations
 from app.models.load import Load
 
 def create_sample_loads():
     """Create sample loads for testing"""
     
     # Create tables
-    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     
     with get_db_context() as db:
         # Check if loads already exist
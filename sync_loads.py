@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Reconcile the loads table with an external load board feed
+
+    python3 sync_loads.py feed.ndjson
+    python3 sync_loads.py https://loadboard.example.com/export.csv
+    python3 sync_loads.py --expire-only        # just expire loads whose pickup has passed
+
+Only added or changed loads are written; feed loads missing from the snapshot are expired.
+"""
+
+import argparse
+
+from app.database import engine
+from app.migrations import run_migrations
+from app.services.load_sync import LOAD_FEED_URL, sync_from_source
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Sync loads with a load board feed")
+    parser.add_argument("source", nargs="?", default=LOAD_FEED_URL, help="feed file or URL (defaults to LOAD_FEED_URL)")
+    parser.add_argument("--format", choices=["csv", "json"], help="defaults to the file extension or Content-Type")
+    parser.add_argument("--expire-only", action="store_true", help="skip the feed and only expire past pickups")
+    args = parser.parse_args()
+
+    if not args.source and not args.expire_only:
+        parser.error("a feed source (or LOAD_FEED_URL) is required unless --expire-only is given")
+
+    run_migrations(engine)
+    stats = sync_from_source(None if args.expire_only else args.source, args.format)
+
+    if args.expire_only:
+        print(f"✅ Expired {stats['expired_past']} loads with past pickups")
+        return
+    print(f"✅ Synced {stats['read']} records in {stats['seconds']}s: {stats['added']} added, {stats['changed']} changed, "
+          f"{stats['unchanged']} unchanged, {stats['invalid']} invalid; expired {stats['expired_missing']} missing "
+          f"and {stats['expired_past']} past pickups")
+    for error in stats["errors"]:
+        print(f"   - {error}")
+
+
+if __name__ == "__main__":
+    main()
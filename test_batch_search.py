@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Batch load search tests: every query gets the answer the single search would give, in order
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.load import Load
+from app.routers import webhook
+from app.services.load_search import DatabaseLoadSearch
+
+PICKUP = datetime(2025, 9, 10, 8)
+LANES = [("Chicago, IL", "Dallas, TX", "Dry Van", 2.5, 900), ("Chicago, IL", "Miami, FL", "Dry Van", 2.9, 1400),
+         ("Dallas, TX", "Denver, CO", "Reefer", 3.1, 800), ("Joliet, IL", "Atlanta, GA", "Flatbed", 2.2, 700)]
+QUERIES = [
+    {"query_id": "a", "equipment_type": "Dry Van", "origin": "Chicago, IL", "available_dates": ["2025-09-10"]},
+    {"query_id": "b", "equipment_type": "Reefer", "origin": "Dallas", "weight_capacity": 40000},
+    {"equipment_type": "Flatbed", "origin": "Chicago, IL", "origin_radius_miles": 50},
+    {"query_id": "d", "equipment_type": "Tanker"},
+    "not a query",
+]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / "loads.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        for origin, destination, equipment, rate, miles in LANES:
+            db.add(Load(origin=origin, destination=destination, pickup_datetime=PICKUP, delivery_datetime=PICKUP + timedelta(days=2),
+                        equipment_type=equipment, loadboard_rate=rate, weight=30000, commodity_type="Paper", miles=miles))
+        db.commit()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session_context():
+        async with async_factory() as db:
+            yield db
+
+    monkeypatch.setattr(webhook, "get_async_db_context", session_context)
+    monkeypatch.setattr(webhook, "WEBHOOK_API_KEY", "test-key")
+    app = FastAPI()
+    app.include_router(webhook.router)
+    with TestClient(app) as test_client:
+        yield test_client, factory
+    engine.dispose()
+
+
+def test_batch_matches_single_searches(client):
+    """Results come back in query order, echo query_id, and equal a one-at-a-time search"""
+    test_client, factory = client
+    response = test_client.post("/webhook/happyrobot/load_search/batch", json={"queries": QUERIES},
+                                headers={"X-API-Key": "test-key"})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["status"], body["count"]) == ("success", len(QUERIES))
+
+    with factory() as db:
+        expected = [webhook.match_load(DatabaseLoadSearch(db), query) for query in QUERIES[:-1]]
+    results = body["results"]
+    assert [result.get("query_id") for result in results] == ["a", "b", None, "d", None], "query_id should be echoed in order"
+    for result, want in zip(results, expected):
+        result.pop("query_id", None)
+        assert result == want, f"Batch result {result} differs from single search {want}"
+    assert [result.get("load_id") for result in results[:4]] == [2, 3, 4, None], "Expected the best load per query"
+    assert results[-1]["status"] == "error", "A malformed query fails alone, not the batch"
+
+
+def test_batch_is_validated(client):
+    test_client, _ = client
+    post = lambda body, key="test-key": test_client.post("/webhook/happyrobot/load_search/batch", json=body, headers={"X-API-Key": key})
+    assert post({"queries": []}).status_code == 400
+    assert post({"queries": [{}] * (webhook.LOAD_SEARCH_BATCH_MAX + 1)}).status_code == 400
+    assert post({"queries": [{}]}, key="wrong").status_code == 403
+
+
+def test_batch_matching_runs_off_the_event_loop(client, monkeypatch):
+    """Queries are matched on a worker thread, so a large batch cannot stall other requests"""
+    test_client, _ = client
+    loops = []
+    match_load = webhook.match_load
+
+    def recording_match_load(search, query, **options):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return match_load(search, query, **options)
+
+    monkeypatch.setattr(webhook, "match_load", recording_match_load)
+    response = test_client.post("/webhook/happyrobot/load_search/batch", json={"queries": QUERIES[:2]},
+                                headers={"X-API-Key": "test-key"})
+    assert response.status_code == 200, response.text
+    assert loops == [None, None], "Batch matching should not run on the event loop thread"
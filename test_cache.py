@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Stale-while-revalidate cache tests: one computation however many callers, stale values served while refreshing
+"""
+
+import asyncio
+
+from app.services.cache import StaleWhileRevalidateCache
+
+
+def test_concurrent_misses_share_one_computation_and_stale_values_refresh_in_background():
+    """A cold cache computes once for every waiting caller; expired values are served while one refresh runs"""
+    computations = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def loader():
+            computations.append(1)
+            await gate.wait()
+            return len(computations)
+
+        cache = StaleWhileRevalidateCache(loader, ttl=0.05, stale_ttl=60)
+        waiting = [asyncio.create_task(cache.get()) for _ in range(10)]
+        await asyncio.sleep(0.01)
+        gate.set()
+        cold = await asyncio.gather(*waiting)
+
+        hit = await cache.get()
+        await asyncio.sleep(0.06)
+        gate.clear()
+        stale = [await cache.get() for _ in range(5)]
+        gate.set()
+        await cache._refresh_task
+        refreshed = await cache.get()
+        return cold, hit, stale, refreshed
+
+    cold, hit, stale, refreshed = asyncio.run(scenario())
+    assert [(value, status) for value, status, _ in cold] == [(1, "MISS")] * 10, f"Unexpected cold results {cold}"
+    assert hit[:2] == (1, "HIT"), f"Expected a fresh hit, got {hit}"
+    assert [(value, status) for value, status, _ in stale] == [(1, "STALE")] * 5, "Stale value should be served at once"
+    assert refreshed[:2] == (2, "HIT"), f"Expected the refreshed value, got {refreshed}"
+    assert len(computations) == 2, f"Expected one cold and one background computation, got {len(computations)}"
+
+
+def test_write_during_refresh_leaves_value_stale():
+    """A value computed while an invalidate() landed is served but recomputed on the next request"""
+    async def scenario():
+        cache = None
+
+        async def loader():
+            if cache.misses == 1 and not getattr(loader, "raced", False):
+                loader.raced = True
+                cache.invalidate()
+            return "value"
+
+        cache = StaleWhileRevalidateCache(loader, ttl=60, stale_ttl=60)
+        first = await cache.get()
+        second = await cache.get()
+        await cache._refresh_task
+        third = await cache.get()
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first[1] == "MISS"
+    assert second[1] == "STALE", "A result that raced a write must not count as fresh"
+    assert third[1] == "HIT", "The follow-up refresh should make it fresh"
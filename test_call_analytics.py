@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Call analytics tests: date-range buckets and filters, and keyset pages that never skip or repeat a call
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.migrations import normalize_call_timestamps
+from app.models.load import CallLog
+from app.services.call_analytics import compute_analytics, list_calls
+from app.services.call_log_writer import write_call_logs
+from app.services.call_metrics import rebuild_rollups
+
+MONDAY = datetime(2025, 9, 8)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'calls.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def add_calls(db):
+    calls = [
+        # (hours after Monday 00:00, mc_number, outcome, sentiment, duration)
+        (9, "111", "won", "positive", 100),
+        (9.5, "111", "lost", "negative", 300),
+        (30, "222", "won", "positive", None),
+        (24 * 7 + 1, "111", "won", "neutral", 200),
+        (24 * 14, "333", "lost", "neutral", 50),
+    ]
+    for number, (hours, mc_number, outcome, sentiment, duration) in enumerate(calls):
+        db.add(CallLog(session_id=f"s{number}", mc_number=mc_number, carrier_name=f"Carrier {mc_number}",
+                       call_outcome=outcome, sentiment=sentiment, duration=duration,
+                       created_at=MONDAY + timedelta(hours=hours)))
+    # Calls logged in the same batch share a timestamp
+    for number in range(5):
+        db.add(CallLog(session_id=f"tie{number}", mc_number="444", call_outcome="no-load", created_at=MONDAY - timedelta(days=1)))
+    db.commit()
+    rebuild_rollups(db)
+
+
+def test_analytics_buckets_and_filters(session_factory):
+    with session_factory() as db:
+        add_calls(db)
+        week = compute_analytics(db, MONDAY, MONDAY + timedelta(days=14), "week")
+        assert [(b["bucket"], b["calls"], b["won"]) for b in week["series"]] == [
+            ("2025-09-08T00:00:00", 3, 2), ("2025-09-15T00:00:00", 1, 1)], f"Unexpected weeks {week['series']}"
+        assert week["by_outcome"] == {"won": 3, "lost": 1}
+        assert [(c["mc_number"], c["call_count"], c["won_count"]) for c in week["top_carriers"]] == [("111", 3, 2), ("222", 1, 1)]
+
+        # Partial days at either end come from call_logs, whole days in between from rollups
+        partial = compute_analytics(db, MONDAY + timedelta(hours=9, minutes=15), MONDAY + timedelta(days=7, hours=2), "day")
+        assert [(b["bucket"], b["calls"]) for b in partial["series"]] == [
+            ("2025-09-08T00:00:00", 1), ("2025-09-09T00:00:00", 1), ("2025-09-15T00:00:00", 1)], f"Unexpected days {partial['series']}"
+
+        hours = compute_analytics(db, MONDAY, MONDAY + timedelta(days=1), "hour", mc_number="111")
+        assert [(b["bucket"], b["calls"], b["avg_duration"]) for b in hours["series"]] == [("2025-09-08T09:00:00", 2, 200.0)]
+
+        won = compute_analytics(db, MONDAY, MONDAY + timedelta(days=21), "day", outcomes=["won"], sentiments=["positive"])
+        assert (won["total_calls"], won["success_rate"]) == (2, 100.0)
+
+        with pytest.raises(ValueError):
+            compute_analytics(db, MONDAY, MONDAY - timedelta(days=1))
+
+
+def test_keyset_pages_cover_every_call_once(session_factory):
+    """Pages of 3 over calls with tied timestamps return each call once, newest first"""
+    with session_factory() as db:
+        add_calls(db)
+        expected = [(row.created_at, row.id) for row in db.query(CallLog).order_by(CallLog.created_at.desc(), CallLog.id.desc())]
+
+        seen = []
+        cursor = None
+        while True:
+            page = list_calls(db, cursor=cursor, limit=3)
+            seen += [(datetime.fromisoformat(call["created_at"]), call["id"]) for call in page["calls"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == expected, "Keyset pages should neither skip nor repeat calls"
+        assert [c["session_id"] for c in list_calls(db, mc_number="111")["calls"]] == ["s3", "s1", "s0"]
+
+        with pytest.raises(ValueError):
+            list_calls(db, cursor="not-a-cursor")
+
+
+def test_pages_over_mixed_timestamp_sources(session_factory):
+    """Server-default, writer-inserted and legacy fractional timestamps each appear on exactly one page"""
+    with session_factory() as db:
+        # Written with fractional seconds before timestamps were normalized
+        db.execute(text("INSERT INTO call_logs (session_id, created_at) VALUES ('legacy', '2025-09-06 03:58:55.250000')"))
+        db.commit()
+        normalize_call_timestamps(db.get_bind())
+        db.add_all([CallLog(session_id=f"default{number}") for number in range(3)])
+        db.add(CallLog(session_id="orm", created_at=datetime(2025, 9, 6, 3, 58, 55, 500000)))
+        db.commit()
+        write_call_logs(db, [{"session_id": "writer"}])
+
+        seen = []
+        cursor = None
+        for _ in range(10):
+            page = list_calls(db, cursor=cursor, limit=1)
+            seen += [call["session_id"] for call in page["calls"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert sorted(seen) == ["default0", "default1", "default2", "legacy", "orm", "writer"], f"Pages returned {seen}"
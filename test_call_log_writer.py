@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Write-behind call log tests: acknowledged summaries reach call_logs and the
+rollups in batches, and survive a crash via the spool
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.load import CallLog, CallMetricRollup
+from app.services.call_log_writer import CallLogWriter
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "calls.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine), f"sqlite+aiosqlite:///{path}"
+    engine.dispose()
+
+
+def make_writer(url, spool_dir, **options):
+    async_engine = create_async_engine(url)
+    factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session_context():
+        async with factory() as db:
+            yield db
+
+    return CallLogWriter(spool_dir, session_context=session_context, **options), async_engine
+
+
+def call(number):
+    return {"session_id": f"call-{number}", "mc_number": "1515", "carrier_name": "Test Carrier",
+            "call_outcome": "won" if number % 3 == 0 else "lost", "sentiment": "positive", "duration": 60}
+
+
+def counts(factory):
+    with factory() as db:
+        logged = db.query(func.count(CallLog.id)).scalar()
+        rolled_up = db.query(CallMetricRollup.calls).filter(CallMetricRollup.bucket_type == "all").scalar()
+    return logged, rolled_up
+
+
+def test_batches_reach_database_and_drain_on_stop(database, tmp_path):
+    """Full batches flush while running; stop() writes the remainder and empties the spool"""
+    factory, url = database
+    spool = tmp_path / "spool"
+
+    async def scenario():
+        writer, async_engine = make_writer(url, spool, batch_size=50, flush_ms=60000)
+        await writer.start()
+        for number in range(120):
+            await writer.submit(**call(number))
+        # Two batches filled up; the long flush interval leaves the rest for stop()
+        for _ in range(100):
+            if writer.stats["written"] >= 100:
+                break
+            await asyncio.sleep(0.01)
+        assert writer.stats["written"] >= 100, f"Full batches should flush without waiting, got {writer.stats}"
+        await writer.stop()
+        await async_engine.dispose()
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert counts(factory) == (120, 120), f"Expected 120 calls and rollups, got {counts(factory)}"
+    assert writer.backlog() == 0, "Queue should be drained"
+    assert not list(spool.iterdir()), "Committed segments should be deleted"
+
+
+def test_spooled_calls_replay_after_crash(database, tmp_path):
+    """Calls acknowledged by a writer that never flushed are written by the next one"""
+    factory, url = database
+    spool = tmp_path / "spool"
+
+    async def crash():
+        writer, async_engine = make_writer(url, spool)
+        for number in range(30):
+            await writer.submit(**call(number))
+        await async_engine.dispose()
+        # Simulate a crash mid-write of the next call
+        with open(writer._path, "a") as f:
+            f.write('{"session_id": "torn')
+
+    async def restart():
+        writer, async_engine = make_writer(url, spool)
+        await writer.start()
+        await writer.stop()
+        await async_engine.dispose()
+        return writer
+
+    asyncio.run(crash())
+    assert counts(factory) == (0, None), "Nothing should be written before the restart"
+    # Backdate the spooled calls: the restart comes days after they were acknowledged
+    acknowledged = datetime(2025, 9, 8, 23, 45, 10)
+    segment = next(spool.iterdir())
+    *spooled, torn = segment.read_text().split("\n")
+    backdated = [{**json.loads(line), "created_at": (acknowledged + timedelta(seconds=n)).isoformat()}
+                 for n, line in enumerate(spooled)]
+    segment.write_text("".join(json.dumps(record) + "\n" for record in backdated) + torn)
+    writer = asyncio.run(restart())
+    assert writer.stats["replayed"] == 30, f"Expected 30 replayed calls, got {writer.stats}"
+    assert counts(factory) == (30, 30), f"Expected 30 calls after replay, got {counts(factory)}"
+    assert not list(spool.iterdir()), "Replayed segments should be deleted"
+    with factory() as db:
+        stamped = sorted(created_at for created_at, in db.query(CallLog.created_at))
+        days = dict(db.query(CallMetricRollup.bucket_key, CallMetricRollup.calls).filter(CallMetricRollup.bucket_type == "day"))
+    assert stamped == [acknowledged + timedelta(seconds=n) for n in range(30)], "Replayed calls keep their acknowledgement time"
+    assert days == {"2025-09-08": 30}, f"Replayed calls should be rolled up on the day they were acknowledged, got {days}"
+
+
+def test_retried_summaries_are_logged_once(database, tmp_path):
+    """Recent retries are dropped in memory; older ones are skipped by the unique session_id"""
+    factory, url = database
+
+    async def scenario():
+        writer, async_engine = make_writer(url, tmp_path / "spool", recent_keys=2)
+        await writer.start()
+        assert await writer.submit(**call(0)) is not None, "First delivery should be queued"
+        assert await writer.submit(**call(0)) is None, "Immediate retry should be rejected in memory"
+        await writer.flush()
+        # Push call-0 out of the recent keys, then retry it again
+        await writer.submit(**call(1))
+        await writer.submit(**call(2))
+        assert await writer.submit(**call(0)) is not None, "Forgotten key should reach the database"
+        await writer.submit(session_id="", call_outcome="lost")
+        await writer.submit(session_id="", call_outcome="lost")
+        await writer.stop()
+        await async_engine.dispose()
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert writer.stats["duplicates"] == 2, f"Expected one in-memory and one database duplicate, got {writer.stats}"
+    assert counts(factory) == (5, 5), f"Expected 3 sessions plus 2 calls without one, got {counts(factory)}"
+
+
+def test_rejected_call_is_dead_lettered(database, tmp_path):
+    """A call the database refuses is retried, then set aside so the calls behind it are written"""
+    factory, url = database
+    spool = tmp_path / "spool"
+
+    async def scenario():
+        writer, async_engine = make_writer(url, spool, max_attempts=2)
+        for number in range(3):
+            await writer.submit(**call(number))
+        # Not a bindable value; the whole batch fails with it
+        await writer.submit(**{**call(3), "duration": [60]})
+        await writer.submit(**call(4))
+        results = [await writer.flush() for _ in range(3)]
+        await async_engine.dispose()
+        return writer, results
+
+    writer, results = asyncio.run(scenario())
+    assert results == [False, False, True], f"Expected two failed batches, then call-by-call success, got {results}"
+    assert writer.stats["dead_lettered"] == 1, f"Expected one dead-lettered call, got {writer.stats}"
+    assert counts(factory) == (4, 4), f"Expected the 4 good calls written, got {counts(factory)}"
+    dead = [json.loads(line) for line in open(spool / "dead_letter.ndjson")]
+    assert [entry["record"]["session_id"] for entry in dead] == ["call-3"], f"Unexpected dead letters {dead}"
+    assert [path.name for path in spool.iterdir()] == ["dead_letter.ndjson"], "Written segments should be deleted"
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Call metric rollup tests: counters folded in batch by batch must equal a recount of call_logs
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.load import CallLog
+from app.services.call_metrics import check_rollups, record_call_metrics
+from app.services.dashboard_metrics import compute_dashboard_metrics
+
+NOW = datetime(2025, 9, 10, 15, 30)
+OUTCOMES = ["won", "lost", "no-load", "callback-needed", None]
+SENTIMENTS = ["positive", "neutral", "negative", None]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'calls.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_incremental_rollups_match_raw_calls(session_factory):
+    """Rollups built batch by batch agree with call_logs, and so do the dashboard totals read from them"""
+    rng = random.Random(3)
+    with session_factory() as db:
+        for batch in range(8):
+            calls = [
+                CallLog(session_id=f"s{batch}-{number}", mc_number=rng.choice(["111", "222", "333", None]),
+                        carrier_name="Carrier", call_outcome=rng.choice(OUTCOMES), sentiment=rng.choice(SENTIMENTS),
+                        duration=rng.choice([None, rng.randint(5, 900)]),
+                        created_at=NOW - timedelta(hours=rng.randint(0, 24 * 10)))
+                for number in range(40)
+            ]
+            db.add_all(calls)
+            db.flush()
+            record_call_metrics(db, calls)
+            db.commit()
+
+        assert check_rollups(db) == [], "Incremental rollups should equal a recount of call_logs"
+
+        metrics = compute_dashboard_metrics(db, now=NOW)
+        week_ago = NOW - timedelta(days=7)
+        raw = db.query(func.count(CallLog.id)).filter(CallLog.created_at >= week_ago).scalar()
+        won = db.query(func.count(CallLog.id)).filter(CallLog.call_outcome == "won").scalar()
+        today = db.query(func.count(CallLog.id)).filter(CallLog.created_at >= NOW.replace(hour=0, minute=0)).scalar()
+        assert (metrics["total_calls"], metrics["won_calls"]) == (320, won), f"Unexpected totals {metrics}"
+        assert (metrics["week_calls"], metrics["today_calls"]) == (raw, today), f"Unexpected windows {metrics}"
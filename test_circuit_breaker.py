@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker tests: closed -> open after repeated failures, one half-open probe, then closed or open again
+"""
+
+import asyncio
+
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_state_transitions():
+    """Failures open the circuit; after the reset timeout a single probe decides whether it closes"""
+    async def scenario():
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=0.05)
+        states = []
+        for _ in range(2):
+            breaker.record_failure()
+        breaker.record_success()
+        states.append(breaker.state)
+        for _ in range(3):
+            breaker.record_failure()
+        states.append(breaker.state)
+        assert not breaker.allow_request(), "An open circuit short-circuits callers"
+
+        probes = []
+
+        async def probe(healthy):
+            probes.append(healthy)
+            await asyncio.sleep(0.01)
+            return healthy
+
+        breaker.maybe_probe(lambda: probe(True))
+        states.append(breaker.state)
+        assert probes == [], "No probe before the reset timeout"
+
+        await asyncio.sleep(0.06)
+        breaker.maybe_probe(lambda: probe(False))
+        breaker.maybe_probe(lambda: probe(False))
+        states.append(breaker.state)
+        await breaker._probe_task
+        states.append(breaker.state)
+
+        await asyncio.sleep(0.06)
+        breaker.maybe_probe(lambda: probe(True))
+        await breaker._probe_task
+        states.append(breaker.state)
+        return breaker, states, probes
+
+    breaker, states, probes = asyncio.run(scenario())
+    assert states == [CLOSED, OPEN, OPEN, HALF_OPEN, OPEN, CLOSED], f"Unexpected states {states}"
+    assert probes == [False, True], f"Expected one probe per half-open period, got {probes}"
+    assert breaker.allow_request(), "A closed circuit lets callers through"
+    assert breaker.stats()["short_circuits"] == 1
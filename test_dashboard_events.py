@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Dashboard event stream tests: one computation per change, fanned out as deltas to every subscriber
+"""
+
+import asyncio
+import json
+
+from app.services.cache import StaleWhileRevalidateCache
+from app.services.dashboard_events import DashboardBroadcaster
+
+
+def parse_event(text):
+    fields = dict(line.split(": ", 1) for line in text.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_changes_are_pushed_once_to_every_subscriber():
+    """Subscribers start from a snapshot and then get only the changed fields"""
+    metrics = {"total_calls": 1, "won_calls": 0, "hourly_calls": [{"hour": 9, "calls": 1}]}
+    computations = []
+
+    async def loader():
+        computations.append(1)
+        return dict(metrics)
+
+    async def scenario():
+        broadcaster = DashboardBroadcaster(StaleWhileRevalidateCache(loader, ttl=60, stale_ttl=60), debounce_ms=0)
+        await broadcaster.start()
+        streams = [broadcaster.stream(), broadcaster.stream()]
+        for stream in streams:
+            assert await stream.__anext__() == "retry: 1000\n\n"
+        snapshots = [parse_event(await stream.__anext__()) for stream in streams]
+
+        metrics.update(total_calls=2, won_calls=1)
+        broadcaster.cache.invalidate()
+        broadcaster.notify()
+        deltas = [parse_event(await asyncio.wait_for(stream.__anext__(), 5)) for stream in streams]
+        for stream in streams:
+            await stream.aclose()
+        await broadcaster.stop()
+        return snapshots, deltas, broadcaster
+
+    snapshots, deltas, broadcaster = asyncio.run(scenario())
+    assert snapshots == [("snapshot", metrics | {"total_calls": 1, "won_calls": 0})] * 2, f"Unexpected snapshots {snapshots}"
+    assert deltas == [("delta", {"total_calls": 2, "won_calls": 1})] * 2, f"Unexpected deltas {deltas}"
+    assert len(computations) == 2, f"Expected one computation per change, got {len(computations)}"
+    assert broadcaster.stats["subscribers"] == 0, "Closed streams should unsubscribe"
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio FMCSA client against a local stub HTTP server
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services import fmcsa_verification
+from app.services.fmcsa_client import FMCSA_TIMEOUT, FMCSAClient, FMCSAError
+from app.services.fmcsa_verification import FMCSA_LATENCY_BUDGET
+
+
+class StubFMCSAHandler(BaseHTTPRequestHandler):
+    """Replays the server's queued (status, body, delay) responses"""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            status, body, delay = server.responses.pop(0) if server.responses else server.default
+        try:
+            time.sleep(delay)
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def carrier_body(allowed="Y", name="STUB TRUCKING LLC"):
+    return {"content": [{"carrier": {"allowedToOperate": allowed, "legalName": name}}]}
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubFMCSAHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.responses = []
+    server.default = (200, carrier_body(), 0)
+    server.in_flight = 0
+    server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, **kwargs):
+    options = {"api_key": "test-key", "timeout": 1, "max_retries": 2, "backoff_base": 0.01, "backoff_max": 0.02}
+    options.update(kwargs)
+    return FMCSAClient(base_url=server.url, **options)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_get_carrier_returns_parsed_json(stub_server):
+    """A successful lookup returns the JSON body and sends the webKey"""
+    async def scenario():
+        client = make_client(stub_server)
+        try:
+            return await client.get_carrier("1515")
+        finally:
+            await client.aclose()
+
+    data = run(scenario())
+    assert data["content"][0]["carrier"]["legalName"] == "STUB TRUCKING LLC", f"Unexpected body: {data}"
+    assert stub_server.requests[0].startswith("/carriers/docket-number/1515?"), f"Unexpected path: {stub_server.requests[0]}"
+    assert "webKey=test-key" in stub_server.requests[0], "Expected webKey query parameter"
+
+
+def test_retries_server_errors_then_succeeds(stub_server):
+    """5xx and 429 responses are retried with backoff"""
+    stub_server.responses = [(503, {}, 0), (429, {}, 0)]
+
+    async def scenario():
+        client = make_client(stub_server)
+        try:
+            return await client.get_carrier("1515")
+        finally:
+            await client.aclose()
+
+    data = run(scenario())
+    assert data["content"], "Expected the third attempt to succeed"
+    assert len(stub_server.requests) == 3, f"Expected 3 attempts, got {len(stub_server.requests)}"
+
+
+def test_gives_up_after_max_retries(stub_server):
+    """Persistent failures raise FMCSAError instead of returning a result"""
+    stub_server.default = (500, {}, 0)
+
+    async def scenario():
+        client = make_client(stub_server, max_retries=1)
+        try:
+            await client.get_carrier("1515")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(FMCSAError):
+        run(scenario())
+    assert len(stub_server.requests) == 2, f"Expected 2 attempts, got {len(stub_server.requests)}"
+
+
+def test_client_errors_are_not_retried(stub_server):
+    """4xx responses other than 429 fail immediately"""
+    stub_server.default = (403, {}, 0)
+
+    async def scenario():
+        client = make_client(stub_server)
+        try:
+            await client.get_carrier("1515")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(FMCSAError):
+        run(scenario())
+    assert len(stub_server.requests) == 1, "Expected no retries for 403"
+
+
+def test_per_request_timeout(stub_server):
+    """A slow upstream is cut off by the per-request timeout"""
+    stub_server.default = (200, carrier_body(), 1.0)
+
+    async def scenario():
+        client = make_client(stub_server, max_retries=0)
+        try:
+            await client.get_carrier("1515", timeout=0.1)
+        finally:
+            await client.aclose()
+
+    started = time.monotonic()
+    with pytest.raises(FMCSAError):
+        run(scenario())
+    assert time.monotonic() - started < 0.8, "Expected the timeout to fire well before the stub responds"
+
+
+def test_concurrency_is_bounded(stub_server):
+    """No more than max_concurrency requests are in flight at once"""
+    stub_server.default = (200, carrier_body(), 0.05)
+
+    async def scenario():
+        client = make_client(stub_server, max_concurrency=3)
+        try:
+            return await asyncio.gather(*(client.get_carrier(str(mc)) for mc in range(12)))
+        finally:
+            await client.aclose()
+
+    results = run(scenario())
+    assert len(results) == 12, "Expected every lookup to complete"
+    assert stub_server.max_in_flight <= 3, f"Expected at most 3 concurrent requests, saw {stub_server.max_in_flight}"
+
+
+def lookup_with_defaults(stub_server, monkeypatch):
+    """Verify MC 1515 through the budgeted lookup with a default-configured client"""
+    async def scenario():
+        client = FMCSAClient(base_url=stub_server.url, api_key="test-key")
+        monkeypatch.setattr(fmcsa_verification, "fmcsa_client", client)
+        try:
+            return await fmcsa_verification._lookup_within_budget("1515")
+        finally:
+            await client.aclose()
+
+    return run(scenario())
+
+
+def test_slow_answer_within_budget_is_not_cut_off(stub_server, monkeypatch):
+    """A healthy 1.5 s answer fits the first attempt's share of the default budget"""
+    stub_server.responses = [(200, carrier_body(), 1.5)]
+    result = lookup_with_defaults(stub_server, monkeypatch)
+    assert result.status == "verified", f"Expected the slow answer to verify the carrier, got {result}"
+    assert len(stub_server.requests) == 1, f"Expected no retry, got {len(stub_server.requests)} requests"
+
+
+def test_hung_attempt_is_retried_within_default_budget(stub_server, monkeypatch):
+    """With the default budget and per-attempt timeout, a hung first request still leaves time to retry"""
+    assert FMCSA_TIMEOUT >= FMCSA_LATENCY_BUDGET, "Scenario assumes one attempt could use up the whole budget"
+    # Hangs for the whole budget; the retry is answered at once
+    stub_server.responses = [(200, carrier_body(), FMCSA_LATENCY_BUDGET)]
+
+    started = time.monotonic()
+    result = lookup_with_defaults(stub_server, monkeypatch)
+    assert result.status == "verified", f"Expected the retry to verify the carrier, got {result}"
+    assert len(stub_server.requests) == 2, f"Expected one retry, got {len(stub_server.requests)} requests"
+    assert time.monotonic() - started < FMCSA_LATENCY_BUDGET, "Lookup should finish inside the budget"
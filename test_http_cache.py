@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Conditional GET tests: precompressed variants are negotiated and a matching ETag gets an empty 304
+"""
+
+import asyncio
+import gzip
+
+import brotli
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services.cache import StaleWhileRevalidateCache
+from app.services.http_cache import CachedBody, cached_response, choose_encoding, not_modified
+
+PAGE = CachedBody(b"<html>" + b"dashboard " * 200 + b"</html>", "text/html; charset=utf-8")
+
+app = FastAPI()
+
+
+@app.get("/")
+def page(request: Request):
+    return cached_response(request, PAGE, "public, max-age=60")
+
+
+def test_encoding_negotiation():
+    available = {"identity": b"", "gzip": b""}
+    assert choose_encoding("gzip, deflate, br", available) == "gzip", "br is only offered when available"
+    assert choose_encoding("br;q=1.0, gzip;q=0", {**available, "br": b""}) == "br"
+    assert choose_encoding("gzip;q=0", available) == "identity", "q=0 refuses an encoding"
+    assert choose_encoding(None, available) == "identity"
+
+
+def test_conditional_get_returns_304():
+    """The compressed page is sent once; revalidating with its ETag returns no body"""
+    client = TestClient(app)
+    first = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["content-encoding"] == "gzip", "Expected the precompressed variant"
+    assert int(first.headers["content-length"]) == len(gzip.compress(PAGE.variants["identity"], 9, mtime=0))
+    assert first.text == PAGE.variants["identity"].decode()
+
+    again = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+    assert (again.status_code, again.content) == (304, b""), "Unchanged page should be a bodiless 304"
+    assert again.headers["cache-control"] == "public, max-age=60"
+
+    plain = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": first.headers["etag"]})
+    assert plain.status_code == 304, "All encodings of one body share a validator"
+
+    preferred = client.get("/", headers={"Accept-Encoding": "gzip, br"})
+    assert preferred.headers["content-encoding"] == "br", "brotli is preferred when the client accepts it"
+    assert int(preferred.headers["content-length"]) == len(brotli.compress(PAGE.variants["identity"]))
+    assert preferred.text == PAGE.variants["identity"].decode()
+    assert preferred.headers["etag"] != first.headers["etag"], "Each encoding has its own ETag"
+    assert client.get("/", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_version_tag_is_checked_without_computing():
+    """A client holding the current version is answered from the counter; only a new value changes it"""
+    values = [{"total_calls": 1}, {"total_calls": 1}, {"total_calls": 2}]
+    computations = []
+
+    async def loader():
+        computations.append(1)
+        return values[len(computations) - 1]
+
+    def conditional(tag):
+        return Request({"type": "http", "headers": [(b"if-none-match", f'"{tag}-gzip"'.encode())]})
+
+    async def scenario():
+        cache = StaleWhileRevalidateCache(loader, ttl=60, stale_ttl=60)
+        assert cache.peek() is None, "Nothing to validate against before the first computation"
+        await cache.get()
+        version, status, _ = cache.peek()
+        assert (version, status) == (1, "HIT")
+        assert not_modified(conditional(f"boot-{version}"), f"boot-{version}", "no-cache").status_code == 304
+        assert len(computations) == 1, "Peeking must not compute"
+
+        # A write hides the version until a recompute; an identical result keeps it
+        cache.invalidate()
+        assert cache.peek() is None
+        await cache.latest()
+        assert cache.peek()[0] == 1, "Unchanged metrics should keep their version"
+        cache.invalidate()
+        await cache.latest()
+        assert cache.peek()[0] == 2, "Changed metrics should get a new version"
+        assert not_modified(conditional("boot-1"), "boot-2", "no-cache") is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Bulk load import tests: rows are validated one by one, upserted by load_id and visible to search
+"""
+
+import io
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.load import Load
+from app.services.load_import import import_loads, parse_load_record
+from app.services.load_index import load_index
+from app.services.load_search import parse_available_dates
+from app.services.streaming import iter_records
+
+HEADER = "load_id,origin,destination,pickup_datetime,delivery_datetime,equipment_type,loadboard_rate,weight,commodity_type,miles\n"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'loads.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_csv_import_validates_and_upserts(session_factory):
+    """Bad rows are reported without stopping the import; a repeated load_id updates in place"""
+    first = io.StringIO(HEADER + "\n".join([
+        "501,\"Chicago, IL\",\"Dallas, TX\",2025-09-10T08:00:00,2025-09-11T08:00:00,Dry Van,2.5,20000,Paper,900",
+        "502,\"Joliet, IL\",\"Miami, FL\",2025-09-10T09:00:00Z,2025-09-11T09:00:00Z,Reefer,3.0,heavy,Produce,",
+        ",\"Gary, IN\",\"Denver, CO\",2025-09-11T10:00:00,2025-09-12T10:00:00,Flatbed,1.9,30000,Steel,1000",
+    ]) + "\n")
+    second = io.StringIO(HEADER + "501,\"Chicago, IL\",\"Dallas, TX\",2025-09-10T08:00:00,2025-09-11T08:00:00,Dry Van,2.75,20000,Paper,900\n")
+
+    with session_factory() as db:
+        load_index.rebuild(db)
+        stats = import_loads(db, iter_records(first, "csv"), batch_size=2)
+        assert (stats["read"], stats["imported"], stats["invalid"]) == (3, 2, 1), f"Unexpected stats {stats}"
+        assert stats["errors"] == ["record 2: weight has invalid value 'heavy'"], f"Unexpected errors {stats['errors']}"
+
+        stats = import_loads(db, iter_records(second, "csv"))
+        assert stats["imported"] == 1, f"Unexpected stats {stats}"
+        updated = db.get(Load, 501)
+        assert (updated.loadboard_rate, updated.version, updated.origin_city) == (2.75, 1, "chicago"), "Expected an in-place update"
+        assert db.query(Load).count() == 2, "Re-imported load must not be duplicated"
+
+        found = load_index.best_loads("Dry Van", "Joliet, IL", "", 0, parse_available_dates(["2025-09-10"]), limit=5, origin_radius=50)
+        assert [load.load_id for load in found] == [501], "Imported load should be searchable without a rebuild"
+        assert found[0].loadboard_rate == 2.75, "Index should carry the updated rate"
+
+
+def test_record_times_stay_local_and_rates_finite():
+    """An offset on a pickup time is dropped, not converted; a NaN or infinite rate is rejected"""
+    record = {"origin": "Chicago, IL", "destination": "Dallas, TX", "pickup_datetime": "2025-09-10T20:30:00-05:00",
+              "delivery_datetime": "2025-09-11T08:00:00Z", "equipment_type": "Dry Van", "loadboard_rate": "2.5",
+              "weight": 20000, "commodity_type": "Paper"}
+    row = parse_load_record(record)
+    assert (row["pickup_datetime"].isoformat(), str(row["pickup_date"])) == ("2025-09-10T20:30:00", "2025-09-10"), \
+        "An evening pickup must keep its local time and date"
+    assert row["delivery_datetime"].isoformat() == "2025-09-11T08:00:00"
+    for rate in ("nan", "inf", float("-inf")):
+        with pytest.raises(ValueError, match="loadboard_rate"):
+            parse_load_record({**record, "loadboard_rate": rate})
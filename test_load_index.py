@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Parity tests: the in-memory LoadIndex must pick the same loads as the database backend
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.load import Load
+from app.services.load_index import LoadIndex, LoadRecord, load_index
+from app.services.load_search import DatabaseLoadSearch, parse_available_dates
+
+CITIES = ["Chicago, IL", "Dallas, TX", "Atlanta, GA", "Miami, FL", "Los Angeles, CA",
+          "Phoenix, AZ", "Denver, CO", "Seattle, WA", "Portland, OR", "Kansas City, MO",
+          "Joliet, IL", "Gary, IN", "Fort Worth, TX", "Tacoma, WA", "Nowhere Junction, ZZ"]
+EQUIPMENT = ["Dry Van", "Flatbed", "Reefer", "Power Only"]
+DATES = [f"2025-09-{day}" for day in range(10, 20)]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'loads.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+
+    rng = random.Random(42)
+    with factory() as db:
+        for _ in range(1500):
+            pickup = datetime(2025, 9, 10, 8) + timedelta(days=rng.randint(0, 9), hours=rng.randint(0, 10))
+            db.add(Load(
+                origin=rng.choice(CITIES),
+                destination=rng.choice(CITIES),
+                pickup_datetime=pickup,
+                delivery_datetime=pickup + timedelta(days=1),
+                equipment_type=rng.choice(EQUIPMENT),
+                loadboard_rate=round(rng.uniform(0.5, 3), 2),
+                weight=rng.randint(1000, 45000),
+                commodity_type="General freight",
+                miles=rng.choice([None, 0, 300, 800, 1200, 2000]),
+                status=rng.choice(["available"] * 4 + ["booked"]),
+            ))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def random_queries(count):
+    rng = random.Random(7)
+    for _ in range(count):
+        yield {
+            "equipment_type": rng.choice(EQUIPMENT + ["dry van", "", "TV"]),
+            "origin": rng.choice(["Chicago", "Dallas, TX", "il", "Kansas City", "Chicagoland", "Joliet, IL", "60601", ""]),
+            "destination": rng.choice(["Miami", "tx", "Portland, OR", ""]),
+            "weight_capacity": rng.choice([0, 15000, 30000]),
+            "available_dates": rng.sample(DATES, rng.randint(0, 3)),
+            "origin_radius": rng.choice([None, 0, 50, 300]),
+            "destination_radius": rng.choice([None, 75, 1000]),
+        }
+
+
+def ids(loads):
+    return [load.load_id for load in loads]
+
+
+def test_index_matches_database_backend(session_factory):
+    """Both backends agree on equipment checks, top-K ranking and partial matches"""
+    index = LoadIndex()
+    with session_factory() as db:
+        index.rebuild(db)
+        database = DatabaseLoadSearch(db)
+
+        for query in random_queries(400):
+            equipment = query["equipment_type"]
+            if equipment:
+                assert index.equipment_available(equipment) == database.equipment_available(equipment), f"Equipment check differs for {query}"
+
+            dates = parse_available_dates(query["available_dates"])
+            args = (equipment, query["origin"], query["destination"], query["weight_capacity"], dates)
+            radius = {"origin_radius": query["origin_radius"], "destination_radius": query["destination_radius"]}
+            assert ids(index.best_loads(*args, limit=5, **radius)) == ids(database.best_loads(*args, limit=5, **radius)), f"Top loads differ for {query}"
+
+            from_index = index.partial_match(equipment, query["origin"], query["destination"], **radius)
+            from_db = database.partial_match(equipment, query["origin"], query["destination"], **radius)
+            assert (from_index and from_index.load_id) == (from_db and from_db.load_id), f"Partial match differs for {query}"
+
+
+def test_index_follows_committed_status_changes(session_factory):
+    """Committed ORM writes flow into the shared index without a rebuild"""
+    with session_factory() as db:
+        load_index.rebuild(db)
+        load = db.query(Load).filter(Load.status == "available").first()
+        args = (load.equipment_type, load.origin, load.destination, load.weight, [load.pickup_date])
+
+        assert load.load_id in ids(load_index.best_loads(*args, limit=1000)), "Expected the available load in the index"
+
+        load.status = "booked"
+        db.commit()
+        assert load.load_id not in ids(load_index.best_loads(*args, limit=1000)), "Booked load should leave the index"
+
+        load.status = "available"
+        db.rollback()
+        assert load.load_id not in ids(load_index.best_loads(*args, limit=1000)), "Rolled back change must not reach the index"
+
+        load.status = "available"
+        db.commit()
+        assert load.load_id in ids(load_index.best_loads(*args, limit=1000)), "Re-listed load should return to the index"
+
+
+def test_unloaded_index_costs_no_queries(session_factory):
+    """With the database backend the index is never loaded, so write paths skip it entirely"""
+    index = LoadIndex(write_through=True)
+    with session_factory() as db:
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        load = db.query(Load).first()
+        statements.clear()
+        index.refresh(db, [load.load_id])
+        index.apply(records=[LoadRecord.from_load(load)])
+        assert statements == [], f"Unloaded index should not query, ran {statements}"
+        assert len(index) == 0, "Unloaded index should ignore changes"
+
+
+def test_radius_search_reaches_nearby_cities(session_factory):
+    """A carrier in Joliet with a 50 mile radius sees Chicago and Gary loads, never Dallas"""
+    with session_factory() as db:
+        database = DatabaseLoadSearch(db)
+        loads = database.best_loads("", "Joliet, IL", "", 0, parse_available_dates(DATES), limit=1000, origin_radius=50)
+        origins = {load.origin for load in loads}
+        assert {"Chicago, IL", "Joliet, IL", "Gary, IN"} <= origins, f"Expected nearby origins, got {origins}"
+        assert origins <= {"Chicago, IL", "Joliet, IL", "Gary, IN"}, f"Unexpected far origins in {origins}"
+
+        nearest = database.partial_match("", "Chicagoland", "")
+        assert nearest.origin == "Chicago, IL", f"Expected a Chicago load for Chicagoland, got {nearest.origin}"
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Concurrency tests for load holds: no load may ever be held or booked by two calls.
+Runs on SQLite; set TEST_POSTGRES_URL to also run against Postgres.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.load import Load
+from app.services.load_reservations import (book_load, expire_holds, hold_first_available, hold_load, release_hold,
+                                               release_session_holds)
+
+LOADS = 20
+CALLERS = 200
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def session_factory(request, tmp_path):
+    if request.param == "sqlite":
+        url = f"sqlite:///{tmp_path / 'holds.db'}"
+        engine = create_engine(url, pool_size=32, max_overflow=0, connect_args={"check_same_thread": False, "timeout": 30})
+    else:
+        url = os.getenv("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL not set")
+        engine = create_engine(url, pool_size=32, max_overflow=0)
+    Base.metadata.drop_all(bind=engine, tables=[Load.__table__])
+    Base.metadata.create_all(bind=engine, tables=[Load.__table__])
+    factory = sessionmaker(bind=engine)
+
+    pickup = datetime(2025, 9, 10, 8)
+    with factory() as db:
+        for _ in range(LOADS):
+            db.add(Load(origin="Chicago, IL", destination="Dallas, TX", pickup_datetime=pickup,
+                        delivery_datetime=pickup + timedelta(days=1), equipment_type="Dry Van",
+                        loadboard_rate=2.5, weight=20000, commodity_type="General freight", miles=900))
+        db.commit()
+    yield factory
+    Base.metadata.drop_all(bind=engine, tables=[Load.__table__])
+    engine.dispose()
+
+
+def test_concurrent_callers_never_share_a_load(session_factory):
+    """Every caller races for the same top candidates; each load ends up with at most one holder"""
+    # The first 32 callers issue their UPDATEs together; the pool is sized to keep them all open
+    start = threading.Barrier(32)
+
+    def caller(number):
+        with session_factory() as db:
+            candidates = db.query(Load).filter(Load.status == "available").order_by(Load.load_id).limit(5).all()
+            if number < 32:
+                start.wait()
+            held = hold_first_available(db, candidates, f"call-{number}")
+            return held.load_id if held else None
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(caller, range(CALLERS)))
+
+    won = [load_id for load_id in results if load_id is not None]
+    assert len(won) == len(set(won)), "A load was held by two callers"
+    assert len(won) == LOADS, f"Expected all {LOADS} loads held, got {len(won)}"
+
+    with session_factory() as db:
+        rows = db.query(Load).all()
+        assert all(row.status == "held" for row in rows), "Every load should be held"
+        holders = {row.load_id: row.held_by for row in rows}
+        for number, load_id in enumerate(results):
+            if load_id is not None:
+                assert holders[load_id] == f"call-{number}", f"Load {load_id} held by {holders[load_id]}, not call-{number}"
+
+
+def test_hold_lifecycle(session_factory):
+    """Expired holds return to the board; only the holder can book or release"""
+    with session_factory() as db:
+        load = db.query(Load).order_by(Load.load_id).first()
+        load_id = load.load_id
+
+        assert hold_load(db, load_id, load.version, "call-a", ttl_seconds=-1), "Expected the first hold to win"
+        assert not hold_load(db, load_id, 0, "call-b"), "Held load must not be held again"
+        assert expire_holds(db) == 1, "Expired hold should be swept"
+
+        load = db.get(Load, load_id)
+        assert load.status == "available", f"Expected available after expiry, got {load.status}"
+        assert not hold_load(db, load_id, 0, "call-b"), "Stale version must lose"
+        assert hold_load(db, load_id, load.version, "call-b"), "Current version should win"
+
+        assert not release_hold(db, load_id, "call-a"), "Only the holder may release"
+        assert not book_load(db, load_id, "call-a"), "Only the holder may book a held load"
+        assert book_load(db, load_id, "call-b"), "Holder should book"
+        assert db.get(Load, load_id).status == "booked", "Load should be booked"
+
+
+def test_summary_releases_every_hold_of_the_call(session_factory):
+    """Loads held by earlier searches in the call go back on the board; the booked one stays booked"""
+    with session_factory() as db:
+        loads = db.query(Load).order_by(Load.load_id).limit(4).all()
+        ids = [load.load_id for load in loads]
+        for load in loads[:3]:
+            assert hold_load(db, load.load_id, load.version, "call-a")
+        load = db.get(Load, ids[3])
+        assert hold_load(db, load.load_id, load.version, "call-b")
+
+        assert book_load(db, ids[1], "call-a")
+        assert release_session_holds(db, "call-a", keep=ids[1]) == 2, "Both other loads held by the call should be released"
+        db.expire_all()
+        statuses = [(db.get(Load, load_id).status, db.get(Load, load_id).held_by) for load_id in ids]
+        assert statuses == [("available", None), ("booked", "call-a"), ("available", None), ("held", "call-b")], \
+            f"Unexpected load states {statuses}"
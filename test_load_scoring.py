@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized load scoring stage
+"""
+
+import csv
+import random
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.geocoding import CITIES_PATH, haversine_miles
+from app.models.load import Load, geocode_location
+from app.services.load_index import LoadIndex, LoadRecord
+from app.services.load_scoring import LOAD_SCORE_CANDIDATES, best_scored_loads, parse_weights, rank_loads
+from app.services.load_search import DatabaseLoadSearch, find_best_loads, load_total_rate
+
+CHICAGO = (41.8781, -87.6298)
+
+with CITIES_PATH.open(newline="") as cities:
+    PLACES = [(row["city"], row["state"], float(row["lat"]), float(row["lon"])) for row in csv.DictReader(cities)]
+# Real (lat, lon) pairs; None for loads whose origin never geocoded
+ORIGINS = [(lat, lon) for _, _, lat, lon in PLACES] + [(None, None)]
+
+
+def make_loads(count, seed=3):
+    rng = random.Random(seed)
+    loads = []
+    for load_id in range(1, count + 1):
+        origin_lat, origin_lon = rng.choice(ORIGINS)
+        loads.append(SimpleNamespace(
+            load_id=load_id,
+            pickup_date=date(2025, 9, 10) + timedelta(days=rng.randint(0, 5)),
+            loadboard_rate=rng.choice([1.5, 2.0, 2.5, 900.0]),
+            miles=rng.choice([None, 0, 250, 500, 1000]),
+            weight=rng.randint(1000, 45000),
+            origin_lat=origin_lat,
+            origin_lon=origin_lon,
+        ))
+    return loads
+
+
+def test_rate_only_weights_match_backend_ordering():
+    """Default weights rank by total rate, then earliest pickup, then load_id"""
+    loads = make_loads(2000)
+    expected = sorted(loads, key=lambda l: (-load_total_rate(l), l.pickup_date, l.load_id))[:25]
+    ranked = rank_loads(loads, parse_weights("total_rate=1"), 25)
+    assert [l.load_id for l in ranked] == [l.load_id for l in expected], "Rate-only scoring must match the SQL ordering"
+
+
+def test_deadhead_weight_prefers_nearby_pickups():
+    """With only deadhead weighted, the winner is the closest geocoded origin"""
+    loads = make_loads(500)
+    nearest = min(haversine_miles(*CHICAGO, l.origin_lat, l.origin_lon) for l in loads if l.origin_lat is not None)
+    best = rank_loads(loads, parse_weights("deadhead=1"), 1, carrier_point=CHICAGO)[0]
+    assert haversine_miles(*CHICAGO, best.origin_lat, best.origin_lon) == nearest, \
+        f"Expected the nearest pickup, got {best.origin_lat}, {best.origin_lon}"
+
+
+def test_parse_weights_ignores_unknown_features():
+    assert parse_weights("total_rate=2, deadhead=0.5, bogus=3") == {"total_rate": 2.0, "deadhead": 0.5}
+    assert parse_weights("") == {"total_rate": 1.0}, "Empty spec falls back to rate-only"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'loads.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+
+    rng = random.Random(11)
+    lanes = [f"{city}, {state}" for city, state, _, _ in PLACES] + ["Nowhere Junction, ZZ"]
+    with factory() as db:
+        for _ in range(1500):
+            pickup = datetime(2025, 9, 10, 8) + timedelta(days=rng.randint(0, 4), hours=rng.randint(0, 10))
+            db.add(Load(
+                origin=rng.choice(lanes),
+                destination=rng.choice(lanes),
+                pickup_datetime=pickup,
+                delivery_datetime=pickup + timedelta(days=1),
+                equipment_type=rng.choice(["Dry Van", "Reefer"]),
+                loadboard_rate=rng.choice([1.5, 2.0, 2.5, 900.0]),
+                weight=rng.randint(1000, 45000),
+                commodity_type="General freight",
+                miles=rng.choice([None, 0, 250, 500, 1000]),
+                status="available",
+            ))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def test_backends_score_only_the_columns_and_match_full_rows(session_factory):
+    """Both backends' column arrays pick the same winners as scoring fully loaded rows, before and after index updates"""
+    weights = parse_weights("total_rate=1,rate_per_mile=0.5,deadhead=0.8,pickup_proximity=0.2,weight_utilization=0.3")
+    searches = [
+        ("Dry Van", "Chicago, IL", "", 30000, [date(2025, 9, 11)], None),
+        ("Reefer", "Dallas, TX", "", 0, [date(2025, 9, 10), date(2025, 9, 13)], 500),
+        ("", "Joliet, IL", "TX", 40000, [date(2025, 9, 12)], 1000),
+        ("Dry Van", "", "", 0, [date(2025, 9, 10), date(2025, 9, 14)], None),
+    ]
+    index = LoadIndex()
+    with session_factory() as db:
+        index.rebuild(db)
+        database = DatabaseLoadSearch(db)
+
+        def check():
+            for equipment, origin, destination, capacity, dates, radius in searches:
+                args = (equipment, origin, destination, capacity, dates)
+                loads = find_best_loads(db, *args, LOAD_SCORE_CANDIDATES, origin_radius=radius)
+                point = geocode_location(origin) if origin else None
+                expected = [load.load_id for load in rank_loads(loads, weights, 5, point, dates, capacity)]
+                assert expected, f"Expected candidates for {args}"
+                for search in (database, index):
+                    found = best_scored_loads(search, *args, limit=5, origin_radius=radius, weights=weights)
+                    assert [load.load_id for load in found] == expected, f"{type(search).__name__} differs for {args}"
+
+        check()
+        # Changed and removed loads free their slots for the next ones
+        changed = db.query(Load).filter(Load.load_id % 7 == 0).all()
+        for load in changed:
+            load.loadboard_rate = 3.0 if load.loadboard_rate < 900 else 1000.0
+            load.status = "booked" if load.load_id % 2 else "available"
+        db.commit()
+        index.apply(records=[LoadRecord.from_load(load) for load in changed])
+        check()
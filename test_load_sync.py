@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Load feed sync tests: only changes are written, and dropped or past loads stop being offered
+"""
+
+from datetime import datetime, timedelta
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.load import Load
+from app.services.load_sync import expire_past_pickups, sync_loads
+
+NOW = datetime(2025, 9, 10, 12)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'loads.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def feed_record(load_id, rate=2.5, pickup=NOW + timedelta(days=1)):
+    return {"load_id": load_id, "origin": "Chicago, IL", "destination": "Dallas, TX",
+            "pickup_datetime": pickup.isoformat(), "delivery_datetime": (pickup + timedelta(days=1)).isoformat(),
+            "equipment_type": "Dry Van", "loadboard_rate": rate, "weight": 20000, "commodity_type": "Paper"}
+
+
+def statuses(db):
+    db.expire_all()
+    return {load.load_id: (load.status, load.version) for load in db.query(Load)}
+
+
+def test_sync_writes_only_changes_and_expires_stale_loads(session_factory):
+    """Unchanged loads are skipped; missing, past and returning loads change status"""
+    with session_factory() as db:
+        # A hand-entered load is not feed-managed and must survive every sync
+        db.add(Load(origin="Denver, CO", destination="Phoenix, AZ", pickup_datetime=NOW + timedelta(days=2),
+                    delivery_datetime=NOW + timedelta(days=3), equipment_type="Reefer", loadboard_rate=2.0,
+                    weight=10000, commodity_type="Produce", load_id=99))
+        db.commit()
+
+        stats = sync_loads(db, [feed_record(1), feed_record(2), feed_record(3, pickup=NOW - timedelta(hours=1))], now=NOW)
+        assert (stats["added"], stats["expired_past"]) == (3, 1), f"Unexpected stats {stats}"
+
+        stats = sync_loads(db, [feed_record(1), feed_record(2, rate=3.1), feed_record(3, pickup=NOW - timedelta(hours=1))], now=NOW)
+        assert (stats["unchanged"], stats["changed"], stats["expired_past"]) == (2, 1, 0), f"Unexpected stats {stats}"
+        assert statuses(db) == {1: ("available", 0), 2: ("available", 1), 3: ("expired", 1), 99: ("available", 0)}
+
+        stats = sync_loads(db, [feed_record(2, rate=3.1)], now=NOW)
+        assert stats["expired_missing"] == 1, f"Load 1 dropped from the feed should expire, got {stats}"
+        assert statuses(db)[1][0] == "expired" and statuses(db)[99][0] == "available"
+
+        stats = sync_loads(db, [feed_record(1), feed_record(2, rate=3.1)], now=NOW)
+        assert stats["changed"] == 1 and statuses(db)[1][0] == "available", f"Returning load should be offered again, got {stats}"
+
+        stats = sync_loads(db, [], now=NOW)
+        assert stats["expired_missing"] == 0, "An empty feed must not expire the board"
+
+
+def test_pickups_expire_by_local_time(session_factory, monkeypatch):
+    """A pickup later today in local time stays on the board even when UTC is already past it"""
+    monkeypatch.setenv("TZ", "America/Chicago")
+    time.tzset()
+    try:
+        with session_factory() as db:
+            for load_id, hours in ((1, 2), (2, -1)):
+                pickup = datetime.now() + timedelta(hours=hours)
+                db.add(Load(origin="Chicago, IL", destination="Dallas, TX", pickup_datetime=pickup,
+                            delivery_datetime=pickup + timedelta(days=1), equipment_type="Dry Van",
+                            loadboard_rate=2.5, weight=20000, commodity_type="Paper", load_id=load_id))
+            db.commit()
+            assert expire_past_pickups(db) == 1, "Only the pickup an hour ago should expire"
+            assert statuses(db)[1][0] == "available", "Pickup in two hours local time must stay available"
+    finally:
+        monkeypatch.undo()
+        time.tzset()
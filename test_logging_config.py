@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Structured logging tests: JSON output carries extra fields and never leaks secrets
+"""
+
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from app.logging_config import build_handler
+
+
+def capture(log_format, monkeypatch, use_queue=False):
+    monkeypatch.setenv("FMCSA_API_KEY", "fmcsa-secret-key")
+    stream = io.StringIO()
+    logger = logging.getLogger(f"test.logging.{log_format}.{use_queue}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = build_handler(log_format, stream)
+    listener = None
+    if use_queue:
+        records = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(records))
+        listener = QueueListener(records, handler)
+        listener.start()
+    else:
+        logger.addHandler(handler)
+    return logger, stream, listener
+
+
+def test_json_lines_carry_extra_fields_and_redact_secrets(monkeypatch):
+    """Queued JSON records keep extra= fields; API keys are scrubbed from messages and payloads"""
+    logger, stream, listener = capture("json", monkeypatch, use_queue=True)
+    logger.info("GET %s failed", "https://mobile.fmcsa.dot.gov/qc/services/carriers/1515?webKey=fmcsa-secret-key",
+                extra={"mc_number": "1515", "payload": {"api_key": "hunter2", "origin": "Chicago, IL"}})
+    logger.warning("Connecting to %s", "postgresql://app:db-password@db/happyrobot")
+    listener.stop()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["level"] == "INFO" and first["mc_number"] == "1515", f"Unexpected record {first}"
+    assert "fmcsa-secret-key" not in first["message"], f"webKey leaked: {first['message']}"
+    assert first["payload"] == {"api_key": "[REDACTED]", "origin": "Chicago, IL"}, f"Payload not redacted: {first['payload']}"
+    assert "db-password" not in second["message"], f"Database password leaked: {second['message']}"
+
+
+def test_text_format_matches_previous_console_output(monkeypatch):
+    """Text mode keeps the LEVEL:logger:message lines the service always printed"""
+    logger, stream, _ = capture("text", monkeypatch)
+    logger.info("MC %s verification result: %s", "1515", "verified")
+    assert stream.getvalue() == f"INFO:{logger.name}:MC 1515 verification result: verified\n", f"Got {stream.getvalue()!r}"
+
+
+def test_queued_messages_keep_argument_values_at_call_time(monkeypatch):
+    """Arguments are merged into the message before the record is queued, so later mutation cannot change it"""
+    logger, stream, listener = capture("text", monkeypatch, use_queue=True)
+    dates = ["2025-09-10"]
+    logger.info("Available dates: %s", dates)
+    dates.append("2025-09-11")
+    listener.stop()
+    assert stream.getvalue() == f"INFO:{logger.name}:Available dates: ['2025-09-10']\n", f"Got {stream.getvalue()!r}"
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Startup migration tests: derived load search columns are backfilled once, including for unknown places
+"""
+
+from sqlalchemy import create_engine, text
+
+from app.database import Base
+from app import migrations
+from app.migrations import backfill_load_search_columns
+from app.models.load import SEARCH_FIELDS_VERSION, load_search_fields
+
+
+def test_backfill_marks_rows_it_visited(tmp_path, monkeypatch):
+    """Loads whose places the gazetteer does not know are backfilled once, not on every start"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'loads.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for origin in ("Chicago, IL", "Nowhere Junction, ZZ"):
+            conn.execute(text(
+                "INSERT INTO loads (origin, destination, pickup_datetime, delivery_datetime, equipment_type, "
+                "loadboard_rate, weight, commodity_type, version) VALUES (:origin, 'Dallas, TX', '2025-09-10 08:00:00', "
+                "'2025-09-11 08:00:00', 'Dry Van', 2.5, 20000, 'Paper', 0)"), {"origin": origin})
+
+    backfill_load_search_columns(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT origin_city, origin_lat IS NOT NULL, search_fields_version FROM loads ORDER BY load_id")).all()
+    assert rows == [("chicago", 1, SEARCH_FIELDS_VERSION), ("nowhere junction", 0, SEARCH_FIELDS_VERSION)], f"Unexpected rows {rows}"
+
+    derived = []
+    monkeypatch.setattr(migrations, "load_search_fields", lambda *args: derived.append(args) or load_search_fields(*args))
+    backfill_load_search_columns(engine)
+    assert derived == [], f"Second start should not revisit any load, recomputed {derived}"
+    engine.dispose()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Single-flight tests: concurrent lookups of one key share a single upstream call
+"""
+
+import asyncio
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """Callers for the same key get one result; other keys and later calls run on their own"""
+    calls = []
+
+    async def lookup(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"carrier {key}"
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do(key, lambda key=key: lookup(key)) for key in ["1", "1", "1", "2"]))
+        again = await flight.do("1", lambda: lookup("1"))
+        return flight, results, again
+
+    flight, results, again = asyncio.run(scenario())
+    assert results == ["carrier 1"] * 3 + ["carrier 2"], f"Unexpected results {results}"
+    assert again == "carrier 1"
+    assert sorted(calls) == ["1", "1", "2"], f"Expected one call per key per flight, got {calls}"
+    assert flight.stats() == {"executed": 3, "coalesced": 2, "in_flight": 0}, f"Unexpected stats {flight.stats()}"
+
+
+def test_errors_reach_every_caller_and_cancelling_one_keeps_the_call():
+    """A failure is shared by all waiters; a caller that gives up does not cancel the others"""
+    async def scenario():
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        outcomes = await asyncio.gather(flight.do("1", failing), flight.do("1", failing), return_exceptions=True)
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        impatient = asyncio.create_task(flight.do("2", slow))
+        patient = asyncio.create_task(flight.do("2", slow))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return outcomes, await patient
+
+    outcomes, patient = asyncio.run(scenario())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes), f"Unexpected outcomes {outcomes}"
+    assert patient == "ok", "The shared call should finish for the remaining caller"
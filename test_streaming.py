@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Streaming record reader tests: JSON arrays and NDJSON parse the same at any chunk size
+"""
+
+import io
+import json
+
+import pytest
+
+from app.services import streaming
+from app.services.streaming import iter_json_records, iter_records
+
+RECORDS = [
+    {"load_id": 1, "notes": "braces } { and ] [ inside", "rate": 2.5},
+    {"load_id": 22, "notes": "escaped \"quote\" and backslash \\", "dimensions": "48x102"},
+    {"load_id": 333, "notes": "", "miles": 1200, "nested": {"a": [1, {"b": "}"}]}},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 16, 64 * 1024])
+def test_records_split_across_chunks(chunk_size, monkeypatch):
+    """Array and NDJSON input give the same records however the chunks cut them"""
+    monkeypatch.setattr(streaming, "CHUNK_SIZE", chunk_size)
+    array = json.dumps(RECORDS, indent=2)
+    ndjson = "\n".join(json.dumps(record) for record in RECORDS) + "\n"
+    assert list(iter_json_records(io.StringIO(array))) == RECORDS, "Array records differ"
+    assert list(iter_json_records(io.StringIO(ndjson))) == RECORDS, "NDJSON records differ"
+    assert list(iter_records(io.StringIO(" [ ] "), "json")) == [], "Empty array has no records"
+
+
+@pytest.mark.parametrize("text", [
+    '[{"load_id": 1}, {"load_id": 2, "notes": "cut off',
+    '{"load_id": 1}\n{"load_id": 2, "miles": ',
+    '[{"load_id": 1}, {"load_id": 2}',
+])
+def test_truncated_input_raises(text, monkeypatch):
+    """A file cut off mid-record or before its closing bracket is an error after the complete records"""
+    monkeypatch.setattr(streaming, "CHUNK_SIZE", 5)
+    records = iter_json_records(io.StringIO(text))
+    assert next(records) == {"load_id": 1}, "Records before the cut should still be read"
+    with pytest.raises(ValueError):
+        list(records)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+MC verification cache tests: answers are kept per status TTL, errors never are, and the LRU stays bounded
+"""
+
+import asyncio
+import time
+
+from app.services.verification_cache import VerificationCache, VerificationResult, normalize_mc_number
+
+
+def test_results_cached_by_status_and_evicted_lru():
+    """Verified and not-found answers expire on their own TTLs; errors and pending answers are not stored"""
+    async def scenario(cache):
+        await cache.set("1", VerificationResult("verified", "ONE TRUCKING"))
+        await cache.set("2", VerificationResult("not_found"))
+        await cache.set("3", VerificationResult("error"))
+        await cache.set("4", VerificationResult("pending"))
+        found = [await cache.get(mc) for mc in ("1", "2", "3", "4")]
+
+        # Age "2" past its TTL; the stale answer stays available as a fallback
+        result, _ = cache._entries["2"]
+        cache._entries["2"] = (result, time.time() - 1)
+        expired = await cache.get("2")
+
+        await cache.set("5", VerificationResult("verified"))
+        await cache.set("6", VerificationResult("verified"))
+        return found, expired
+
+    cache = VerificationCache(max_size=2, ttls={"verified": 3600, "not_found": 60}, use_db=False)
+    found, expired = asyncio.run(scenario(cache))
+    assert found == [VerificationResult("verified", "ONE TRUCKING"), VerificationResult("not_found"), None, None], \
+        f"Unexpected cached answers {found}"
+    assert expired is None, "Expired entries must not be served as fresh"
+    assert list(cache._entries) == ["5", "6"], f"Least recently used entries should be evicted, kept {list(cache._entries)}"
+    assert cache.stats()["stores"] == 4, f"Unexpected stats {cache.stats()}"
+    assert normalize_mc_number("  mc-001515") == normalize_mc_number("1515") == "1515"